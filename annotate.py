@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tags free text with UMLS concepts using an in-process dictionary annotator
+built from an OBO file or the indexdata table.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import codecs
+import os
+import sys
+import tempfile
+import time
+from itertools import izip
+
+from sqlalchemy import create_engine
+
+from utils.annotator import Annotator, annotateDocs, BATCH_SIZE
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Annotates text files, one '
+                                     'document per line, with concept ids',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('files', nargs='*',
+                        help='UTF-8 text files to annotate')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-b', '--obo', default=None,
+                        help='OBO file to build the annotator from')
+    source.add_argument('-s', '--constr', default=None,
+                        help='Connection string for sqlalchemy, to build '
+                        'the annotator from indexdata')
+    source.add_argument('-a', '--annotator', default=None,
+                        help='Annotator saved with --save')
+    parser.add_argument('--save', default=None,
+                        help='Save the built annotator to this file')
+    parser.add_argument('--keep-case', action='store_true', default=False,
+                        help='Match case sensitively')
+    parser.add_argument('--keep-punctuation', action='store_true',
+                        default=False,
+                        help='Match punctuation instead of skipping it')
+    parser.add_argument('--plurals', action='store_true', default=False,
+                        help='Strip regular plural endings')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output TSV file, defaults to stdout')
+    parser.add_argument('-w', '--processes', type=int, default=1,
+                        help='Number of worker processes')
+    parser.add_argument('-c', '--batch-size', type=int, default=BATCH_SIZE,
+                        help='Documents sent to a worker at a time')
+
+    return parser.parse_args()
+
+
+def readDocs(filenames):
+    """Generate the lines of UTF-8 files, without line ends"""
+    for filename in filenames:
+        with codecs.open(filename, 'r', 'utf-8') as fb:
+            for line in fb:
+                yield line.rstrip(u'\r\n')
+
+
+def main(args):
+    options = {'lower': not args.keep_case,
+               'punctuation': args.keep_punctuation,
+               'plurals': args.plurals}
+    filename = args.annotator
+    if filename is None:
+        if args.obo is not None:
+            annotator = Annotator.fromOBO(args.obo, **options)
+        else:
+            conn = create_engine(args.constr).connect()
+            try:
+                annotator = Annotator.fromDB(conn, **options)
+            finally:
+                conn.close()
+        print >> sys.stderr, len(annotator), 'names loaded'
+        filename = args.save
+        if filename is None:
+            fd, filename = tempfile.mkstemp(suffix='.annotator')
+            os.close(fd)
+        annotator.save(filename)
+
+    try:
+        if args.output is None:
+            out = codecs.getwriter('utf-8')(sys.stdout)
+        else:
+            out = codecs.open(args.output, 'w', 'utf-8')
+        size = 0
+        start = time.time()
+        # the pool reads its documents from another thread, so the text of
+        # the matches comes from a reader of its own
+        results = annotateDocs(filename, readDocs(args.files),
+                               args.processes, args.batch_size)
+        docs = readDocs(args.files)
+        for docNo, (doc, matches) in enumerate(izip(docs, results)):
+            size += len(doc)
+            for begin, end, ids in matches:
+                out.write(u'%d\t%d\t%d\t%s\t%s\n' %
+                          (docNo, begin, end, doc[begin:end], ','.join(ids)))
+        out.flush()
+        elapsed = max(time.time() - start, 1e-6)
+        print >> sys.stderr, '%d chars annotated (%.2f M chars/sec)' % \
+            (size, size / elapsed / 1e6)
+    finally:
+        if args.annotator is None and args.save is None:
+            os.remove(filename)
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Builds the indexdata table of esIndex.py from MRCONSO and MRSTY in one
+pass; replaces scripts/preparedata.sql.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+
+from sqlalchemy import create_engine
+
+from utils.indexbuild import IndexdataBuilder, loadTuis, readConsoDB, \
+    readConsoRRF, readStyDB, readStyRRF, createTable, insertRows, \
+    SABS, LAT, SUPPRESS, BATCH_SIZE
+from utils.extsort import RUN_SIZE
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Builds the indexdata table '
+                                     'from UMLS MRCONSO and MRSTY',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('-s', '--constr', required=True,
+                        help='Connection string for sqlalchemy')
+    parser.add_argument('-p', '--prefix', default='',
+                        help='umls tablename prefix')
+    parser.add_argument('--mrconso', default=None,
+                        help='Read MRCONSO.RRF instead of the MRCONSO table')
+    parser.add_argument('--mrsty', default=None,
+                        help='Read MRSTY.RRF instead of the MRSTY table')
+    parser.add_argument('-b', '--sabs', default=','.join(SABS),
+                        help='A comma separated list of source '
+                        'terminologies')
+    parser.add_argument('-l', '--lat', default=LAT,
+                        help='Language of the strings')
+    parser.add_argument('-u', '--suppress', default=','.join(SUPPRESS),
+                        help='A comma separated list of suppress flags')
+    parser.add_argument('-t', '--table', default='indexdata',
+                        help='Table to create')
+    parser.add_argument('--replace', action='store_true', default=False,
+                        help='Drop the table first if it exists')
+    parser.add_argument('-n', '--batch-size', type=int, default=BATCH_SIZE,
+                        help='Rows per insert batch')
+    parser.add_argument('--sorted', action='store_true', default=False,
+                        help='MRCONSO.RRF is sorted by LUI, e.g. with '
+                        'sort -t"|" -k4,4')
+    parser.add_argument('--run-size', type=int, default=RUN_SIZE,
+                        help='MRCONSO.RRF rows per run of the external sort')
+    parser.add_argument('--tmpdir', default=None,
+                        help='Directory of the external sort runs')
+
+    return parser.parse_args()
+
+
+def splitList(value):
+    return [v.strip() for v in value.split(',')]
+
+
+def main(args):
+    sabs = splitList(args.sabs)
+    suppress = splitList(args.suppress)
+
+    engine = create_engine(args.constr)
+    conn = engine.connect()
+    try:
+        if args.mrsty is not None:
+            tuis = loadTuis(readStyRRF(args.mrsty))
+        else:
+            tuis = loadTuis(readStyDB(conn, args.prefix))
+        print len(tuis), 'CUIs with semantic types'
+
+        builder = IndexdataBuilder(tuis)
+        if args.mrconso is not None:
+            rows = builder.build(readConsoRRF(args.mrconso, sabs, args.lat,
+                                              suppress),
+                                 args.sorted, args.run_size, args.tmpdir)
+        else:
+            rows = builder.build(readConsoDB(conn, args.prefix, sabs,
+                                             args.lat, suppress))
+
+        createTable(conn, args.table, args.replace)
+        insertRows(conn, rows, args.table, args.batch_size)
+        print builder.report()
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main(parseArgs())
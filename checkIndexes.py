@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Checks the UMLS tables for the indexes of the UMLS class lookups, shows
+the EXPLAIN plans of the ones missing and optionally creates them.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine
+
+from utils.indexadvisor import checkIndexes, createIndexes, missing, report
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Checks the indexes of the '
+                                     'UMLS tables',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('-s', '--constr', required=True,
+                        help='Connection string for sqlalchemy')
+    parser.add_argument('-p', '--prefix', default='',
+                        help='umls tablename prefix')
+    parser.add_argument('--create', action='store_true', default=False,
+                        help='Create the missing indexes')
+    parser.add_argument('--no-partial', action='store_true', default=False,
+                        help='Accept indexes on the leading column only')
+
+    return parser.parse_args()
+
+
+def main(args):
+    engine = create_engine(args.constr)
+    conn = engine.connect()
+    try:
+        advice = checkIndexes(conn, args.prefix)
+        print report(advice)
+        if args.create:
+            created = createIndexes(conn, advice, not args.no_partial)
+            print 'Created', len(created), 'indexes'
+            if created:
+                print report(advice)
+        return 1 if missing(advice, not args.no_partial) else 0
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main(parseArgs()))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Writes the changes between two OBO releases as JSON lines, one per added,
+removed or changed term.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import codecs
+import json
+import sys
+
+from utils.obodiff import diffOBO
+from utils.extsort import RUN_SIZE
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Writes the changes between '
+                                     'two OBO files as JSON lines',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('old', help='Previous OBO release')
+    parser.add_argument('new', help='New OBO release')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output filename, defaults to stdout')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--sort', dest='sort', action='store_true',
+                       default=None, help='Always sort the inputs by id')
+    group.add_argument('--sorted', dest='sort', action='store_false',
+                       help='Inputs are sorted by id, skip the check')
+    parser.add_argument('-r', '--run-size', type=int, default=RUN_SIZE,
+                        help='Number of terms per external sort run')
+    parser.add_argument('-t', '--tmpdir', default=None,
+                        help='Directory for external sort files')
+
+    return parser.parse_args()
+
+
+def main(args):
+    if args.output is None:
+        out = codecs.getwriter('utf-8')(sys.stdout)
+    else:
+        out = codecs.open(args.output, 'w', 'utf-8')
+
+    counts = {}
+    try:
+        for delta in diffOBO(args.old, args.new, args.sort, args.run_size,
+                             args.tmpdir):
+            out.write(json.dumps(delta, ensure_ascii=False, sort_keys=True))
+            out.write('\n')
+            counts[delta['status']] = counts.get(delta['status'], 0) + 1
+    finally:
+        if args.output is not None:
+            out.close()
+
+    for status in sorted(counts):
+        print >> sys.stderr, '%-8s: %d' % (status, counts[status])
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -9,6 +9,8 @@
     Last modified: Aug 05, 2015, Wed 12:03:37 -0500
 """
 import argparse
+import logging
+from itertools import islice
 # from utils.snomedct import SNOMEDCT
 # from utils.umls import UMLS
 from sqlalchemy import create_engine
@@ -16,6 +18,14 @@ from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import TransportError
 
 from utils.semTypes import INV_SEM_TYPES
+from utils.esadmin import rebuildIndex
+from utils.esmapping import indexBody
+from utils.esfiles import writeBulkFiles, FILE_BYTES
+from utils.indexbuild import buildRows
+from utils.indexdata import keysetRows, streamRows, modifiedRows, \
+    clearModified, PAGE_SIZE, FETCH_SIZE, UPSERT, DELETE
+from utils.esbulk import bulkIndex, ParallelBulkIndexer, ChunkSizer, \
+    BulkStats, CHUNK_SIZE, MAX_CHUNK_BYTES, TARGET_LATENCY
 
 # Global vars
 es = None
@@ -37,104 +47,19 @@ conn = None
 #
 #  ALTER TABLE indexdata ADD PRIMARY KEY(LUI);
 #
-#  CREATE TABLE temp_strs AS SELECT str FROM indexdata;
+#  utils/indexbuild.py builds the same table in one pass, stripping the
+#  SNOMED CT semantic tags of utils.semTypes.SEM_TYPE_NAMEs.
 #
-SEM_TYPE_NAMEs = [
-    '(foundation metadata concept)',
-    '(context-dependent category)',
-    '(morphologic abnormality)',
-    '(administrative concept)',
-    '(navigational concept)',
-    '(contextual qualifier)',
-    '(geographic location)',
-    '(religion/philosophy)',
-    '(biological function)',
-    '(separate procedure)',
-    '(namespace concept)',
-    '(observable entity)',
-    '(assessment scale)',
-    '(record artifact)',
-    '(allelic variant)',
-    '(qualifier value)',
-    '(living organism)',
-    '(physical object)',
-    '(cell structure)',
-    '(surface region)',
-    '(physical force)',
-    '(regime/therapy)',
-    '(body structure)',
-    '(tumor staging)',
-    '(clinical exam)',
-    '(staging scale)',
-    '(combined site)',
-    '(manifestation)',
-    '(invertebrate)',
-    '(ethnic group)',
-    '(environment)',
-    '(Drosophila)',    #
-    '(medication)',
-    '(occupation)',
-    '(attribute)',
-    '(procedure)',
-    '(substance)',
-    '(diagnosis)',
-    '(treatment)',
-    '(situation)',
-    '(eukaryote)',
-    '(diagnosis)',
-    '(superior)',
-    '(inferior)',
-    '(obsolete)',
-    '(bacteria)',
-    '(lab test)',
-    '(disorder)',
-    '(specimen)',
-    '(organism)',
-    '(Medicine)',
-    '(etiology)',
-    '(function)',
-    '(property)',
-    '(disease)',
-    '(finding)',
-    '(product)',
-    '(symptom)',
-    '(degrees)',
-    '(history)',
-    '(lateral)',
-    '(person)',
-    '(fungus)',
-    '(medial)',
-    '(device)',
-    '(action)',
-    '(event)',
-    '(yeast)',    #
-    '(human)',
-    '(PLANT)',    #
-    '(cell)',
-]
-
-SQL = "SELECT LUI , STR, CUIS, CODES, TUIS FROM indexdata LIMIT %d, %d"
 
 # NCBI Taxonomy, 2014_04_01
 # NCI Thesaurus, 2014_03E
 
 
-def query(offset, count=100):
-    """Run the same sql from a given offset for a given count"""
-    sql = SQL % (offset, count)
-    result = conn.execute(sql)
-    res = []
-    for row in result:
-        res.append(row)
-
-    return res
-
-
-def addIndex(concept, index, doctype):
-    """Indexes a given umls concept to index with doc_type"""
+def document(concept):
+    """Builds the index document of a given umls concept"""
     tuis = concept[4].split(',')
     sset = [INV_SEM_TYPES[tui] for tui in tuis]
-    body = {
+    return {
         'lui': concept[0],
         'term': concept[1],
         'cui': concept[2].split(','),
@@ -143,49 +68,185 @@ def addIndex(concept, index, doctype):
         'sset': sset,  # subset
     }
 
-    es.index(index=index, doc_type=doctype, body=body)
 
+def concepts(pageSize=PAGE_SIZE, stream=False, fetchSize=FETCH_SIZE):
+    """Generates all concepts in LUI order, except rows flagged for
+    deletion
+
+    :pageSize: rows per keyset query
+    :stream: read the table with a single streaming cursor instead
+    :fetchSize: rows fetched at a time from the streaming cursor
+    """
+    where = 'MODIFIED <> %d' % DELETE
+    if stream:
+        return streamRows(conn, fetchSize, where)
+    return keysetRows(conn, pageSize, where)
+
+
+def actions(concepts, index, doctype):
+    """Bulk index actions for concepts. Actions have no _index or _type
+    if index or doctype is None."""
+    for concept in concepts:
+        action = {
+            '_id': concept[0],
+            '_source': document(concept),
+        }
+        if index is not None:
+            action['_index'] = index
+        if doctype is not None:
+            action['_type'] = doctype
+        yield action
+
+
+def modifiedActions(rows, index, doctype):
+    """Bulk actions for modified rows: index actions for UPSERT rows and
+    delete actions for DELETE rows"""
+    for row in rows:
+        if row['MODIFIED'] == DELETE:
+            yield {
+                '_op_type': 'delete',
+                '_index': index,
+                '_type': doctype,
+                '_id': row['LUI'],
+            }
+        else:
+            for action in actions([row], index, doctype):
+                yield action
+
+
+def processModified(index, doctype, chunkSize=CHUNK_SIZE,
+                    maxBytes=MAX_CHUNK_BYTES, pageSize=PAGE_SIZE):
+    """Index the rows flagged as modified, a page at a time. The flags of
+    a page are cleared only for the rows whose bulk items succeeded, so
+    failed rows are picked up again by the next run."""
+    stats = BulkStats(keepIds=True)
+    rows = modifiedRows(conn, pageSize)
+    while True:
+        page = list(islice(rows, pageSize))
+        if not page:
+            break
+        bulkIndex(es, modifiedActions(page, index, doctype), chunkSize,
+                  maxBytes, stats)
+        succeeded = stats.popSucceeded()
+        clearModified(conn, [i for op, i in succeeded if op == 'index'],
+                      UPSERT)
+        clearModified(conn, [i for op, i in succeeded if op == 'delete'],
+                      DELETE)
+
+    print stats.report()
+    return stats
+
+
+def processAll(index, doctype, chunkSize=CHUNK_SIZE,
+               maxBytes=MAX_CHUNK_BYTES, threads=1, latency=None,
+               rows=None):
+    """Index all concepts with bulk requests
 
-def processAll(index, doctype):
-    """process all concepts in smaller chunks"""
-    offset = 0
-    count = 100
-    hasMore = True
-    while hasMore:
-        concepts = query(offset, count)
-        for concept in concepts:
-            addIndex(concept, index, doctype)
+    :threads: number of sending threads; with more than one, rows are read
+            while earlier requests are in flight
+    :latency: target request latency in seconds to adapt the chunk size to,
+            None for a fixed chunk size. Used with threads > 1 only.
+    :rows: indexdata rows to index, all rows if None
+    """
+    if rows is None:
+        rows = concepts()
+    docs = actions(rows, index, doctype)
+    if threads > 1:
+        sizer = None
+        if latency is not None:
+            sizer = ChunkSizer(chunkSize, target=latency)
+        indexer = ParallelBulkIndexer(es, threads, chunkSize=chunkSize,
+                                      maxBytes=maxBytes, sizer=sizer)
+        stats = indexer.index(docs)
+    else:
+        stats = bulkIndex(es, docs, chunkSize, maxBytes)
+    print stats.report()
+    return stats
 
-        # check the number of results
-        numResults = len(concepts)
-        offset += numResults
-        # is the result count equals to expected number of items?
-        hasMore = numResults == count
+
+def writeAll(base, maxBytes=FILE_BYTES, compress=True, rows=None):
+    """Write bulk index actions for all concepts to NDJSON files instead of
+    sending them, see utils.esfiles. The actions have no _index or _type,
+    they are given when the files are replayed."""
+    if rows is None:
+        rows = concepts()
+    files, count = writeBulkFiles(actions(rows, None, None), base, maxBytes,
+                                  compress)
+    print '%d documents written to %d files' % (count, len(files))
+    return files
 
 
 def parseArgs():
     parser = argparse.ArgumentParser(description='Creates ElasticSearch index '
                                      'using UMLS concept descriptions',
                                      fromfile_prefix_chars='@')
-    parser.add_argument('-d', '--delete', action='store_true', required=False,
-                        help='Delete the previous index and restart')
     parser.add_argument('-H', '--host', default='localhost', required=False,
                         help='Host for ElasticSearch server')
     parser.add_argument('-p', '--port', type=int, default=9200, required=False,
                         help='Port for ElasticSearch server')
-    parser.add_argument('-i', '--index', required=True,
-                        help='Name of the ElasticSearch index to create')
-    parser.add_argument('-t', '--doctype', required=True,
+    parser.add_argument('-i', '--index', default=None,
+                        help='Name of the ElasticSearch index to create, '
+                        'or of the alias with --rebuild')
+    parser.add_argument('-t', '--doctype', default=None,
                         help='Document type of the ElasticSearch index '
                         'to create')
     parser.add_argument('-s', '--constr', required=True,
                         help='Connection string for sqlalchemy')
+    parser.add_argument('-c', '--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='Maximum number of documents per bulk request')
+    parser.add_argument('-b', '--chunk-bytes', type=int,
+                        default=MAX_CHUNK_BYTES,
+                        help='Maximum bulk request size in bytes')
+    parser.add_argument('-w', '--threads', type=int, default=1,
+                        help='Number of threads sending bulk requests')
+    parser.add_argument('-l', '--latency', type=float, default=None,
+                        help='Adapt the chunk size to this request latency '
+                        'in seconds (%.1f is a good start), with --threads'
+                        % TARGET_LATENCY)
+    parser.add_argument('-g', '--page-size', type=int, default=PAGE_SIZE,
+                        help='Number of indexdata rows per query')
+    parser.add_argument('--stream', action='store_true', default=False,
+                        help='Read indexdata with a single streaming cursor '
+                        'instead of one query per page')
+    parser.add_argument('-f', '--fetch-size', type=int, default=FETCH_SIZE,
+                        help='Rows fetched at a time with --stream')
+    parser.add_argument('-u', '--umls', action='store_true', default=False,
+                        help='Build the documents straight from the MRCONSO '
+                        'and MRSTY tables instead of reading indexdata')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('-d', '--delete', action='store_true', default=False,
+                      help='Delete the previous index and restart; --rebuild '
+                      'keeps the previous index behind the alias instead')
+    mode.add_argument('-r', '--rebuild', action='store_true', default=False,
+                      help='Load a new timestamped index with bulk load '
+                      'settings and swap the --index alias to it')
+    mode.add_argument('-m', '--modified', action='store_true', default=False,
+                      help='Only index or delete the rows flagged in the '
+                      'MODIFIED column, then clear the flags')
+    mode.add_argument('-o', '--output', default=None,
+                      help='Write the documents to _bulk NDJSON files '
+                      'with this prefix instead of indexing them; see '
+                      'replayBulk.py')
+    parser.add_argument('--file-bytes', type=int, default=FILE_BYTES,
+                        help='Maximum uncompressed size of an --output file')
+    parser.add_argument('--no-compress', action='store_true', default=False,
+                        help='Do not gzip the --output files')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='Number of shards of a new index')
+    parser.add_argument('--replicas', type=int, default=1,
+                        help='Number of replicas of the rebuilt index')
+    parser.add_argument('--max-failed', type=int, default=0,
+                        help='Maximum number of failed documents to still '
+                        'swap the alias after a rebuild')
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.output is None and (args.index is None or args.doctype is None):
+        parser.error('--index and --doctype are required unless --output '
+                     'is given')
+    return args
 
 
-def main(args):
-    global conn
+def connectES(args):
     global es
 
     try:
@@ -200,10 +261,50 @@ def main(args):
         print 'deleting index'
         es.indices.delete(index=args.index, ignore=[400, 404])
 
+    body = indexBody(args.doctype, args.shards)
+    if not args.rebuild and not es.indices.exists(index=args.index):
+        es.indices.create(index=args.index, body=body)
+    return body
+
+
+def main(args):
+    global conn
+
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+    if args.output is None:
+        body = connectES(args)
+
     engine = create_engine(args.constr)
     conn = engine.connect()
     try:
-        processAll(args.index, args.doctype)
+        if args.umls:
+            _, rows = buildRows(conn)
+        else:
+            rows = concepts(args.page_size, args.stream, args.fetch_size)
+
+        def load(index):
+            return processAll(index, args.doctype, args.chunk_size,
+                              args.chunk_bytes, args.threads, args.latency,
+                              rows)
+
+        if args.output is not None:
+            writeAll(args.output, args.file_bytes, not args.no_compress, rows)
+        elif args.modified:
+            processModified(args.index, args.doctype, args.chunk_size,
+                            args.chunk_bytes, args.page_size)
+        elif args.rebuild:
+            name, old = rebuildIndex(es, args.index, load, body,
+                                     replicas=args.replicas,
+                                     maxFailed=args.max_failed)
+            if old is None:
+                print 'too many failures, %s is not aliased' % name
+            else:
+                print '%s now points to %s' % (args.index, name)
+                if old:
+                    print 'kept for rollback:', ', '.join(old)
+        else:
+            load(args.index)
     finally:
         conn.close()
 
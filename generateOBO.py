@@ -15,11 +15,17 @@ import gc
 import logging
 
 from utils.umls import UMLS
+from utils.umlsconcurrent import ConcurrentUMLS
+from utils.indexadvisor import checkIndexes, createIndexes, missing, report
+from utils.diagnostics import Diagnostics, SAMPLE_SIZE
 from utils.semTypes import INV_SEM_TYPES
 from sqlalchemy import create_engine
 
 # Globals
 umls = None
+cumls = None      # ConcurrentUMLS, with --concurrency > 1
+diagnostics = Diagnostics()
+LOG_INTERVAL = 10
 
 withAltId = False   # generate alt_id keys?
 
@@ -146,28 +152,31 @@ def addRelInNotExists(term, type, code, sab, name=''):
     })
 
 
-def addRelationships(term, cui):
+def addRelationships(term, cui, rels=None, concepts=None):
     # select cui2, rel, rela mrrel
     # where cui1=:cui and SUPPRESS IN ('N') AND SAB IN ('...')
     #
     # rela CUI:xxx
     # PAR, CHD: -> is_a
     is_as = []
-    rels = umls.relcuis(cui, stype1='SCUI', sab=SABS, suppress=SUPPRESS)
+    if rels is None:
+        rels = umls.relcuis(cui, stype1='SCUI', sab=SABS, suppress=SUPPRESS)
     for r in rels:
         rela = r['RELA']
         rel = r['REL']
         sab = r['SAB']
         cui1 = r['CUI1']
-        c = findConcept(cui1, sab)
+        c = findConcept(cui1, sab, concepts)
         if c is None:
             # (no concept for cui???)
-            logging.warning('No concept for CUI %s (%s) in addRelationships' %
-                            (cui1, sab))
+            diagnostics.record('relationship to unknown concept',
+                               (rel, rela, sab), 'CUI %s (%s) of %s',
+                               cui1, sab, cui)
             continue
         elif c['supp']:
-            logging.warning('Skipping relasionship to an omitted concept: '
-                            '%(name)s (%(code)s) in addRelationships' % c)
+            diagnostics.record('relationship to omitted concept',
+                               (rel, rela, sab), '%s (%s) of %s',
+                               c['name'], c['code'], cui)
             continue
         else:
             name = c['name']
@@ -235,9 +244,9 @@ def addRelationships(term, cui):
             # MeSH
             pass
         else:
-            logging.error("Unhandled combination: "
-                          "rel:%s rela:%s cui:%s '%s' in addRelationships" %
-                          (rel, rela, cui, name))
+            diagnostics.record('unhandled combination', (rel, rela, sab),
+                               "rel:%s rela:%s cui:%s '%s'",
+                               rel, rela, cui, name, level=logging.ERROR)
             # exit()
 
 
@@ -251,11 +260,39 @@ def addSemTypeInNotExists(term, tui):
         term['subset'].append(INV_SEM_TYPES[tui])
 
 
-def addSemTypes(term, cui):
-    for tui in umls.tuis(cui):
+def addSemTypes(term, cui, tuis=None):
+    if tuis is None:
+        tuis = umls.tuis(cui)
+    for tui in tuis:
         addSemTypeInNotExists(term, tui)
 
 
+def fetchTerm(cui):
+    """Run the lookups of getTerm concurrently on cumls. The definition,
+    relationships and semantic types are queried at once, then the atom
+    of the definition and the concepts of all related CUIs.
+
+    :returns: (termDef, conDef, rels, concepts, tuis) where concepts maps
+            (CUI1, SAB) of rels to the rows of umls.concept(CUI1, sab=SAB)
+    """
+    defn = cumls.defn(cui, suppress=SUPPRESS, sabOrder=SABS)
+    rels = cumls.relcuis(cui, stype1='SCUI', sab=SABS, suppress=SUPPRESS)
+    tuis = cumls.tuis(cui)
+
+    termDef = defn.get()
+    conDef = cumls.aui(termDef['AUI']) if termDef else None
+    rels = rels.get()
+    pending = {}
+    for r in rels:
+        key = (r['CUI1'], r['SAB'])
+        if key not in pending:
+            pending[key] = cumls.concept(r['CUI1'], sab=r['SAB'])
+
+    concepts = dict((key, res.get()) for key, res in pending.iteritems())
+    return (termDef, conDef.get() if conDef else None, rels, concepts,
+            tuis.get())
+
+
 def getTerm(cui, name, cc):
     """Pack all information for the same cui into a single term"""
     term = {
@@ -269,13 +306,18 @@ def getTerm(cui, name, cc):
         'subset': [],
     }
 
-    termDef = umls.defn(cui, suppress=SUPPRESS, sabOrder=SABS)  # SAB??
+    if cumls is not None:
+        termDef, conDef, rels, concepts, tuis = fetchTerm(cui)
+    else:
+        termDef = umls.defn(cui, suppress=SUPPRESS, sabOrder=SABS)  # SAB??
+        conDef = umls.aui(termDef['AUI']) if termDef else None
+        rels = concepts = tuis = None
+
     if termDef:
-        conDef = umls.aui(termDef['AUI'])
         if conDef is None:
-            logging.error('AUI Not found %s - %s from MRDEF in getTerm' %
-                          (termDef['AUI'], cui))
-            print "NoneType for", termDef['AUI']
+            diagnostics.record('definition atom not found',
+                               (termDef['SAB'],), 'AUI %s of %s',
+                               termDef['AUI'], cui, level=logging.ERROR)
             conDef = {'SCUI': '', 'SAB': termDef['SAB']}
 
         term['def'] = {
@@ -285,8 +327,8 @@ def getTerm(cui, name, cc):
         }
 
     addSynonyms(term, name, cc)
-    addRelationships(term, cui)
-    addSemTypes(term, cui)
+    addRelationships(term, cui, rels, concepts)
+    addSemTypes(term, cui, tuis)
 
     return term
 
@@ -378,16 +420,22 @@ def selectRootConcept(c):
     return c[0]
 
 
-def findConcept(cui, sab):
-    c = umls.concept(cui, sab=sab)
+def findConcept(cui, sab, concepts=None):
+    """Concept of cui in sab, or in any of SABS. concepts holds the
+    prefetched rows of (cui, sab) pairs."""
+    if concepts is not None and (cui, sab) in concepts:
+        c = concepts[(cui, sab)]
+    else:
+        c = umls.concept(cui, sab=sab)
     if len(c) < 1:
         c = umls.concept(cui, lat=LAT, sab=SABS, suppress=SUPPRESS)
         if len(c) < 1:
-            logging.warning('CUI Not found %s - %s in findConcept' % (cui, sab))
+            diagnostics.record('concept not found', (sab,), '%s - %s',
+                               cui, sab)
             return None
         else:
-            logging.warning('CUI for SAB not found %s - %s in findConcept' %
-                            (cui, sab))
+            diagnostics.record('concept not found in SAB', (sab,), '%s - %s',
+                               cui, sab)
 
     c = c[0]
 
@@ -455,18 +503,65 @@ def parseArgs():
     parser.add_argument('-l', '--lat', help='A comma separated list of '
                         'language abbreviations for the concepts to be '
                         'included', default='ENG')
+    parser.add_argument('-j', '--concurrency', type=int, default=1,
+                        help='Number of concurrent UMLS queries per term')
     parser.add_argument('-a', '--alt-id', action='store_true', required=False,
                         default=False, help='Generate alt_id\'s')
+    parser.add_argument('-x', '--indexes', default='check',
+                        choices=['check', 'create', 'skip'],
+                        help='Report the UMLS indexes missing at startup, '
+                        'create them too, or skip the check')
+    parser.add_argument('--diagnostics', default='generateOBO.diag',
+                        help='Report file of the missing concepts, unhandled '
+                        'relationships, ... counted during the run')
+    parser.add_argument('--samples', type=int, default=SAMPLE_SIZE,
+                        help='Examples of each diagnostic kept for the '
+                        'report')
+    parser.add_argument('--log-interval', type=float, default=None,
+                        help='Minimum seconds between two log messages of a '
+                        'diagnostic; %d without --deploy, which logs none '
+                        'by default' % LOG_INTERVAL)
 
     return parser.parse_args()
 
 
 def main(args):
-    global umls
+    global umls, cumls, diagnostics
 
-    engine = create_engine(args.constr)
+    logInterval = args.log_interval
+    if logInterval is None and not args.deploy:
+        logInterval = LOG_INTERVAL
+    diagnostics = Diagnostics(args.samples, logInterval)
+
+    if args.concurrency > 1:
+        # the UMLS connection and one per concurrent query, for the run
+        engine = create_engine(args.constr, pool_size=args.concurrency + 1)
+    else:
+        engine = create_engine(args.constr)
+    if args.indexes != 'skip':
+        with engine.connect() as conn:
+            advice = checkIndexes(conn, args.prefix)
+            if missing(advice):
+                print report(advice)
+                if args.indexes == 'create':
+                    print 'Created indexes:', \
+                        ', '.join(createIndexes(conn, advice))
+                else:
+                    print 'Run with --indexes create or checkIndexes.py ' \
+                        '--create to create the missing indexes'
     with UMLS(engine, args.prefix) as umls:
-        processConcepts(args.filename, args.offset, args.count)
+        if args.concurrency > 1:
+            cumls = ConcurrentUMLS(engine, args.prefix, args.concurrency)
+        try:
+            processConcepts(args.filename, args.offset, args.count)
+        finally:
+            if cumls is not None:
+                cumls.close()
+                cumls = None
+            diagnostics.write(args.diagnostics)
+            for category, count in diagnostics.totals.most_common():
+                print '%-36s %d' % (category, count)
+            print 'Diagnostics in:', args.diagnostics
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Approximate term lookup: builds a memory mappable trigram index of OBO
+names and synonyms or of indexdata strings, and looks up possibly
+misspelled terms in it.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine
+
+from utils.trigram import TrigramIndex, THRESHOLD, LIMIT
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Looks up misspelled terms '
+                                     'in a trigram index',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('queries', nargs='*',
+                        help='Terms to look up, read from stdin if none')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-b', '--obo', default=None,
+                        help='OBO file to build the index from')
+    source.add_argument('-s', '--constr', default=None,
+                        help='Connection string for sqlalchemy, to build '
+                        'the index from indexdata')
+    source.add_argument('-i', '--index', default=None,
+                        help='Index saved with --save')
+    parser.add_argument('--save', default=None,
+                        help='Save the built index to this .npz file')
+    parser.add_argument('-t', '--threshold', type=float, default=THRESHOLD,
+                        help='Minimum trigram similarity, 0 to 1')
+    parser.add_argument('-n', '--limit', type=int, default=LIMIT,
+                        help='Maximum number of candidates per term')
+
+    return parser.parse_args()
+
+
+def main(args):
+    if args.index is not None:
+        index = TrigramIndex.load(args.index)
+    elif args.obo is not None:
+        index = TrigramIndex.fromOBO(args.obo)
+    else:
+        conn = create_engine(args.constr).connect()
+        try:
+            index = TrigramIndex.fromDB(conn)
+        finally:
+            conn.close()
+
+    if args.save is not None:
+        index.save(args.save)
+        print >> sys.stderr, len(index), 'strings saved'
+
+    queries = args.queries
+    if not queries and args.save is None:
+        queries = (line.strip() for line in sys.stdin)
+    for query in queries:
+        query = query.decode('utf-8')
+        for score, string, key, cuis in index.lookup(query, args.threshold,
+                                                     args.limit):
+            print (u'%s\t%.3f\t%s\t%s\t%s' %
+                   (query, score, string, key, cuis)).encode('utf-8')
+
+if __name__ == '__main__':
+    main(parseArgs())
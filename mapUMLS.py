@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Maps the xref and synonym codes of an OBO file, e.g. uberon.obo, to UMLS
+CUIs, writing a mapping table and an unmapped code report.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import os
+
+from sqlalchemy import create_engine
+
+from utils.umlsmap import UMLSIndex, SAB_ALIASES, mapOBO, writeReport
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Maps OBO xref and synonym '
+                                     'codes to UMLS CUIs',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('filename', help='OBO file to map')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output base name, defaults to the OBO filename')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-r', '--rrf', default=None,
+                        help='MRCONSO.RRF file to load the codes from')
+    source.add_argument('-s', '--constr', default=None,
+                        help='Connection string for sqlalchemy')
+    source.add_argument('-i', '--index', default=None,
+                        help='Index saved with --save')
+    parser.add_argument('-p', '--prefix', default='',
+                        help='umls tablename prefix')
+    parser.add_argument('-b', '--sabs', default=None,
+                        help='A comma separated list of source '
+                        'terminologies to load, defaults to all')
+    parser.add_argument('-u', '--suppress', default=None,
+                        help='A comma separated list of suppress flags '
+                        'to load, defaults to all')
+    parser.add_argument('-a', '--alias', action='append', default=[],
+                        help='Extra PREFIX=SAB alias, may be repeated')
+    parser.add_argument('--save', default=None,
+                        help='Save the loaded index to this file')
+
+    return parser.parse_args()
+
+
+def splitList(value):
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(',')]
+
+
+def main(args):
+    aliases = dict(SAB_ALIASES)
+    for alias in args.alias:
+        prefix, sab = alias.split('=', 1)
+        aliases[prefix.strip().upper()] = sab.strip()
+
+    sabs = splitList(args.sabs)
+    suppress = splitList(args.suppress)
+    if args.index is not None:
+        index = UMLSIndex.load(args.index, aliases)
+    elif args.rrf is not None:
+        index = UMLSIndex.fromRRF(args.rrf, sabs, suppress, aliases)
+    else:
+        conn = create_engine(args.constr).connect()
+        try:
+            index = UMLSIndex.fromDB(conn, args.prefix, sabs, suppress,
+                                     aliases)
+        finally:
+            conn.close()
+    print len(index), 'codes loaded'
+
+    if args.save is not None:
+        index.save(args.save)
+
+    base = args.output or os.path.splitext(args.filename)[0]
+    counts = mapOBO(args.filename, index, base)
+    writeReport(counts, base + '_report.tsv')
+
+    mapped = sum(m for m, u in counts.itervalues())
+    unmapped = sum(u for m, u in counts.itervalues())
+    print 'mapped  :', mapped
+    print 'unmapped:', unmapped
+
+if __name__ == '__main__':
+    main(parseArgs())
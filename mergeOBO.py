@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Merges several OBO files, e.g. umls.obo and uberon.obo, into one ontology.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+
+from utils.obomerge import mergeOBO
+from utils.extsort import RUN_SIZE
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Merges OBO files into one '
+                                     'ontology', fromfile_prefix_chars='@')
+    parser.add_argument('filenames', nargs='+', help='OBO files to merge')
+    parser.add_argument('-o', '--output', default='merged.obo',
+                        help='Merged OBO output filename')
+    parser.add_argument('-r', '--run-size', type=int, default=RUN_SIZE,
+                        help='Number of terms per external sort run')
+    parser.add_argument('-t', '--tmpdir', default=None,
+                        help='Directory for external sort files')
+
+    return parser.parse_args()
+
+
+def main(args):
+    count = mergeOBO(args.filenames, args.output, args.run_size, args.tmpdir)
+    print count, 'terms written to', args.output
+
+if __name__ == '__main__':
+    main(parseArgs())
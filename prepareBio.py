@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Builds the BIO_ subsets of the UMLS tables read by generateOBO.py with
+--prefix BIO_, indexed, and swaps them in by rename; replaces
+scripts/preparebiodata.sql.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import create_engine
+
+from utils.bioprepare import prepare, CONCURRENCY
+from utils.indexadvisor import checkIndexes, report
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Builds the subsets of the '
+                                     'UMLS tables used by generateOBO.py',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('-s', '--constr', required=True,
+                        help='Connection string for sqlalchemy')
+    parser.add_argument('-p', '--prefix', default='BIO_',
+                        help='tablename prefix of the subsets')
+    parser.add_argument('--source-prefix', default='',
+                        help='umls tablename prefix of the source tables')
+    parser.add_argument('-b', '--sabs', required=True,
+                        help='A comma separated list of names of source '
+                        'terminologies')
+    parser.add_argument('-u', '--suppress', help='A comma separated list of '
+                        'suppress flags for the concepts to be included.',
+                        default='N')
+    parser.add_argument('-l', '--lat', help='A comma separated list of '
+                        'language abbreviations for the concepts to be '
+                        'included', default='ENG')
+    parser.add_argument('-j', '--concurrency', type=int, default=CONCURRENCY,
+                        help='Number of tables built at a time')
+
+    return parser.parse_args()
+
+
+def splitList(value):
+    return [v.strip() for v in value.split(',')]
+
+
+def main(args):
+    engine = create_engine(args.constr)
+    counts = prepare(engine, splitList(args.sabs), splitList(args.suppress),
+                     splitList(args.lat), args.prefix, args.source_prefix,
+                     args.concurrency)
+    for table in sorted(counts):
+        print '%-12s %d rows' % (args.prefix + table, counts[table])
+
+    conn = engine.connect()
+    try:
+        print report(checkIndexes(conn, args.prefix))
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+    main(parseArgs())
@@ -8,65 +8,9 @@ Last modified: Aug 04, 2015, Tue 11:09:21 -0500
 """
 
 import argparse
-import codecs
+from sqlalchemy import create_engine
 from utils.obo import OBOReader
-
-
-def saveToCvs(fb, term, delim='\t'):
-    fb.write(term.id + delim + term.name + delim)
-    if term.defn is not None:
-        fb.write(term.defn['name'] + delim)
-        if term.defn['code'] is not None:
-            fb.write(term.defn['code'])
-    fb.write('\n')
-
-
-def saveSynToCvs(fb, term, delim='\t'):
-    print 'syn'
-    for synonym in term.synonym:
-        if synonym['code'] is not None:
-            codes = [c.strip() for c in synonym['code'].split(',')]
-        else:
-            codes = [None]
-
-        for code in codes:
-            fb.write(term.id + delim + synonym['name'] + delim)
-
-            if synonym['type'] is not None:
-                fb.write(synonym['type'])
-            fb.write(delim)
-            if code is not None:
-                fb.write(code)
-            fb.write('\n')
-
-    for xref in term.xref:
-        fb.write(term.id + delim)
-        if xref['src'] is not None:
-            fb.write(xref['src'])
-        fb.write(delim + 'EXACT' + delim)
-
-        if xref['code'] is not None:
-            fb.write(xref['code'])
-        fb.write('\n')
-
-
-def saveRelToCvs(fb, term, delim='\t'):
-    print 'rel'
-    for is_a in term.is_a:
-        fb.write(term.id + delim + 'is_a' + delim + is_a['code'] + delim)
-        if is_a['name'] is not None:
-            fb.write(is_a['name'])
-        fb.write('\n')
-
-    # intersection_of
-    # union_of
-
-    # relationship
-    for rel in term.relationship:
-        fb.write(term.id + delim + rel['type'] + delim + rel['code'] + delim)
-        if rel['name'] is not None:
-            fb.write(rel['name'])
-        fb.write('\n')
+from utils.oboexport import exportOBO, loadTables
 
 
 def process(term):
@@ -133,20 +77,38 @@ def parseArgs():
     parser = argparse.ArgumentParser(description='Processes uberon OBO file')
     parser.add_argument('-f', '--filename', default='uberon.obo',
                         required=False, help='OBO filename to process')
+    parser.add_argument('-v', '--verbose', action='store_true', default=False,
+                        help='Print every term to stdout')
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help='Number of worker processes for the export')
+    parser.add_argument('-s', '--constr', default=None,
+                        help='Connection string for sqlalchemy; if given, '
+                        'the exported files are loaded into MySQL')
+    parser.add_argument('--prefix', default='',
+                        help='Table name prefix for the loaded tables')
+    parser.add_argument('--replace', action='store_true', default=False,
+                        help='Empty the tables before loading')
 
     return parser.parse_args()
 
 
 def main(args):
-    with codecs.open(args.filename + '_con.tsv', 'w', 'utf-8') as conFb:
-        with codecs.open(args.filename + '_syn.tsv', 'w', 'utf-8') as synFb:
-            with codecs.open(args.filename + '_rel.tsv', 'w', 'utf-8') as relFb:
-                with OBOReader(args.filename) as obo:
-                    for term in obo:
-                        process(term)
-                        saveToCvs(conFb, term)
-                        saveSynToCvs(synFb, term)
-                        saveRelToCvs(relFb, term)
+    if args.verbose:
+        with OBOReader(args.filename) as obo:
+            for term in obo:
+                process(term)
+
+    counts = exportOBO(args.filename, processes=args.processes)
+    for table in sorted(counts):
+        print '%-12s: %d rows' % (table, counts[table])
+
+    if args.constr is not None:
+        engine = create_engine(args.constr)
+        conn = engine.connect()
+        try:
+            loadTables(conn, args.filename, args.prefix, args.replace)
+        finally:
+            conn.close()
 
 if __name__ == '__main__':
     main(parseArgs())
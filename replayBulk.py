@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Streams _bulk NDJSON files written by esIndex.py --output to an
+Elasticsearch cluster.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import logging
+
+from elasticsearch import Elasticsearch
+
+from utils.esadmin import rebuildIndex
+from utils.esbulk import bulkIndex, ParallelBulkIndexer, ChunkSizer, \
+    CHUNK_SIZE, MAX_CHUNK_BYTES
+from utils.esfiles import readBulkFiles
+from utils.esmapping import indexBody
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Streams _bulk NDJSON files '
+                                     'to ElasticSearch',
+                                     fromfile_prefix_chars='@')
+    parser.add_argument('files', nargs='+',
+                        help='Bulk files, .ndjson or .ndjson.gz, in order')
+    parser.add_argument('-H', '--host', default='localhost',
+                        help='Host for ElasticSearch server')
+    parser.add_argument('-p', '--port', type=int, default=9200,
+                        help='Port for ElasticSearch server')
+    parser.add_argument('-i', '--index', required=True,
+                        help='Index to load, or alias with --rebuild')
+    parser.add_argument('-t', '--doctype', required=True,
+                        help='Document type of the ElasticSearch index')
+    parser.add_argument('-c', '--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='Maximum number of documents per bulk request')
+    parser.add_argument('-b', '--chunk-bytes', type=int,
+                        default=MAX_CHUNK_BYTES,
+                        help='Maximum bulk request size in bytes')
+    parser.add_argument('-w', '--threads', type=int, default=1,
+                        help='Number of threads sending bulk requests')
+    parser.add_argument('-l', '--latency', type=float, default=None,
+                        help='Adapt the chunk size to this request latency '
+                        'in seconds, with --threads')
+    parser.add_argument('-r', '--rebuild', action='store_true', default=False,
+                        help='Load a new timestamped index and swap the '
+                        '--index alias to it')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='Number of shards of a new index')
+    parser.add_argument('--replicas', type=int, default=1,
+                        help='Number of replicas of the rebuilt index')
+    parser.add_argument('--max-failed', type=int, default=0,
+                        help='Maximum number of failed documents to still '
+                        'swap the alias after a rebuild')
+
+    return parser.parse_args()
+
+
+def replay(es, args, index):
+    """Send the bulk files of args to index"""
+    actions = readBulkFiles(args.files)
+    if args.threads > 1:
+        sizer = None
+        if args.latency is not None:
+            sizer = ChunkSizer(args.chunk_size, target=args.latency)
+        indexer = ParallelBulkIndexer(es, args.threads,
+                                      chunkSize=args.chunk_size,
+                                      maxBytes=args.chunk_bytes, sizer=sizer,
+                                      index=index, doctype=args.doctype)
+        stats = indexer.index(actions)
+    else:
+        stats = bulkIndex(es, actions, args.chunk_size, args.chunk_bytes,
+                          index=index, doctype=args.doctype)
+    print stats.report()
+    return stats
+
+
+def main(args):
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+    es = Elasticsearch([{u'host': args.host, u'port': args.port}])
+    body = indexBody(args.doctype, args.shards)
+    if args.rebuild:
+        name, old = rebuildIndex(es, args.index,
+                                 lambda index: replay(es, args, index), body,
+                                 replicas=args.replicas,
+                                 maxFailed=args.max_failed)
+        if old is None:
+            print 'too many failures, %s is not aliased' % name
+        else:
+            print '%s now points to %s' % (args.index, name)
+    else:
+        if not es.indices.exists(index=args.index):
+            es.indices.create(index=args.index, body=body)
+        replay(es, args, args.index)
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -1,5 +1,9 @@
 --
---
+-- prepareBio.py builds the same tables, MRDEF included, from the sources,
+-- suppress flags and languages of its options, indexed and swapped in by
+-- rename. The tables below are created without indexes; create them
+-- afterwards with
+--     python2 ./checkIndexes.py -s <constr> -p BIO_ --create
 --
 SET @SABS = 'MSH,SNOMEDCT_US,NCBI,FMA,GO,HGNC';
 SET @SUPPRESS = 'N';
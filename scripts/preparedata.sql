@@ -1,3 +1,6 @@
+-- buildIndexdata.py builds the same indexdata table in a single pass
+-- over MRCONSO and MRSTY, without the per tag DELETE and UPDATE scans.
+
 CREATE TABLE indexdata AS
    SELECT LUI , STR, GROUP_CONCAT(DISTINCT CUI) AS CUIS,
              GROUP_CONCAT(DISTINCT CONCAT( SAB, ':', CODE )) AS CODES
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Serves CUI to name, synonyms and semantic group resolution over HTTP,
+from the UMLS tables or from an OBO file.
+
+Created on   : 2026-10-19
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import create_engine
+
+from utils.termservice import TermServer, CachedResolver, UMLSResolver, \
+    OBOResolver, POOL_SIZE, CACHE_SIZE
+
+# seconds, below the MySQL default wait_timeout of 8 hours
+POOL_RECYCLE = 3600
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Serves UMLS term '
+                                     'resolution over HTTP',
+                                     fromfile_prefix_chars='@')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-s', '--constr', default=None,
+                        help='Connection string for sqlalchemy')
+    source.add_argument('-o', '--obo', default=None,
+                        help='OBO file to serve the terms of instead')
+    parser.add_argument('-p', '--prefix', default='',
+                        help='umls tablename prefix')
+    parser.add_argument('-b', '--sabs', default=None,
+                        help='A comma separated list of source '
+                        'terminologies, defaults to all')
+    parser.add_argument('-u', '--suppress', default='N',
+                        help='A comma separated list of suppress flags')
+    parser.add_argument('-l', '--lat', default='ENG',
+                        help='A comma separated list of languages')
+    parser.add_argument('-H', '--host', default='localhost',
+                        help='Address to listen on')
+    parser.add_argument('-P', '--port', type=int, default=8080,
+                        help='Port to listen on')
+    parser.add_argument('-w', '--pool-size', type=int, default=POOL_SIZE,
+                        help='Number of pooled database connections')
+    parser.add_argument('-c', '--cache-size', type=int, default=CACHE_SIZE,
+                        help='Number of terms kept in the LRU cache')
+
+    return parser.parse_args()
+
+
+def splitList(value):
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(',')]
+
+
+def main(args):
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+    if args.obo is not None:
+        resolver = OBOResolver(args.obo)
+    else:
+        # connections are checked out per request; replace the ones the
+        # server dropped after its wait_timeout
+        engine = create_engine(args.constr, pool_size=args.pool_size,
+                               pool_recycle=POOL_RECYCLE, pool_pre_ping=True)
+        resolver = UMLSResolver(engine, args.prefix, args.pool_size,
+                                splitList(args.sabs), splitList(args.lat),
+                                splitList(args.suppress))
+    resolver = CachedResolver(resolver, args.cache_size)
+
+    server = TermServer((args.host, args.port), resolver)
+    logging.info('serving on %s:%d', args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        resolver.close()
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -2,3 +2,69 @@
 
 echo "Running OBO file reader tests..."
 python -m unittest -v test.test_obo
+
+echo "Running OBO index tests..."
+python -m unittest -v test.test_oboindex
+
+echo "Running parallel OBO reader tests..."
+python -m unittest -v test.test_oboparallel
+
+echo "Running ontology store tests..."
+python -m unittest -v test.test_ontology
+
+echo "Running OBO cache tests..."
+python -m unittest -v test.test_obocache
+
+echo "Running OBO diff tests..."
+python -m unittest -v test.test_obodiff
+
+echo "Running OBO merge tests..."
+python -m unittest -v test.test_obomerge
+
+echo "Running OBO entry scanner tests..."
+python -m unittest -v test.test_oboscan
+
+echo "Running OBO export tests..."
+python -m unittest -v test.test_oboexport
+
+echo "Running UMLS mapping tests..."
+python -m unittest -v test.test_umlsmap
+
+echo "Running Elasticsearch bulk tests..."
+python -m unittest -v test.test_esbulk
+
+echo "Running indexdata reader tests..."
+python -m unittest -v test.test_indexdata
+
+echo "Running Elasticsearch index admin tests..."
+python -m unittest -v test.test_esadmin
+
+echo "Running esIndex tests..."
+python -m unittest -v test.test_esindex
+
+echo "Running bulk file tests..."
+python -m unittest -v test.test_esfiles
+
+echo "Running indexdata builder tests..."
+python -m unittest -v test.test_indexbuild
+
+echo "Running annotator tests..."
+python -m unittest -v test.test_annotator
+
+echo "Running trigram lookup tests..."
+python -m unittest -v test.test_trigram
+
+echo "Running term service tests..."
+python -m unittest -v test.test_termservice
+
+echo "Running concurrent UMLS tests..."
+python -m unittest -v test.test_umlsconcurrent
+
+echo "Running index advisor tests..."
+python -m unittest -v test.test_indexadvisor
+
+echo "Running BIO_ table preparation tests..."
+python -m unittest -v test.test_bioprepare
+
+echo "Running diagnostics tests..."
+python -m unittest -v test.test_diagnostics
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Per-line throughput of the OBO entry scanners against the reference
+regexes of EntryParser, on typical and on long, quote heavy values, and
+whole file parse time of a synthetic OBO file with EntryParser, with the
+regexes only and with the scanners only.
+
+Usage:
+     python -m test.bench_entryparser [-n repeat] [-t terms]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import timeit
+from utils.obo import EntryParser, OBOReader, Definition, Synonym, Xref, \
+    Relationship, IsA
+from utils.oboscan import scanDef, scanSyn, scanXref, scanIsA, scanRel
+
+CASES = [
+    ('synonym', EntryParser.SYN, scanSyn,
+     u'"cardiac structure" EXACT [SNOMEDCT_US:80891009]'),
+    ('def', EntryParser.DEF, scanDef,
+     u'"A hollow \\"muscular\\" organ." [MSH:D006321]'),
+    ('xref', EntryParser.XREF, scanXref, u'MSH:D006321 ! Heart'),
+    ('is_a', EntryParser.IS_A, scanIsA, u'UMLS:C0000002 ! Organ'),
+    ('relationship', EntryParser.REL, scanRel,
+     u'part_of UMLS:C0000005 ! Cardiovascular system'),
+    ('long def', EntryParser.DEF, scanDef,
+     u'"%s" [PMID:1]' % (u'a \\"quoted\\" word, ' * 500)),
+    ('long synonym', EntryParser.SYN, scanSyn,
+     u'"%s" EXACT [X:1]' % (u'\\"x\\" ' * 2000)),
+    ('malformed def', EntryParser.DEF, scanDef,
+     u'"%s' % (u'unclosed [X:1 ' * 2000)),
+    ('many tokens', EntryParser.SYN, scanSyn,
+     u'"x"%s [X:1' % (u' tok' * 2000)),
+]
+
+
+def rate(func, line, number):
+    seconds = min(timeit.repeat(lambda: func(line), repeat=3, number=number))
+    return number / seconds
+
+
+class RegexParser(EntryParser):
+    """EntryParser matching every entry with the regexes"""
+    def _groups(self, regex, line):
+        return regex.match(line).groups()
+
+    def xref(self, line):
+        return Xref(*self._groups(self.XREF, line))
+
+    def defn(self, line):
+        return Definition(*self._groups(self.DEF, line))
+
+    def syn(self, line):
+        return Synonym(*self._groups(self.SYN, line))
+
+    def rel(self, line):
+        return Relationship(*self._groups(self.REL, line))
+
+    def is_a(self, line):
+        return IsA(*self._groups(self.IS_A, line))
+
+
+class ScannerParser(EntryParser):
+    """EntryParser scanning every entry with oboscan"""
+    def xref(self, line):
+        return Xref(*scanXref(line))
+
+    def defn(self, line):
+        return Definition(*scanDef(line))
+
+    def syn(self, line):
+        return Synonym(*scanSyn(line))
+
+    def rel(self, line):
+        return Relationship(*scanRel(line))
+
+    def is_a(self, line):
+        return IsA(*scanIsA(line))
+
+
+def writeOBO(filename, count):
+    """Synthetic OBO file with count terms of typical entries"""
+    with open(filename, 'w') as f:
+        f.write('format-version: 1.2\n\n')
+        for i in range(1, count + 1):
+            f.write('[Term]\nid: UMLS:C%07d\nname: Concept %d\n' % (i, i))
+            f.write('def: "A \\"defined\\" concept number %d." '
+                    '[MSH:D%06d]\n' % (i, i))
+            f.write('synonym: "concept %d" EXACT [FMA:%d]\n' % (i, i))
+            f.write('synonym: "entity %d" RELATED []\n' % i)
+            f.write('xref: MSH:D%06d ! Concept %d\n' % (i, i))
+            f.write('xref: FMA:%d\n' % i)
+            if i > 1:
+                f.write('is_a: UMLS:C%07d ! Concept %d\n' % (i - 1, i - 1))
+                f.write('relationship: part_of UMLS:C%07d ! Concept %d\n' %
+                        (i // 2, i // 2))
+            f.write('subset: body\n\n')
+
+
+def parseTime(filename, parser):
+    best = None
+    for i in range(5):
+        start = time.time()
+        with OBOReader(filename) as obo:
+            if parser is not None:
+                obo.fmt = parser
+            for term in obo:
+                pass
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    print '%-14s %7s %14s %14s %7s' % ('case', 'length', 'regex/s',
+                                       'scanner/s', 'ratio')
+    for name, regex, scanner, line in CASES:
+        number = max(1, args.repeat // max(1, len(line) // 50))
+        r = rate(regex.match, line, number)
+        s = rate(scanner, line, number)
+        print '%-14s %7d %14.0f %14.0f %7.2f' % (name, len(line), r, s, s / r)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'bench.obo')
+        writeOBO(filename, args.terms)
+        print
+        print 'whole file, %d terms:' % args.terms
+        base = None
+        for name, parser in (('regexes only', RegexParser()),
+                             ('EntryParser', None),
+                             ('scanners only', ScannerParser())):
+            seconds = parseTime(filename, parser)
+            base = base or seconds
+            print '%-14s %7.2fs %7.2f' % (name, seconds, seconds / base)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Benchmarks the OBO entry '
+                                     'scanners against the regexes')
+    parser.add_argument('-n', '--repeat', type=int, default=20000,
+                        help='Number of parses of a typical line')
+    parser.add_argument('-t', '--terms', type=int, default=30000,
+                        help='Number of terms of the whole file benchmark')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Memory footprint of parsed OBO terms.
+
+Scales the test OBO files up by renumbering their terms, keeps every parsed
+term in memory, and compares the deep size of the compact term model with
+the dict based model OBOReader used to produce.
+
+Usage:
+     python -m test.bench_memory [-n copies]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from utils.obo import OBOReader, OBOTerm, Record, EMPTY
+
+SOURCES = ['test/test.obo', 'test/test1.obo', 'test/test2.obo']
+
+
+class LegacyTerm(object):
+    """The previous OBOTerm: a __dict__ and eagerly allocated lists"""
+    def __init__(self):
+        self.id = ''
+        self.name = ''
+        self.defn = None
+        for field in OBOTerm.LISTS:
+            setattr(self, field, [])
+
+
+def copyStr(s):
+    """A distinct copy of a string, as the regex parser used to produce"""
+    if s is None:
+        return None
+    return (s + u' ')[:-1]
+
+
+def legacy(term):
+    """Convert a parsed term into the dict based model"""
+    old = LegacyTerm()
+    old.id = copyStr(term.id)
+    old.name = term.name
+    if term.defn is not None:
+        old.defn = dict((k, copyStr(term.defn[k])) for k in term.defn.keys())
+    for field in OBOTerm.LISTS:
+        for value in getattr(term, field):
+            if isinstance(value, Record):
+                value = dict((k, copyStr(value[k])) for k in value.keys())
+            else:
+                value = copyStr(value)
+            getattr(old, field).append(value)
+    return old
+
+
+def deepSize(root):
+    """Total size of all objects reachable from root, counted once"""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.iterkeys())
+            stack.extend(obj.itervalues())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+        elif hasattr(obj, '__slots__'):
+            stack.extend(getattr(obj, f, None) for f in obj.__slots__)
+    return total
+
+
+def scaledOBO(copies):
+    """Write the test OBO files repeated `copies` times with unique ids"""
+    fd, filename = tempfile.mkstemp(suffix='.obo')
+    with os.fdopen(fd, 'w') as out:
+        for i in xrange(copies):
+            for src in SOURCES:
+                with open(src) as fb:
+                    for line in fb:
+                        if line.startswith(('id:', 'is_a:', 'alt_id:')):
+                            key, value = line.split(':', 1)
+                            value = value.strip().split(' ', 1)
+                            value[0] = '%s-%d' % (value[0], i)
+                            line = '%s: %s\n' % (key, ' '.join(value))
+                        out.write(line)
+                out.write('\n')
+    return filename
+
+
+def main(args):
+    filename = scaledOBO(args.copies)
+    try:
+        with OBOReader(filename, shareCodes=True) as obo:
+            terms = list(obo)
+    finally:
+        os.remove(filename)
+
+    compact = deepSize(terms) - deepSize(EMPTY)
+    old = deepSize([legacy(t) for t in terms])
+    print 'terms         : %d' % len(terms)
+    print 'dict model    : %10d bytes, %6.1f per term' % \
+        (old, float(old) / len(terms))
+    print 'compact model : %10d bytes, %6.1f per term' % \
+        (compact, float(compact) / len(terms))
+    print 'saving        : %.1f%%' % (100.0 * (old - compact) / old)
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Compares the memory used '
+                                     'by parsed OBO terms')
+    parser.add_argument('-n', '--copies', type=int, default=10000,
+                        help='Number of copies of the test OBO files')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Load test of the term resolution service: requests/sec and latency
+percentiles of single and batch lookups, against a service started in
+process over the SQLite UMLS fixture, or against a running one.
+
+Usage:
+     python -m test.bench_termservice [-n requests] [-c clients]
+                                      [-b batch] [--host H --port P]
+"""
+
+import argparse
+import httplib
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from test.umlsfixture import cui, fixtureEngine
+from utils.termservice import CachedResolver, TermServer, UMLSResolver
+
+
+def client(host, port, requests, batch, cuis, latencies, errors):
+    conn = httplib.HTTPConnection(host, port)
+    rand = random.Random()
+    try:
+        for i in range(requests):
+            start = time.time()
+            if batch > 1:
+                body = json.dumps(rand.sample(cuis, batch))
+                conn.request('POST', '/terms', body)
+            else:
+                conn.request('GET', '/term/' + rand.choice(cuis))
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.time() - start)
+            if response.status not in (200, 404):
+                errors.append(response.status)
+    finally:
+        conn.close()
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def run(host, port, args, cuis):
+    latencies = []
+    errors = []
+    perClient = args.requests // args.clients
+    threads = [threading.Thread(target=client,
+                                args=(host, port, perClient, args.batch,
+                                      cuis, latencies, errors))
+               for i in range(args.clients)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    latencies.sort()
+    print '%d requests of %d CUIs, %d clients, %d errors' % \
+        (len(latencies), args.batch, args.clients, len(errors))
+    print 'requests/sec: %.0f' % (len(latencies) / elapsed)
+    print 'CUIs/sec    : %.0f' % (len(latencies) * args.batch / elapsed)
+    for p in (0.5, 0.9, 0.99):
+        print 'p%-2d latency: %.2f ms' % (p * 100,
+                                          percentile(latencies, p) * 1000)
+
+
+def main(args):
+    cuis = [cui(i) for i in range(1, args.cuis + 1)]
+    if args.port is not None:
+        run(args.host, args.port, args, cuis)
+        return
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        engine = fixtureEngine(os.path.join(tmpdir, 'umls.db'), args.cuis)
+        resolver = CachedResolver(UMLSResolver(engine, size=args.pool_size),
+                                  args.cache_size)
+        server = TermServer(('localhost', 0), resolver)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            run('localhost', server.server_port, args, cuis)
+            print 'cache       :', resolver.stats()
+        finally:
+            server.shutdown()
+            server.server_close()
+            resolver.close()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='Load tests the term '
+                                     'resolution service')
+    parser.add_argument('-n', '--requests', type=int, default=2000,
+                        help='Total number of requests')
+    parser.add_argument('-c', '--clients', type=int, default=8,
+                        help='Number of concurrent clients')
+    parser.add_argument('-b', '--batch', type=int, default=1,
+                        help='CUIs per request; more than 1 uses /terms')
+    parser.add_argument('--cuis', type=int, default=1000,
+                        help='Number of fixture concepts')
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help='Pooled connections of the in process service')
+    parser.add_argument('--cache-size', type=int, default=100000,
+                        help='LRU cache size of the in process service, '
+                        '0 to disable')
+    parser.add_argument('--host', default='localhost',
+                        help='Host of a running service')
+    parser.add_argument('--port', type=int, default=None,
+                        help='Port of a running service; starts one over '
+                        'the fixture if not given')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    main(parseArgs())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from utils.annotator import Annotator, annotateDocs, singular
+
+
+class TestAnnotator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_singular(self):
+        self.assertEqual([singular(t) for t in
+                          ['arteries', 'diseases', 'boxes', 'classes',
+                           'virus', 'bus', 'heart', 'cells']],
+                         ['artery', 'disease', 'box', 'class', 'virus',
+                          'bus', 'heart', 'cell'])
+
+    def test_obo(self):
+        annotator = Annotator.fromOBO('test/test2.obo')
+        text = u'The Heart disease of the heart, an organ.'
+        matches = annotator.annotate(text)
+        self.assertEqual([(text[s:e], ids) for s, e, ids in matches],
+                         [(u'Heart disease', ('C0000004',)),
+                          (u'heart', ('C0000003',)),
+                          (u'organ', ('C0000002',))])
+
+    def test_options(self):
+        annotator = Annotator(plurals=True)
+        annotator.add(u'heart valve', 'C1')
+        annotator.add(u'heart', 'C2')
+        annotator.add(u'Heart', 'C3')
+        self.assertEqual(len(annotator), 2)
+
+        text = u'Heart-valves and HEARTS'
+        self.assertEqual(annotator.annotate(text),
+                         [(0, 12, ('C1',)), (17, 23, ('C2', 'C3'))])
+
+        exact = Annotator(lower=False, punctuation=True)
+        exact.add(u'heart valve', 'C1')
+        exact.add(u'Heart', 'C2')
+        self.assertEqual(exact.annotate(text), [(0, 5, ('C2',))])
+        self.assertEqual(exact.annotate(u'the heart valve'),
+                         [(4, 15, ('C1',))])
+
+    def test_save(self):
+        filename = os.path.join(self.tmpdir, 'test2.annotator')
+        annotator = Annotator.fromOBO('test/test2.obo', plurals=True)
+        annotator.save(filename)
+        loaded = Annotator.load(filename)
+        self.assertEqual(loaded.options, annotator.options)
+        self.assertEqual(loaded.trie, annotator.trie)
+
+        docs = [u'hearts and organs', u'', u'viscus'] * 5
+        expected = [annotator.annotate(doc) for doc in docs]
+        self.assertEqual(list(annotateDocs(filename, docs)), expected)
+        self.assertEqual(list(annotateDocs(filename, docs, processes=2,
+                                           batchSize=2)), expected)
+
+    def test_db(self):
+        conn = create_engine('sqlite://').connect()
+        conn.execute('CREATE TABLE indexdata (LUI varchar(10), STR text, '
+                     'CUIS text)')
+        conn.execute("INSERT INTO indexdata VALUES ('L1', 'Asthma', "
+                     "'C0000001,C0000002')")
+        annotator = Annotator.fromDB(conn)
+        conn.close()
+        self.assertEqual(annotator.annotate(u'asthma'),
+                         [(0, 6, ('C0000001', 'C0000002'))])
+
+if __name__ == '__main__':
+    unittest.main()
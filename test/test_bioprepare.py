@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import inspect
+from test.umlsfixture import cui, fixtureEngine
+from utils.bioprepare import prepare
+from utils.indexadvisor import checkIndexes, OK
+from utils.umls import UMLS
+
+
+class TestBioPrepare(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = fixtureEngine(os.path.join(self.tmpdir, 'umls.db'), 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def tables(self):
+        conn = self.engine.connect()
+        try:
+            return sorted(inspect(conn).get_table_names())
+        finally:
+            conn.close()
+
+    def test_prepare(self):
+        conn = self.engine.connect()
+        try:
+            # a longer definition of concept 4 from another source
+            conn.execute("INSERT INTO MRDEF (CUI, AUI, ATUI, SAB, DEF, "
+                         "SUPPRESS) VALUES ('%s', 'A9', 'AT9', 'GO', "
+                         "'The longer definition of concept 4', 'N')" %
+                         cui(4))
+        finally:
+            conn.close()
+        counts = prepare(self.engine, ['MSH'], ['N'], ['ENG'])
+        self.assertEqual(counts, {'MRCONSO': 10, 'MRREL': 9, 'MRSTY': 10,
+                                  'MRDEF': 5})
+        self.assertEqual(self.tables(),
+                         ['BIO_MRCONSO', 'BIO_MRDEF', 'BIO_MRREL',
+                          'BIO_MRSTY', 'MRCONSO', 'MRDEF', 'MRREL', 'MRSTY'])
+
+        with UMLS(self.engine, 'BIO_') as umls:
+            rows = umls.concept(cui(4))
+            self.assertEqual([r['STR'] for r in rows], [u'Concept 4'])
+            self.assertEqual(umls.defn(cui(4))['DEF'],
+                             u'Definition of concept 4')
+            self.assertEqual(len(umls.tuis(cui(4))), 1)
+            self.assertEqual(len(umls.relcuis(cui(4), stype1='SCUI')), 1)
+
+        conn = self.engine.connect()
+        try:
+            self.assertEqual([a.status for a in checkIndexes(conn, 'BIO_')],
+                             [OK] * 5)
+            cuis = [r[0] for r in conn.execute('SELECT CUI FROM BIO_MRCONSO')]
+            self.assertEqual(cuis, sorted(cuis))
+        finally:
+            conn.close()
+
+    def test_replace(self):
+        prepare(self.engine, ['MSH'], ['N'], ['ENG'])
+        # a second run replaces the tables, indexes included
+        counts = prepare(self.engine, ['MSH', 'SNOMEDCT_US'], ['N', 'O'],
+                         ['ENG'])
+        self.assertEqual(counts['MRCONSO'], 30)
+        self.assertEqual(len(self.tables()), 8)
+
+    def test_failure(self):
+        prepare(self.engine, ['MSH'], ['N'], ['ENG'])
+        self.assertRaises(Exception, prepare, self.engine, ['MSH'], ['N'],
+                          ['ENG'], source='MISSING_')
+        # the staging tables are dropped, the live ones left alone
+        self.assertEqual(len(self.tables()), 8)
+        conn = self.engine.connect()
+        try:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM BIO_MRCONSO')
+                             .scalar(), 10)
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
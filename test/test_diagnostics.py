@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+import generateOBO
+from test.umlsfixture import cui, fixtureEngine
+from utils.diagnostics import Diagnostics
+from utils.umls import UMLS
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class Formatted(object):
+    """Argument counting its formatting"""
+    count = 0
+
+    def __str__(self):
+        Formatted.count += 1
+        return 'formatted'
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_counts(self):
+        diagnostics = Diagnostics(sampleSize=5)
+        for i in range(100):
+            diagnostics.record('missing', ('MSH' if i % 4 else 'GO',),
+                               'CUI %s', cui(i))
+        diagnostics.record('unhandled', ('RO', None, 'MSH'))
+        self.assertEqual(len(diagnostics), 101)
+        self.assertEqual(diagnostics.totals['missing'], 100)
+        self.assertEqual(diagnostics.counts['missing'][('MSH',)], 75)
+        self.assertEqual(len(diagnostics.samples['missing']), 5)
+        self.assertEqual(diagnostics.samples['unhandled'], [])
+
+        summary = diagnostics.summary().splitlines()
+        self.assertEqual(summary[0], 'missing: 100')
+        self.assertEqual(summary[1].split(), ['75', 'MSH'])
+        self.assertEqual(summary[2].split(), ['25', 'GO'])
+        self.assertEqual(len([l for l in summary if 'CUI C' in l]), 5)
+        self.assertIn('unhandled: 1', summary)
+        self.assertEqual(diagnostics.summary(top=1).splitlines()[2].strip(),
+                         '1 more keys')
+
+    def test_lazy(self):
+        Formatted.count = 0
+        diagnostics = Diagnostics(sampleSize=3)
+        for i in range(50):
+            diagnostics.record('event', (), 'value %s', Formatted())
+        self.assertEqual(Formatted.count, 0)
+        diagnostics.summary()
+        self.assertEqual(Formatted.count, 3)
+
+    def test_rateLimit(self):
+        logger = logging.getLogger('test.diagnostics')
+        logger.propagate = False
+        logger.setLevel(logging.WARNING)
+        handler = ListHandler()
+        logger.addHandler(handler)
+        try:
+            diagnostics = Diagnostics(logInterval=3600, logger=logger)
+            for i in range(10):
+                diagnostics.record('missing', (), 'CUI %s', cui(i))
+            diagnostics.record('unhandled', (), 'rel %s', 'XX',
+                               level=logging.ERROR)
+            diagnostics.record('debug', (), 'detail', level=logging.DEBUG)
+            self.assertEqual(handler.messages, ['missing: CUI C0000000',
+                                                'unhandled: rel XX'])
+
+            diagnostics.logInterval = 0
+            diagnostics.record('missing', (), 'CUI %s', cui(10))
+            self.assertEqual(handler.messages[-1],
+                             'missing: CUI C0000010 (9 more since)')
+            self.assertEqual(diagnostics.totals['debug'], 1)
+        finally:
+            logger.removeHandler(handler)
+
+    def test_generateOBO(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            engine = fixtureEngine(os.path.join(tmpdir, 'umls.db'), 5)
+            generateOBO.SABS = ['MSH', 'GO']
+            generateOBO.SUPPRESS = ['N']
+            generateOBO.LAT = ['ENG']
+            generateOBO.diagnostics = Diagnostics()
+            with UMLS(engine) as umls:
+                generateOBO.umls = umls
+                self.assertEqual(generateOBO.findConcept(cui(9), 'MSH'), None)
+                self.assertEqual(generateOBO.findConcept(cui(2), 'GO')['sab'],
+                                 'MSH')
+                generateOBO.umls = None
+
+            totals = generateOBO.diagnostics.totals
+            self.assertEqual(totals['concept not found'], 1)
+            self.assertEqual(totals['concept not found in SAB'], 1)
+            self.assertEqual(generateOBO.diagnostics.counts[
+                'concept not found in SAB'][('GO',)], 1)
+        finally:
+            generateOBO.diagnostics = Diagnostics()
+            shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    unittest.main()
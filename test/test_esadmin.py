@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from datetime import datetime
+from elasticsearch.exceptions import NotFoundError
+from utils.esadmin import rebuildIndex, swapAlias, timestampedName
+from utils.esbulk import BulkStats
+from utils.esmapping import indexBody
+
+
+class FakeIndices(object):
+    """Keeps indices and aliases in memory, recording the calls made"""
+    def __init__(self, indices=(), aliases=None):
+        self.indices = dict((name, {}) for name in indices)
+        self.aliases = dict(aliases or {})
+        self.mappings = {}
+        self.calls = []
+
+    def create(self, index, body):
+        self.calls.append(('create', index))
+        self.indices[index] = dict(body['settings'])
+        self.mappings[index] = body.get('mappings')
+
+    def delete(self, index):
+        self.calls.append(('delete', index))
+        del self.indices[index]
+
+    def put_settings(self, index, body):
+        self.calls.append(('put_settings', index))
+        self.indices[index].update(body['index'])
+
+    def refresh(self, index):
+        self.calls.append(('refresh', index))
+
+    def optimize(self, index, max_num_segments):
+        self.calls.append(('optimize', index))
+
+    def exists(self, index):
+        return index in self.indices or index in self.aliases.values()
+
+    def get_alias(self, name):
+        indices = [i for i, a in self.aliases.items() if a == name]
+        if not indices:
+            raise NotFoundError(404, 'alias missing')
+        return dict((i, {'aliases': {name: {}}}) for i in indices)
+
+    def update_aliases(self, body):
+        self.calls.append(('update_aliases', len(body['actions'])))
+        for action in body['actions']:
+            for op, args in action.items():
+                if op == 'remove':
+                    del self.aliases[args['index']]
+                else:
+                    self.aliases[args['index']] = args['alias']
+
+
+class FakeES(object):
+    def __init__(self, *args, **kwargs):
+        self.indices = FakeIndices(*args, **kwargs)
+
+
+def loader(failed=0):
+    def load(name):
+        stats = BulkStats()
+        stats.success = 10
+        stats.failed = failed
+        return stats
+    return load
+
+
+class TestESAdmin(unittest.TestCase):
+    now = datetime(2026, 10, 19, 12, 0, 0)
+
+    def test_name(self):
+        self.assertEqual(timestampedName('library', self.now),
+                         'library_20261019120000')
+
+    def test_rebuild(self):
+        es = FakeES(['library_1'], {'library_1': 'library'})
+        name, old = rebuildIndex(es, 'library', loader(), replicas=2,
+                                 now=self.now)
+        self.assertEqual(name, 'library_20261019120000')
+        self.assertEqual(old, ['library_1'])
+        self.assertEqual(es.indices.aliases, {name: 'library'})
+        self.assertTrue('library_1' in es.indices.indices)
+        self.assertEqual(es.indices.indices[name],
+                         {'refresh_interval': '1s', 'number_of_replicas': 2})
+        self.assertEqual([c[0] for c in es.indices.calls],
+                         ['create', 'put_settings', 'refresh', 'optimize',
+                          'update_aliases'])
+        # one atomic update removing the old index and adding the new one
+        self.assertEqual(es.indices.calls[-1], ('update_aliases', 2))
+
+    def test_failed(self):
+        es = FakeES()
+        name, old = rebuildIndex(es, 'library', loader(failed=1),
+                                 now=self.now)
+        self.assertEqual(old, None)
+        self.assertEqual(es.indices.aliases, {})
+
+        name, old = rebuildIndex(es, 'library', loader(failed=1),
+                                 maxFailed=1, now=self.now)
+        self.assertEqual(old, [])
+        self.assertEqual(es.indices.aliases, {name: 'library'})
+
+    def test_mapping(self):
+        es = FakeES()
+        name, old = rebuildIndex(es, 'library', loader(),
+                                 indexBody('term', shards=3), now=self.now)
+        settings = es.indices.indices[name]
+        self.assertEqual(settings['number_of_shards'], 3)
+        self.assertTrue('autocomplete' in settings['analysis']['analyzer'])
+
+        props = es.indices.mappings[name]['term']['properties']
+        self.assertEqual(props['sab'], {'type': 'string',
+                                        'index': 'not_analyzed',
+                                        'doc_values': True})
+        self.assertFalse('doc_values' in props['cui'])
+        self.assertEqual(sorted(props['term']['fields']),
+                         ['autocomplete', 'exact'])
+
+    def test_concrete(self):
+        """An index with the alias name cannot be swapped"""
+        es = FakeES(['library'])
+        self.assertRaises(ValueError, swapAlias, es, 'library', 'library_2')
+
+        # checked before anything is loaded
+        loaded = []
+        self.assertRaises(ValueError, rebuildIndex, es, 'library',
+                          loaded.append, now=self.now)
+        self.assertEqual(loaded, [])
+        self.assertEqual(es.indices.calls, [])
+        self.assertEqual(sorted(es.indices.indices), ['library'])
+
+    def test_loadError(self):
+        """A failed load deletes the new index and keeps the alias"""
+        es = FakeES(['library_1'], {'library_1': 'library'})
+
+        def load(name):
+            raise IOError('connection lost')
+        self.assertRaises(IOError, rebuildIndex, es, 'library', load,
+                          now=self.now)
+        self.assertEqual(sorted(es.indices.indices), ['library_1'])
+        self.assertEqual(es.indices.aliases, {'library_1': 'library'})
+        self.assertEqual(es.indices.calls[-1],
+                         ('delete', 'library_20261019120000'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import TransportError
+from utils.esbulk import actionLines, chunkActions, bulkIndex, \
+    ChunkSizer, ParallelBulkIndexer
+
+
+class FakeClient(object):
+    """Records _bulk bodies, failing the documents with a 'bad' field and
+    raising for every request listed in fail"""
+    def __init__(self, fail=()):
+        self.bodies = []
+        self.fail = set(fail)
+
+    def bulk(self, body):
+        self.bodies.append(body)
+        if len(self.bodies) in self.fail:
+            raise TransportError(503, 'unavailable')
+
+        lines = body.splitlines()
+        items = []
+        for meta, source in zip(lines[::2], lines[1::2]):
+            info = json.loads(meta)['index']
+            if 'bad' in json.loads(source):
+                info.update(status=400, error='MapperParsingException')
+            else:
+                info['status'] = 201
+            items.append({'index': info})
+        return {'items': items}
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Local server mimicking the _bulk endpoint. Every third of the first
+    30 requests is rejected as a whole, and the first attempt of every
+    document with an odd id is rejected as an item, both with 429."""
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.attempts = {}
+        self.docs = {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, data):
+        body = json.dumps(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.requests += 1
+            if server.requests % 3 == 0 and server.requests <= 30:
+                return self.reply(429, {'error': 'EsRejectedExecution',
+                                        'status': 429})
+            items = []
+            lines = body.splitlines()
+            for meta, source in zip(lines[::2], lines[1::2]):
+                info = json.loads(meta)['index']
+                _id = info['_id']
+                server.attempts[_id] = server.attempts.get(_id, 0) + 1
+                if _id % 2 and server.attempts[_id] == 1:
+                    info['status'] = 429
+                else:
+                    info['status'] = 201
+                    server.docs[_id] = json.loads(source)
+                items.append({'index': info})
+        self.reply(200, {'took': 1, 'errors': False, 'items': items})
+
+
+def actions(n, bad=()):
+    for i in range(n):
+        doc = {'term': u'term %d' % i}
+        if i in bad:
+            doc['bad'] = True
+        yield {'_index': 'test', '_type': 'term', '_id': i, '_source': doc}
+
+
+class TestESBulk(unittest.TestCase):
+    def test_lines(self):
+        lines = actionLines({'_index': 'test', '_type': 'term', '_id': 1,
+                             '_source': {'term': u'h\xe9art'}})
+        meta, source, end = lines.split('\n')
+        self.assertEqual(json.loads(meta),
+                         {'index': {'_index': 'test', '_type': 'term',
+                                    '_id': 1}})
+        self.assertEqual(json.loads(source), {'term': u'h\xe9art'})
+        self.assertEqual(end, '')
+
+        lines = actionLines({'_op_type': 'delete', '_index': 'test',
+                             '_type': 'term', '_id': 1})
+        self.assertEqual(lines.count('\n'), 1)
+
+    def test_chunks(self):
+        chunks = list(chunkActions(actions(10), chunkSize=4))
+        self.assertEqual([len(c) for c in chunks], [4, 4, 2])
+
+        size = len(actionLines(next(actions(1))))
+        chunks = list(chunkActions(actions(10), chunkSize=100,
+                                   maxBytes=3 * size))
+        self.assertEqual([len(c) for c in chunks], [3, 3, 3, 1])
+        for chunk in chunks:
+            self.assertTrue(len(''.join(chunk)) <= 3 * size)
+
+        # an action larger than maxBytes goes alone
+        chunks = list(chunkActions(actions(3), maxBytes=10))
+        self.assertEqual([len(c) for c in chunks], [1, 1, 1])
+
+    def test_errors(self):
+        """Failed items and requests are collected, the run goes on"""
+        client = FakeClient(fail=[2])
+        stats = bulkIndex(client, actions(10, bad=[1, 9]), chunkSize=3)
+        self.assertEqual(len(client.bodies), 4)
+        self.assertEqual(stats.success, 5)
+        self.assertEqual(stats.failed, 5)
+        self.assertEqual([(e['id'], e['status']) for e in stats.errors],
+                         [(1, 400), (3, 503), (4, 503), (5, 503), (9, 400)])
+        self.assertTrue('failed  : 5' in stats.report())
+
+    def test_retry(self):
+        """Rejected items are resent, up to maxRetries times"""
+        class RejectingClient(FakeClient):
+            def bulk(self, body):
+                resp = FakeClient.bulk(self, body)
+                for item in resp['items']:
+                    if item['index']['_id'] == 2 or len(self.bodies) == 1:
+                        item['index']['status'] = 429
+                return resp
+
+        client = RejectingClient()
+        stats = bulkIndex(client, actions(4), maxRetries=2, backoff=0)
+        self.assertEqual(len(client.bodies), 3)
+        self.assertEqual(client.bodies[1].count('\n'), 8)
+        self.assertEqual(client.bodies[2].count('\n'), 2)
+        self.assertEqual((stats.success, stats.failed, stats.rejected),
+                         (3, 1, 6))
+        self.assertEqual(stats.errors[0]['id'], 2)
+
+    def test_sizer(self):
+        sizer = ChunkSizer(100, minSize=10, maxSize=200, target=1.0)
+        sizer.update(0.1, 100)
+        self.assertEqual(sizer.size, 126)
+        sizer.update(0.1, 20)
+        self.assertEqual(sizer.size, 126)
+        sizer.update(2.0, 126)
+        self.assertEqual(sizer.size, 63)
+        for i in range(10):
+            sizer.update(5.0, sizer.size)
+        self.assertEqual(sizer.size, 10)
+
+
+class TestParallelBulkIndexer(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.es = Elasticsearch([{'host': '127.0.0.1',
+                                  'port': self.server.server_port}])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_index(self):
+        indexer = ParallelBulkIndexer(self.es, threads=4, queueSize=2,
+                                      chunkSize=7, backoff=0.001,
+                                      maxRetries=20,
+                                      sizer=ChunkSizer(7, minSize=5))
+        stats = indexer.index(actions(500))
+        self.assertEqual((stats.success, stats.failed), (500, 0))
+        self.assertTrue(stats.rejected >= 250)
+        self.assertEqual(sorted(self.server.docs), range(500))
+        self.assertEqual(self.server.docs[42], {'term': 'term 42'})
+        self.assertTrue('docs/sec' in stats.report())
+
+    def test_failure(self):
+        """Documents still rejected after maxRetries are failures"""
+        indexer = ParallelBulkIndexer(self.es, threads=2, chunkSize=10,
+                                      maxRetries=0)
+        stats = indexer.index(actions(100))
+        self.assertEqual(stats.success + stats.failed, 100)
+        self.assertTrue(stats.failed >= 50)
+        self.assertEqual(stats.errors[0]['status'], 429)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.esbulk import actionLines, bulkIndex
+from utils.esfiles import BulkFileWriter, readBulkFiles, writeBulkFiles
+
+
+def actions(n):
+    for i in range(n):
+        if i % 5 == 4:
+            yield {'_op_type': 'delete', '_id': 'L%07d' % i}
+        else:
+            yield {'_id': 'L%07d' % i, '_source': {'term': u'term \xe9 %d' % i}}
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.requests = []
+
+    def bulk(self, body, index=None, doc_type=None):
+        self.requests.append((index, doc_type, body))
+        items = []
+        for line in body.splitlines():
+            meta = json.loads(line)
+            if 'index' in meta or 'delete' in meta:
+                (op, info), = meta.items()
+                info['status'] = 200
+                items.append({op: info})
+        return {'items': items}
+
+
+class TestBulkFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.base = os.path.join(self.tmpdir, 'library')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_split(self):
+        size = len(actionLines(next(actions(1))))
+        files, count = writeBulkFiles(actions(20), self.base,
+                                      maxBytes=4 * size)
+        self.assertEqual(count, 20)
+        self.assertTrue(len(files) > 4)
+        self.assertEqual(files[0], self.base + '-00000.ndjson.gz')
+        for filename in files:
+            with gzip.open(filename, 'rb') as fb:
+                data = fb.read()
+            self.assertTrue(len(data) <= 4 * size)
+            self.assertTrue(data.endswith('\n'))
+
+        replayed = list(readBulkFiles(files))
+        self.assertEqual(replayed, [actionLines(a) for a in actions(20)])
+
+    def test_plain(self):
+        with BulkFileWriter(self.base, compress=False) as out:
+            for action in actions(3):
+                out.write(action)
+            out.write(actionLines({'_id': 'big', '_source': {'x': 'y'}}))
+        self.assertEqual(out.files, [self.base + '-00000.ndjson'])
+        self.assertEqual(len(list(readBulkFiles(out.files))), 4)
+
+        # an action larger than maxBytes gets a file of its own
+        files, count = writeBulkFiles(actions(3), self.base + '2',
+                                      maxBytes=1)
+        self.assertEqual(len(files), 3)
+
+    def test_replay(self):
+        files, count = writeBulkFiles(actions(10), self.base, maxBytes=200)
+        client = FakeClient()
+        stats = bulkIndex(client, readBulkFiles(files), chunkSize=4,
+                          index='library_2', doctype='term')
+        self.assertEqual((stats.success, stats.failed), (10, 0))
+        self.assertEqual(len(client.requests), 3)
+        self.assertEqual(client.requests[0][:2], ('library_2', 'term'))
+        self.assertEqual(client.requests[0][2].count('\n'), 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+import esIndex
+from utils.esbulk import bulkIndex
+from utils.esfiles import readBulkFiles
+
+
+class FakeClient(object):
+    """Keeps documents in memory, failing the documents listed in bad"""
+    def __init__(self, bad=()):
+        self.docs = {}
+        self.bad = set(bad)
+        self.requests = 0
+
+    def bulk(self, body):
+        self.requests += 1
+        lines = iter(body.splitlines())
+        items = []
+        for line in lines:
+            (op, info), = json.loads(line).items()
+            _id = info['_id']
+            if op == 'delete':
+                found = self.docs.pop(_id, None) is not None
+                info['status'] = 200 if found else 404
+            else:
+                source = json.loads(next(lines))
+                if _id in self.bad:
+                    info['status'] = 400
+                else:
+                    self.docs[_id] = source
+                    info['status'] = 201
+            items.append({op: info})
+        return {'items': items}
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.conn = create_engine('sqlite://').connect()
+        self.conn.execute('CREATE TABLE indexdata (LUI varchar(10) PRIMARY '
+                          'KEY, STR text, CUIS text, CODES text, TUIS text, '
+                          'MODIFIED tinyint NOT NULL DEFAULT 0)')
+        for i in range(1, 11):
+            self.conn.execute('INSERT INTO indexdata VALUES (?, ?, ?, ?, ?, 0)',
+                              'L%07d' % i, 'term %d' % i, 'C0000001',
+                              'MSH:D000001', 'T023')
+        esIndex.conn = self.conn
+
+    def tearDown(self):
+        self.conn.close()
+
+    def flags(self):
+        return dict((r[0], r[1]) for r in
+                    self.conn.execute('SELECT LUI, MODIFIED FROM indexdata'))
+
+    def test_full(self):
+        esIndex.es = FakeClient()
+        stats = esIndex.processAll('library', 'term', chunkSize=3,
+                                   rows=esIndex.concepts(pageSize=4))
+        self.assertEqual(stats.success, 10)
+        doc = esIndex.es.docs['L0000001']
+        self.assertEqual(doc['term'], 'term 1')
+        self.assertEqual(doc['cui'], ['C0000001'])
+
+    def test_output(self):
+        """Documents written to files are indexed by a replay"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            files = esIndex.writeAll(os.path.join(tmpdir, 'library'),
+                                     maxBytes=500,
+                                     rows=esIndex.concepts(pageSize=4))
+            self.assertTrue(len(files) > 1)
+            es = FakeClient()
+            stats = bulkIndex(es, readBulkFiles(files), chunkSize=3)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(stats.success, 10)
+        self.assertEqual(es.docs['L0000010']['term'], 'term 10')
+
+    def test_modified(self):
+        es = esIndex.es = FakeClient(bad=['L0000005'])
+        esIndex.processAll('library', 'term')
+        self.conn.execute("UPDATE indexdata SET STR = 'changed', MODIFIED = 1 "
+                          "WHERE LUI IN ('L0000002', 'L0000005', 'L0000008')")
+        self.conn.execute("UPDATE indexdata SET MODIFIED = 2 "
+                          "WHERE LUI IN ('L0000003', 'L0000004')")
+        # deleting a document that is not indexed succeeds
+        del es.docs['L0000004']
+
+        stats = esIndex.processModified('library', 'term', chunkSize=2,
+                                        pageSize=2)
+        self.assertEqual((stats.success, stats.failed), (4, 1))
+        self.assertEqual(es.docs['L0000002']['term'], 'changed')
+        self.assertEqual(es.docs['L0000008']['term'], 'changed')
+        self.assertFalse('L0000003' in es.docs)
+
+        flags = self.flags()
+        self.assertFalse('L0000003' in flags or 'L0000004' in flags)
+        self.assertEqual(flags['L0000002'], 0)
+        self.assertEqual(flags['L0000005'], 1)
+
+        # the failed row is retried by the next run
+        es.bad = set()
+        requests = es.requests
+        stats = esIndex.processModified('library', 'term')
+        self.assertEqual(stats.success, 1)
+        self.assertEqual(es.requests, requests + 1)
+        self.assertEqual(sum(self.flags().values()), 0)
+
+        # rows flagged for deletion are not part of a full load
+        self.conn.execute("UPDATE indexdata SET MODIFIED = 2 "
+                          "WHERE LUI = 'L0000001'")
+        self.assertEqual(len(list(esIndex.concepts(pageSize=3))), 7)
+
+if __name__ == '__main__':
+    unittest.main()
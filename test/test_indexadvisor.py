@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from test.umlsfixture import fixtureEngine
+from utils.indexadvisor import checkIndexes, createIndexes, matchIndex, \
+    missing, report, OK, PARTIAL, MISSING, NO_TABLE
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = fixtureEngine(os.path.join(self.tmpdir, 'umls.db'), 10,
+                                    prefix='BIO_')
+        self.conn = self.engine.connect()
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_matchIndex(self):
+        columns = ['CUI', 'SAB', 'LAT', 'SUPPRESS']
+        self.assertEqual(matchIndex([], columns), (MISSING, None))
+        self.assertEqual(matchIndex([('X1', ['CUI'])], columns),
+                         (PARTIAL, 'X1'))
+        self.assertEqual(matchIndex([('X1', ['CUI']),
+                                     ('X2', ['SAB', 'cui', 'SUPPRESS', 'LAT',
+                                             'STR'])], columns),
+                         (OK, 'X2'))
+        self.assertEqual(matchIndex([('X1', ['SAB', 'CUI'])], ['CUI']),
+                         (MISSING, None))
+
+    def test_check(self):
+        self.conn.execute('CREATE INDEX X_STY ON BIO_MRSTY (CUI, TUI)')
+        self.conn.execute('CREATE INDEX X_CUI ON BIO_MRCONSO (CUI)')
+        advice = checkIndexes(self.conn, 'BIO_')
+        self.assertEqual([a.status for a in advice],
+                         [PARTIAL, MISSING, MISSING, MISSING, OK])
+        self.assertEqual(advice[4].index, 'X_STY')
+        self.assertTrue(advice[1].fullScan)
+        self.assertFalse(advice[0].fullScan)
+        self.assertIn('full table scan', report(advice))
+        self.assertEqual(len(missing(advice)), 4)
+        self.assertEqual(len(missing(advice, partial=False)), 3)
+
+        self.assertEqual([a.status for a in checkIndexes(self.conn)],
+                         [NO_TABLE] * 5)
+
+    def test_create(self):
+        advice = checkIndexes(self.conn, 'BIO_')
+        created = createIndexes(self.conn, advice)
+        self.assertEqual(created[0], 'X_BIO_MRCONSO_CUI_SAB_LAT_SUPPRESS')
+        self.assertEqual(len(created), 5)
+        self.assertFalse(any(a.fullScan for a in advice))
+
+        advice = checkIndexes(self.conn, 'BIO_')
+        self.assertEqual([a.status for a in advice], [OK] * 5)
+        self.assertEqual(missing(advice), [])
+        self.assertEqual(createIndexes(self.conn, advice), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from utils.indexbuild import IndexdataBuilder, buildRows, createTable, \
+    insertRows, loadTuis, readConsoRRF, readStyRRF, splitTag
+
+MRCONSO = [
+    'C0000001|ENG|P|L1|PF|S1|Y|A1||||MSH|MH|D001249|Asthma|0|N||',
+    'C0000001|ENG|P|L1|VC|S2|N|A2||||SNOMEDCT_US|SY|195967001|asthma|9|N||',
+    'C0000001|ENG|S|L2|PF|S3|N|A3||||SNOMEDCT_US|FN|195967001|'
+    'Asthma (disorder)|9|N||',
+    'C0000002|ENG|P|L3|PF|S4|Y|A4||||SNOMEDCT_US|FN|88610006|'
+    'Heart murmur (finding)|9|N||',
+    'C0000003|ENG|P|L4|PF|S5|Y|A5||||MSH|MH|D014815|Vitamin (B)|0|N||',
+    'C0000003|ENG|S|L5|PF|S6|N|A6||||SNOMEDCT_US|FN|87708000|'
+    'Vitamin (PLANT)|9|N||',
+    'C0000004|FRE|P|L6|PF|S7|Y|A7||||MSH|MH|D003371|Toux|3|N||',
+    'C0000005|ENG|P|L7|PF|S8|Y|A8||||NCI|PT|C12727|Heart|0|N||',
+    'C0000006|ENG|P|L8|PF|S9|Y|A9||||SNOMEDCT_US|FN|1|Old (disorder)|9|O||',
+    'C0000007|ENG|P|L9|PF|S10|Y|A10||||SNOMEDCT_US|FN|4421005|'
+    'Cell (cell)|9|N||',
+    'C0000007|ENG|P|L10|PF|S11|Y|A11||||GO|PT|GO:0005623|CELL|0|N||',
+]
+
+MRSTY = [
+    'C0000001|T047|B2.2.1.2.1|Disease or Syndrome|AT1||',
+    'C0000002|T033|A2.2|Finding|AT2||',
+    'C0000003|T127|A1.4.1.1.3.5|Vitamin|AT3||',
+    'C0000003|T109|A1.4.1.2.1|Organic Chemical|AT4||',
+    'C0000007|T025|A1.2.3.1|Cell|AT5||',
+]
+
+EXPECTED = [
+    ('L1', u'Asthma', 'C0000001', 'MSH:D001249,SNOMEDCT_US:195967001',
+     'T047', 0),
+    ('L10', u'CELL', 'C0000007', 'GO:GO:0005623', 'T025', 0),
+    ('L3', u'Heart murmur', 'C0000002', 'SNOMEDCT_US:88610006', 'T033', 1),
+    ('L4', u'Vitamin (B)', 'C0000003', 'MSH:D014815', 'T109,T127', 0),
+    ('L5', u'Vitamin', 'C0000003', 'SNOMEDCT_US:87708000', 'T109,T127', 1),
+]
+
+
+class TestIndexBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.conso = os.path.join(self.tmpdir, 'MRCONSO.RRF')
+        self.sty = os.path.join(self.tmpdir, 'MRSTY.RRF')
+        with open(self.conso, 'w') as fb:
+            fb.write('\n'.join(MRCONSO) + '\n')
+        with open(self.sty, 'w') as fb:
+            fb.write('\n'.join(MRSTY) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_splitTag(self):
+        self.assertEqual(splitTag(u'Asthma (disorder)'),
+                         (u'Asthma', u'(disorder)'))
+        self.assertEqual(splitTag(u'Rose (plant)'), (u'Rose', u'(plant)'))
+        self.assertEqual(splitTag(u'Vitamin (B)'), (u'Vitamin (B)', None))
+        self.assertEqual(splitTag(u'Asthma'), (u'Asthma', None))
+        self.assertEqual(splitTag(u'disorder)'), (u'disorder)', None))
+
+    def test_rrf(self):
+        builder = IndexdataBuilder(loadTuis(readStyRRF(self.sty)))
+        rows = builder.build(readConsoRRF(self.conso), ordered=False)
+        self.assertEqual(sorted(rows), EXPECTED)
+        self.assertEqual((builder.count, builder.stripped, builder.dropped),
+                         (5, 2, 2))
+
+    def test_externalSort(self):
+        # the second row of L1 last
+        with open(self.conso, 'w') as fb:
+            fb.write('\n'.join(MRCONSO[:1] + MRCONSO[2:] + MRCONSO[1:2]) +
+                     '\n')
+        builder = IndexdataBuilder(loadTuis(readStyRRF(self.sty)))
+        rows = list(builder.build(readConsoRRF(self.conso), ordered=False,
+                                  runSize=2, tmpdir=self.tmpdir))
+        self.assertEqual(sorted(rows), EXPECTED)
+        self.assertEqual([f for f in os.listdir(self.tmpdir)
+                          if f.endswith('.run')], [])
+
+    def test_db(self):
+        conn = create_engine('sqlite://').connect()
+        conn.execute('CREATE TABLE MRCONSO (CUI char(8), LAT char(3), '
+                     'LUI varchar(10), STR text, SAB varchar(40), '
+                     'CODE varchar(100), SUPPRESS char(1))')
+        conn.execute('CREATE TABLE MRSTY (CUI char(8), TUI char(4))')
+        for line in MRCONSO:
+            row = line.decode('utf-8').split('|')
+            conn.execute('INSERT INTO MRCONSO VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         row[0], row[1], row[3], row[14], row[11], row[13],
+                         row[16])
+        for line in MRSTY:
+            conn.execute('INSERT INTO MRSTY VALUES (?, ?)',
+                         *line.split('|')[:2])
+
+        builder, rows = buildRows(conn)
+        createTable(conn)
+        self.assertEqual(insertRows(conn, rows, batchSize=2), 5)
+        self.assertEqual(builder.dropped, 2)
+        result = conn.execute('SELECT LUI, STR, CUIS, CODES, TUIS, MODIFIED '
+                              'FROM indexdata ORDER BY LUI').fetchall()
+        self.assertEqual([tuple(r) for r in result], EXPECTED)
+
+        createTable(conn, replace=True)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM indexdata')
+                         .scalar(), 0)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
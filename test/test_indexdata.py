@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from sqlalchemy import create_engine
+from utils.indexdata import keysetRows, streamRows
+
+
+class TestIndexData(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.conn = self.engine.connect()
+        self.conn.execute('CREATE TABLE indexdata (LUI varchar(10) PRIMARY '
+                          'KEY, STR text, CUIS text, CODES text, TUIS text, '
+                          'MODIFIED tinyint NOT NULL DEFAULT 0)')
+        self.luis = ['L%07d' % i for i in range(1, 26)]
+        for i, lui in enumerate(reversed(self.luis)):
+            self.conn.execute('INSERT INTO indexdata VALUES (?, ?, ?, ?, ?, ?)',
+                              lui, 'term %s' % lui, 'C0000001',
+                              'MSH:D000001', 'T023', i % 2)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_keyset(self):
+        for pageSize in [1, 5, 7, 25, 100]:
+            rows = list(keysetRows(self.conn, pageSize))
+            self.assertEqual([r['LUI'] for r in rows], self.luis)
+        self.assertEqual(rows[0]['STR'], 'term L0000001')
+
+        rows = list(keysetRows(self.conn, 4, start='L0000020'))
+        self.assertEqual([r['LUI'] for r in rows], self.luis[20:])
+
+    def test_where(self):
+        rows = list(keysetRows(self.conn, 3, where='MODIFIED = 1'))
+        self.assertEqual([r['LUI'] for r in rows], self.luis[1::2])
+
+    def test_stream(self):
+        rows = list(streamRows(self.conn, 4))
+        self.assertEqual([r['LUI'] for r in rows], self.luis)
+        rows = list(streamRows(self.conn, 4, where='MODIFIED = 1'))
+        self.assertEqual(len(rows), 12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import pickle
+import tempfile
 import unittest
-from utils.obo import OBOReader, EntryParser
+from utils.obo import OBOReader, OBOWriter, OBOTerm, EntryParser, EMPTY
 
 
 class TestOBOReader(unittest.TestCase):
@@ -21,6 +24,71 @@ class TestOBOReader(unittest.TestCase):
             for term in terms:
                 self.assertNotEqual(term, None, "Term %d returns None" % i)
 
+    def test_compact(self):
+        """Empty fields are shared, repeated tokens are interned"""
+        with OBOReader('test/test2.obo', shareCodes=True) as obo:
+            terms = dict((t.id, t) for t in obo)
+
+        self.assertTrue(terms['UMLS:C0000006'].synonym is EMPTY)
+        self.assertTrue(terms['UMLS:C0000006'].subset[0] is
+                        terms['UMLS:C0000004'].subset[0])
+        self.assertTrue(terms['UMLS:C0000003'].is_a[0].code is
+                        terms['UMLS:C0000002'].id)
+        self.assertFalse(hasattr(terms['UMLS:C0000006'], '__dict__'))
+
+    def test_pickle(self):
+        with OBOReader('test/test2.obo') as obo:
+            term = [t for t in obo][2]
+        copy = pickle.loads(pickle.dumps(term, 2))
+        self.assertEqual(copy.id, term.id)
+        self.assertEqual(copy.synonym, term.synonym)
+        self.assertEqual(copy.defn['name'], term.defn.name)
+
+    def test_errors(self):
+        """Parse errors propagate out of the with statement"""
+        fd, filename = tempfile.mkstemp(suffix='.obo')
+        os.write(fd, '[Term]\nid: X:1\nname: x\nsynonym: no quotes\n')
+        os.close(fd)
+        try:
+            def read():
+                with OBOReader(filename) as obo:
+                    return list(obo)
+            self.assertRaises(ValueError, read)
+        finally:
+            os.remove(filename)
+
+
+class TestOBOWriter(unittest.TestCase):
+    def test_roundtrip(self):
+        """Written terms read back the same"""
+        fd, filename = tempfile.mkstemp(suffix='.obo')
+        os.close(fd)
+        try:
+            with OBOReader('test/test2.obo') as obo:
+                terms = list(obo)
+            with OBOWriter(filename) as out:
+                out.writeHeader([('format-version', '1.2')])
+                for term in terms:
+                    out.writeTerm(term)
+            with OBOReader(filename) as obo:
+                copies = list(obo)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(len(copies), len(terms))
+        for term, copy in zip(terms, copies):
+            self.assertEqual(copy.__getstate__(), term.__getstate__())
+
+
+class TestOBOTerm(unittest.TestCase):
+    def test_add(self):
+        term = OBOTerm('ID:1', 'Test')
+        self.assertEqual(term.xref, EMPTY)
+        term.add('xref', 'ID:2')
+        term.add('xref', 'ID:3')
+        self.assertEqual(term.xref, ['ID:2', 'ID:3'])
+        self.assertEqual(OBOTerm().xref, EMPTY)
+
 
 class TestEntryParser(unittest.TestCase):
     def setUp(self):
@@ -53,6 +121,13 @@ class TestEntryParser(unittest.TestCase):
         self.assertEqual(syn['type'], None)
         self.assertEqual(syn['code'], '')
 
+    def test_syn_record(self):
+        syn = self.fmt.syn('"Heart" EXACT [UMLS:C0018787]')
+        self.assertEqual(syn.name, syn['name'])
+        self.assertEqual(syn.keys(), ['name', 'type', 'code'])
+        self.assertRaises(KeyError, lambda: syn['src'])
+        self.assertEqual(syn, self.fmt.syn('"Heart" EXACT [UMLS:C0018787]'))
+
     def test_rel_1(self):
         """Test relationship extraction."""
         rel = self.fmt.rel('has_part UBERON:0001003 ! skin epidermis')
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from utils.obo import OBOReader
+from utils import obocache
+from utils.obocache import cacheName, cacheOptions, isCacheValid, \
+    readHeader, OBOCacheWriter
+
+
+def terms(obo):
+    return [(t.id, t.name, t.defn, t.synonym, t.xref, t.is_a,
+             t.relationship, t.subset, t.alt_id) for t in obo]
+
+
+class TestOBOCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'test2.obo')
+        shutil.copy('test/test2.obo', self.filename)
+        with OBOReader(self.filename) as obo:
+            self.expected = terms(obo)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache(self):
+        """Cold start writes the cache, warm start reads it"""
+        with OBOReader(self.filename, cache=True) as obo:
+            self.assertEqual(obo.cached, None)
+            self.assertEqual(terms(obo), self.expected)
+        self.assertTrue(isCacheValid(self.filename))
+
+        with OBOReader(self.filename, cache=True) as obo:
+            self.assertNotEqual(obo.cached, None)
+            self.assertEqual(terms(obo), self.expected)
+
+    def test_partial(self):
+        """A partially read file leaves no cache behind"""
+        with OBOReader(self.filename, cache=True) as obo:
+            obo.next()
+        self.assertFalse(os.path.exists(cacheName(self.filename)))
+        self.assertEqual(os.listdir(self.tmpdir), ['test2.obo'])
+
+    def test_touch(self):
+        """A new mtime with the same content keeps the cache"""
+        with OBOReader(self.filename, cache=True) as obo:
+            list(obo)
+        mtime = time.time() + 10
+        os.utime(self.filename, (mtime, mtime))
+        self.assertTrue(isCacheValid(self.filename))
+
+    def test_modified(self):
+        with OBOReader(self.filename, cache=True) as obo:
+            list(obo)
+        with open(self.filename, 'r+b') as fb:
+            fb.seek(-20, os.SEEK_END)
+            fb.write('X')
+        mtime = time.time() + 10
+        os.utime(self.filename, (mtime, mtime))
+        self.assertFalse(isCacheValid(self.filename))
+
+    def test_options(self):
+        """A cache written with other options is not used"""
+        with OBOReader(self.filename, cache=True) as obo:
+            list(obo)
+        self.assertFalse(isCacheValid(self.filename,
+                                      options=cacheOptions(True)))
+        with OBOReader(self.filename, shareCodes=True, cache=True) as obo:
+            self.assertEqual(obo.cached, None)
+            self.assertEqual(terms(obo), self.expected)
+        self.assertTrue(isCacheValid(self.filename,
+                                     options=cacheOptions(True)))
+        self.assertFalse(isCacheValid(self.filename))
+
+    def test_version(self):
+        """A cache of another parser version is not used"""
+        with OBOReader(self.filename, cache=True) as obo:
+            list(obo)
+        version = obocache.PARSER_VERSION
+        obocache.PARSER_VERSION = version + 1
+        try:
+            self.assertFalse(isCacheValid(self.filename))
+            with OBOReader(self.filename, cache=True) as obo:
+                self.assertEqual(obo.cached, None)
+                list(obo)
+            self.assertEqual(readHeader(cacheName(self.filename))[0],
+                             version + 1)
+        finally:
+            obocache.PARSER_VERSION = version
+
+    def test_readOnly(self):
+        """A cache that cannot be written is skipped, not an error"""
+        def mkstemp(*args, **kwargs):
+            raise OSError(errno.EACCES, 'Permission denied')
+        original = tempfile.mkstemp
+        tempfile.mkstemp = mkstemp
+        try:
+            with OBOReader(self.filename, cache=True) as obo:
+                self.assertEqual(obo.cacheWriter, None)
+                self.assertEqual(terms(obo), self.expected)
+        finally:
+            tempfile.mkstemp = original
+        self.assertEqual(os.listdir(self.tmpdir), ['test2.obo'])
+
+    def test_concurrent(self):
+        """Concurrent writers use temporary files of their own"""
+        writers = [OBOCacheWriter(self.filename) for i in range(2)]
+        self.assertNotEqual(writers[0].tmpname, writers[1].tmpname)
+        with OBOReader(self.filename) as obo:
+            for term in obo:
+                for writer in writers:
+                    writer.write(term)
+        for writer in writers:
+            writer.commit()
+        self.assertEqual(os.listdir(self.tmpdir).count('test2.obo.cache'), 1)
+        self.assertEqual(len(os.listdir(self.tmpdir)), 2)
+        self.assertTrue(isCacheValid(self.filename))
+        with OBOReader(self.filename, cache=True) as obo:
+            self.assertNotEqual(obo.cached, None)
+            self.assertEqual(terms(obo), self.expected)
+
+if __name__ == '__main__':
+    unittest.main()
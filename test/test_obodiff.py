@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from utils.obo import OBOReader
+from utils.extsort import sortTerms
+from utils.obodiff import diffOBO, isSorted
+
+NEW_OBO = """format-version: 1.2
+
+[Term]
+id: UMLS:C0000007
+name: Lung
+is_a: UMLS:C0000002 ! Organ
+
+[Term]
+id: UMLS:C0000003
+name: Heart structure
+def: "A hollow \\"muscular\\" organ." [MSH:D006321]
+subset: body
+is_a: UMLS:C0000002 ! Organ
+is_a: UMLS:C0000005 ! Cardiovascular system
+synonym: "cardiac structure" EXACT [SNOMEDCT_US:80891009]
+synonym: "heart" EXACT [MSH:D006321]
+xref: MSH:D006321 ! Heart
+relationship: part_of UMLS:C0000005 ! Cardiovascular system
+
+[Term]
+id: UMLS:C0000001
+name: Anatomical structure
+subset: body
+synonym: "anatomical entity" EXACT [FMA:62955]
+xref: FMA:62955 ! Anatomical structure
+
+[Term]
+id: UMLS:C0000002
+name: Organ
+alt_id: FMA:67498
+subset: body
+is_a: UMLS:C0000001 ! Anatomical structure
+synonym: "organ" EXACT [FMA:67498]
+xref: FMA:67498 ! Organ
+
+[Term]
+id: UMLS:C0000004
+name: Heart disease
+subset: prob
+is_a: UMLS:C0000006 ! Disease
+relationship: finding_site_of UMLS:C0000003 ! Heart
+
+[Term]
+id: UMLS:C0000006
+name: Disease
+subset: prob
+"""
+
+
+class TestOBODiff(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.new = os.path.join(self.tmpdir, 'new.obo')
+        with open(self.new, 'w') as fb:
+            fb.write(NEW_OBO)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_sorted(self):
+        self.assertTrue(isSorted('test/test2.obo'))
+        self.assertFalse(isSorted(self.new))
+
+    def test_extsort(self):
+        with OBOReader(self.new) as obo:
+            ids = [t.id for t in sortTerms(obo, runSize=2,
+                                           tmpdir=self.tmpdir)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(os.listdir(self.tmpdir), ['new.obo'])
+
+    def test_diff(self):
+        deltas = list(diffOBO('test/test2.obo', self.new, runSize=2,
+                              tmpdir=self.tmpdir))
+        self.assertEqual([(d['id'], d['status']) for d in deltas], [
+            ('UMLS:C0000002', 'changed'),
+            ('UMLS:C0000003', 'changed'),
+            ('UMLS:C0000005', 'removed'),
+            ('UMLS:C0000007', 'added'),
+        ])
+
+        organ, heart = deltas[0], deltas[1]
+        self.assertEqual(organ['synonym'], {'removed': [
+            {'name': 'viscus', 'type': 'NARROW', 'code': 'MSH:D009929'}]})
+        self.assertEqual(heart['name'], {'old': 'Heart',
+                                         'new': 'Heart structure'})
+        self.assertEqual(heart['is_a'], {'added': ['UMLS:C0000005']})
+        self.assertEqual(heart['synonym']['added'][0]['name'], 'heart')
+        self.assertFalse('def' in heart)
+        self.assertEqual(deltas[3]['name'], 'Lung')
+
+    def test_same(self):
+        self.assertEqual(list(diffOBO('test/test2.obo', 'test/test2.obo')),
+                         [])
+
+    def test_unsorted(self):
+        """Unsorted input without sorting is an error"""
+        self.assertRaises(ValueError, list,
+                          diffOBO('test/test2.obo', self.new, sort=False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from utils.oboexport import escapeField, formatRow, exportOBO, exportNames
+
+
+def unescapeField(field):
+    """Read a field back the way LOAD DATA INFILE does"""
+    if field == u'\\N':
+        return None
+    return re.sub(u'\\\\(.)', lambda m: {u't': u'\t', u'n': u'\n',
+                                         u'r': u'\r', u'0': u'\x00'}.get(
+                                             m.group(1), m.group(1)), field)
+
+
+def readRows(filename):
+    with io.open(filename, 'r', encoding='utf-8', newline='') as fb:
+        return [[unescapeField(f) for f in line.rstrip(u'\n').split(u'\t')]
+                for line in fb]
+
+
+class TestOBOExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_escape(self):
+        self.assertEqual(escapeField(None), u'\\N')
+        self.assertEqual(escapeField(u'N'), u'N')
+        self.assertEqual(escapeField(u'a\tb\nc\\d\re\x00'),
+                         u'a\\tb\\nc\\\\d\\re\\0')
+
+        row = [u'UMLS:C1', u'tab\there', None, u'back\\slash\\N', u'l1\nl2']
+        line = formatRow(row)
+        self.assertEqual(line.count(u'\t'), 4)
+        self.assertEqual(line.count(u'\n'), 1)
+        self.assertEqual([unescapeField(f) for f in
+                          line.rstrip(u'\n').split(u'\t')], row)
+
+    def test_export(self):
+        base = os.path.join(self.tmpdir, 'test2')
+        counts = exportOBO('test/test2.obo', base)
+        names = exportNames(base)
+        self.assertEqual(counts, {'concept': 6, 'synonym': 7,
+                                  'relationship': 6})
+
+        concepts = readRows(names['concept'])
+        self.assertEqual(len(concepts), 6)
+        self.assertEqual(concepts[0], [u'UMLS:C0000001',
+                                       u'Anatomical structure', None, None])
+        self.assertEqual(concepts[2][2:], [u'A hollow \\"muscular\\" organ.',
+                                           u'MSH:D006321'])
+
+        rels = readRows(names['relationship'])
+        self.assertTrue([u'UMLS:C0000003', u'part_of', u'UMLS:C0000005',
+                         u'Cardiovascular system'] in rels)
+        for row in readRows(names['synonym']):
+            self.assertEqual(len(row), 4)
+
+    def test_parallel(self):
+        """Chunked export writes the same files as a serial one"""
+        serial = exportNames(os.path.join(self.tmpdir, 'serial'))
+        parallel = exportNames(os.path.join(self.tmpdir, 'parallel'))
+        exportOBO('test/test2.obo', os.path.join(self.tmpdir, 'serial'))
+        counts = exportOBO('test/test2.obo',
+                           os.path.join(self.tmpdir, 'parallel'),
+                           processes=2, chunkSize=100)
+        self.assertEqual(counts['concept'], 6)
+        for table in serial:
+            with open(serial[table], 'rb') as s, \
+                    open(parallel[table], 'rb') as p:
+                self.assertEqual(s.read(), p.read())
+        self.assertEqual(len(os.listdir(self.tmpdir)), 6)
+
+if __name__ == '__main__':
+    unittest.main()
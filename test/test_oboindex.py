@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from utils.obo import OBOReader
+from utils.oboindex import OBOIndexReader, buildIndex, isIndexValid
+
+
+class TestOBOIndexReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'test2.obo')
+        shutil.copy('test/test2.obo', self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_build(self):
+        self.assertEqual(buildIndex(self.filename), 6)
+        self.assertTrue(isIndexValid(self.filename))
+
+    def test_iter(self):
+        """Index reader yields the same terms as OBOReader"""
+        with OBOReader(self.filename) as obo:
+            expected = [(t.id, t.name) for t in obo]
+
+        with OBOIndexReader(self.filename) as obo:
+            self.assertEqual([(t.id, t.name) for t in obo], expected)
+            self.assertEqual(len(obo), 6)
+
+    def test_get(self):
+        with OBOIndexReader(self.filename) as obo:
+            term = obo.get('UMLS:C0000003')
+            self.assertEqual(term.name, 'Heart')
+            self.assertEqual(term.relationship[0]['type'], 'part_of')
+            self.assertEqual(obo.get('FMA:67498').id, 'UMLS:C0000002')
+            self.assertEqual(obo.get('UMLS:XXX'), None)
+            self.assertTrue('UMLS:C0000006' in obo)
+
+    def test_terms(self):
+        """Batch lookup returns terms in file order without duplicates"""
+        with OBOIndexReader(self.filename) as obo:
+            ids = [t.id for t in obo.terms(['UMLS:C0000005', 'FMA:67498',
+                                            'UMLS:C0000002', 'UMLS:XXX'])]
+        self.assertEqual(ids, ['UMLS:C0000002', 'UMLS:C0000005'])
+
+    def test_invalidate(self):
+        """Index is rebuilt when the OBO file changes"""
+        OBOIndexReader(self.filename).close()
+        with open(self.filename, 'a') as fb:
+            fb.write('[Term]\nid: UMLS:C0000007\nname: Lung\n')
+        self.assertFalse(isIndexValid(self.filename))
+
+        with OBOIndexReader(self.filename) as obo:
+            self.assertEqual(obo.get('UMLS:C0000007').name, 'Lung')
+
+    def test_norebuild(self):
+        self.assertRaises(IOError, OBOIndexReader, self.filename,
+                          rebuild=False)
+
+if __name__ == '__main__':
+    unittest.main()
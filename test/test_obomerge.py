@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from utils.obo import OBOReader
+from utils.obomerge import mergeOBO, mergeTypedefs
+
+OTHER_OBO = """format-version: 1.2
+subsetdef: body "Anatomy"
+subsetdef: uberon_slim "Uberon slim"
+
+[Term]
+id: UMLS:C0000003
+name: heart
+subset: uberon_slim
+is_a: UMLS:C0000002 ! Organ
+is_a: UMLS:C0000008 ! Muscular organ
+synonym: "Cardiac Structure" EXACT [SNOMEDCT_US:80891009]
+synonym: "cor" RELATED [UBERON:0000948]
+xref: MSH:D006321
+xref: UBERON:0000948
+
+[Term]
+id: UMLS:C0000008
+name: Muscular organ
+relationship: has_part UMLS:C0000009 ! Muscle tissue
+
+[Term]
+id: UMLS:C0000000
+name: Entity
+
+[Typedef]
+id: part_of
+name: part of
+is_transitive: true
+is_a: overlaps
+"""
+
+
+class TestOBOMerge(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.other = os.path.join(self.tmpdir, 'other.obo')
+        with open(self.other, 'w') as fb:
+            fb.write(OTHER_OBO)
+        self.output = os.path.join(self.tmpdir, 'merged.obo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def merge(self, **kwargs):
+        count = mergeOBO(['test/test2.obo', self.other], self.output,
+                         **kwargs)
+        with OBOReader(self.output) as obo:
+            terms = list(obo)
+        self.assertEqual(count, len(terms))
+        return terms
+
+    def test_merge(self):
+        terms = self.merge(runSize=2, tmpdir=self.tmpdir)
+        ids = [t.id for t in terms]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 8)
+
+        heart = dict((t.id, t) for t in terms)['UMLS:C0000003']
+        self.assertEqual(heart.name, 'Heart')
+        self.assertEqual([s['name'] for s in heart.synonym],
+                         ['cardiac structure', 'heart', 'cor'])
+        self.assertEqual([i['code'] for i in heart.is_a],
+                         ['UMLS:C0000002', 'UMLS:C0000008'])
+        self.assertEqual([x['code'] for x in heart.xref],
+                         ['MSH:D006321', 'UBERON:0000948'])
+        self.assertEqual(heart.subset, ['body', 'uberon_slim'])
+        self.assertEqual(heart.defn['name'], 'A hollow \\"muscular\\" organ.')
+
+    def test_sorted_inputs(self):
+        """Sorted inputs are merged without the external sort"""
+        with open(self.other, 'w') as fb:
+            fb.write(OTHER_OBO.replace('UMLS:C0000000', 'UMLS:C0000010'))
+        terms = self.merge()
+        self.assertEqual(terms[-1].id, 'UMLS:C0000010')
+        self.assertEqual(len(terms), 8)
+
+    def test_stanzas(self):
+        self.merge()
+        with open(self.output) as fb:
+            text = fb.read()
+        self.assertEqual(text.count('subsetdef:'), 3)
+        self.assertTrue('[Typedef]\nid: part_of\nname: part_of\n'
+                        'xref: BFO:0000050\nis_transitive: true\n'
+                        'is_a: overlaps\n' in text)
+        self.assertTrue('[Typedef]\nid: has_part\nname: has_part\n' in text)
+
+    def test_typedefs(self):
+        merged = mergeTypedefs([[('id', 'a'), ('name', 'A')],
+                                [('id', 'a'), ('name', 'B'), ('xref', 'X')],
+                                [('name', 'no id')]], ['a', 'b'])
+        self.assertEqual(merged, [[('id', 'a'), ('name', 'A'),
+                                   ('xref', 'X')],
+                                  [('id', 'b'), ('name', 'b')]])
+
+if __name__ == '__main__':
+    unittest.main()
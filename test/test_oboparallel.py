@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from utils.obo import OBOReader
+from utils.oboparallel import ParallelOBOReader, chunkRanges
+
+
+def summary(term):
+    return (term.id, term.name, [s['name'] for s in term.synonym],
+            [i['code'] for i in term.is_a])
+
+
+class TestParallelOBOReader(unittest.TestCase):
+    def setUp(self):
+        with OBOReader('test/test2.obo') as obo:
+            self.expected = [summary(t) for t in obo]
+
+    def test_ranges(self):
+        """Ranges cover the whole file and start on [Term] lines"""
+        ranges = chunkRanges('test/test2.obo', 100)
+        self.assertTrue(len(ranges) > 1)
+        self.assertEqual(ranges[0][0], 0)
+        with open('test/test2.obo', 'rb') as fb:
+            data = fb.read()
+        self.assertEqual(ranges[-1][1], len(data))
+        for (s1, e1), (s2, e2) in zip(ranges[:-1], ranges[1:]):
+            self.assertEqual(e1, s2)
+            self.assertTrue(data[s2:].startswith('[Term]'))
+
+    def test_single(self):
+        with ParallelOBOReader('test/test2.obo', processes=1,
+                               chunkSize=100) as obo:
+            self.assertEqual([summary(t) for t in obo], self.expected)
+
+    def test_ordered(self):
+        with ParallelOBOReader('test/test2.obo', processes=2, chunkSize=100,
+                               window=2) as obo:
+            self.assertEqual([summary(t) for t in obo], self.expected)
+
+    def test_unordered(self):
+        with ParallelOBOReader('test/test2.obo', processes=2, chunkSize=100,
+                               ordered=False) as obo:
+            self.assertEqual(sorted(summary(t) for t in obo),
+                             sorted(self.expected))
+
+if __name__ == '__main__':
+    unittest.main()
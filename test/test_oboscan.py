@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import codecs
+import random
+import unittest
+from utils.obo import EntryParser
+from utils.oboscan import scanXref, scanDef, scanSyn, scanIsA, scanRel
+
+GRAMMARS = {
+    'xref': (EntryParser.XREF, scanXref),
+    'def': (EntryParser.DEF, scanDef),
+    'synonym': (EntryParser.SYN, scanSyn),
+    'is_a': (EntryParser.IS_A, scanIsA),
+    'relationship': (EntryParser.REL, scanRel),
+}
+
+ALPHABET = [u'"', u'\\', u' ', u'  ', u'\t', u'\n', u'[', u']', u'(', u')',
+            u'!', u'{', u'}', u'a', u'B', u':', u'EXACT', u'\xa0', u' ',
+            u'\x85', u'ç']
+
+
+def reference(regex, line):
+    m = regex.match(line)
+    return None if m is None else m.groups()
+
+
+class TestOBOScan(unittest.TestCase):
+    def check(self, entry, line):
+        regex, scanner = GRAMMARS[entry]
+        if u'{' in line and entry != 'xref':
+            # qualifiers are where the scanners improve on the regexes
+            return
+        self.assertEqual(scanner(line), reference(regex, line),
+                         '%s: %r' % (entry, line))
+
+    def test_corpus(self):
+        """Scanners match the regexes on the regression corpus"""
+        with codecs.open('test/entries.txt', 'r', 'utf-8') as fb:
+            for line in fb:
+                entry, value = line.rstrip(u'\n').split(u':', 1)
+                self.check(entry, value.strip())
+
+    def test_fuzz(self):
+        """Scanners match the regexes on random values"""
+        rnd = random.Random(20151019)
+        for i in xrange(20000):
+            line = u''.join(rnd.choice(ALPHABET)
+                            for j in xrange(rnd.randint(0, 16)))
+            if rnd.random() < 0.5:
+                line = u'"' + line
+            for entry in GRAMMARS:
+                self.check(entry, line)
+
+    def test_qualifiers(self):
+        self.assertEqual(scanSyn(u'"a" EXACT [X:1] {source="X:2"}'),
+                         (u'a', u'EXACT', u'X:1'))
+        self.assertEqual(scanSyn(u'"a" NARROW {source="a \\"b\\" c"}'),
+                         (u'a', u'NARROW', None))
+        self.assertEqual(scanDef(u'"d" [X:1] {source="PMID:123"}'),
+                         (u'd', u'X:1'))
+        self.assertEqual(scanIsA(u'UBERON:1 {source="FMA"} ! qualified'),
+                         (u'UBERON:1', u'qualified'))
+        self.assertEqual(scanRel(u'part_of UBERON:1 {a="}"} ! q'),
+                         (u'part_of', u'UBERON:1', u'q'))
+        self.assertEqual(scanIsA(u'UBERON:1 {unclosed ! x'),
+                         (u'UBERON:1', None))
+        self.assertEqual(scanDef(u'"d" [] {source="x{y"}'), (u'd', u''))
+        self.assertEqual(scanDef(u'"a {b}" [X:1] {source="x{y"}'),
+                         (u'a {b}', u'X:1'))
+        self.assertEqual(scanSyn(u'"a" EXACT {source="}{"}'),
+                         (u'a', u'EXACT', None))
+
+    def test_manyQualifiers(self):
+        """Any number of qualifiers before the comment"""
+        value = u'UBERON:1 ' + u'{source="FMA"} ' * 5000 + u'! many'
+        self.assertEqual(scanIsA(value), (u'UBERON:1', u'many'))
+        self.assertEqual(scanRel(u'part_of ' + value),
+                         (u'part_of', u'UBERON:1', u'many'))
+        self.assertEqual(scanIsA(u'UBERON:1 ' + u'{a} ' * 5000 + u'{b'),
+                         (u'UBERON:1', None))
+
+    def test_malformed(self):
+        """Lines the grammar does not match raise ValueError"""
+        fmt = EntryParser()
+        self.assertRaises(ValueError, fmt.syn, 'no quotes')
+        self.assertRaises(ValueError, fmt.defn, '""')
+        self.assertRaises(ValueError, fmt.rel, 'has_part')
+        self.assertRaises(ValueError, fmt.xref, '')
+
+    def test_long(self):
+        """Long values with many quotes parse"""
+        name = u'a \\"b\\" ' * 20000
+        syn = scanSyn(u'"%s" EXACT [X:1]' % name)
+        self.assertEqual(syn, (name, u'EXACT', u'X:1'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from utils.npstore import StringTable
+from utils.ontology import Ontology
+
+
+class TestOntology(unittest.TestCase):
+    def setUp(self):
+        self.onto = Ontology.fromOBO('test/test2.obo')
+
+    def ids(self, nodes):
+        return sorted(self.onto.ids[n] for n in nodes)
+
+    def test_malformed(self):
+        """A parse error is raised, not a partial ontology returned"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'broken.obo')
+            with open(filename, 'w') as f:
+                f.write(open('test/test2.obo').read())
+                f.write('\n[Term]\nid: X:1\nname: x\nsynonym: broken\n')
+            self.assertRaises(ValueError, Ontology.fromOBO, filename)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_tables(self):
+        self.assertEqual(len(self.onto), 6)
+        self.assertEqual(self.onto.ids[2], 'UMLS:C0000003')
+        self.assertEqual(self.onto.names[2], 'Heart')
+        self.assertEqual(self.onto.relTypes,
+                         ['is_a', 'part_of', 'finding_site_of'])
+
+    def test_parents(self):
+        nodes = self.onto.nodes(['UMLS:C0000003', 'UMLS:C0000001',
+                                 'UMLS:C0000004'])
+        owner, parents = self.onto.parents(nodes)
+        self.assertEqual(list(owner), [0, 2])
+        self.assertEqual(self.ids(parents), ['UMLS:C0000002',
+                                             'UMLS:C0000006'])
+
+        owner, parents = self.onto.parents(nodes, rel=None)
+        self.assertEqual(list(owner), [0, 0, 2, 2])
+
+        owner, parents = self.onto.parents(nodes, rel='part_of')
+        self.assertEqual(self.ids(parents), ['UMLS:C0000005'])
+
+    def test_children(self):
+        nodes = self.onto.nodes(['UMLS:C0000001'])
+        owner, children = self.onto.children(nodes)
+        self.assertEqual(self.ids(children), ['UMLS:C0000002',
+                                              'UMLS:C0000005'])
+
+    def test_roots_leaves(self):
+        self.assertEqual(self.ids(self.onto.roots()),
+                         ['UMLS:C0000001', 'UMLS:C0000006'])
+        self.assertEqual(self.ids(self.onto.leaves()),
+                         ['UMLS:C0000003', 'UMLS:C0000004', 'UMLS:C0000005'])
+
+    def test_depth(self):
+        self.assertEqual(list(self.onto.depth()), [0, 1, 2, 1, 1, 0])
+
+    def test_subsets(self):
+        self.assertEqual(list(self.onto.subsetMask('prob')),
+                         [False, False, False, True, False, True])
+        self.assertFalse(self.onto.subsetMask('gene').any())
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'test2.npz')
+            self.onto.save(filename)
+            onto = Ontology.load(filename)
+            self.assertTrue(isinstance(onto.parentIdx, np.memmap))
+            self.assertEqual(list(onto.ids), list(self.onto.ids))
+            self.assertEqual(onto.relTypes, self.onto.relTypes)
+            self.assertEqual(list(onto.depth()), list(self.onto.depth()))
+            self.assertEqual(list(onto.subsetMask('body')),
+                             list(self.onto.subsetMask('body')))
+            del onto
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestStringTable(unittest.TestCase):
+    def test_table(self):
+        table = StringTable.fromList([u'a', u'', u'\xe7ok'])
+        self.assertEqual(list(table), [u'a', u'', u'\xe7ok'])
+        self.assertEqual(table.index(u'\xe7ok'), 2)
+        self.assertEqual(table.index(u'x'), -1)
+        self.assertEqual(len(StringTable.fromList([])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import httplib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from test.umlsfixture import fixtureEngine, TUIS
+from utils.semTypes import INV_SEM_TYPES
+from utils.termservice import CachedResolver, LRUCache, OBOResolver, \
+    TermServer, UMLSResolver
+
+
+class TestUMLSResolver(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(self.tmpdir, 'umls.db')
+        fixtureEngine(filename, 5).dispose()
+        self.engine = create_engine('sqlite:///' + filename,
+                                    poolclass=QueuePool, pool_pre_ping=True,
+                                    connect_args={'check_same_thread': False})
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def test_connections(self):
+        """Connections are held only during a lookup, and lookups go on
+        after the pooled connections were dropped"""
+        resolver = UMLSResolver(self.engine, size=2)
+        try:
+            self.assertEqual(self.engine.pool.checkedout(), 0)
+            self.assertEqual(resolver.resolveMany(['C0000001'])['C0000001']
+                             ['name'], 'Concept 1')
+            self.assertEqual(self.engine.pool.checkedout(), 0)
+            self.engine.dispose()
+            self.assertEqual(resolver.resolveMany(['C0000002'])['C0000002']
+                             ['name'], 'Concept 2')
+        finally:
+            resolver.close()
+
+
+class TestTermService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        engine = fixtureEngine(os.path.join(cls.tmpdir, 'umls.db'), 10)
+        cls.resolver = CachedResolver(UMLSResolver(engine, size=2,
+                                                   suppress=['N']), 5)
+        cls.server = TermServer(('localhost', 0), cls.resolver)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.resolver.close()
+        shutil.rmtree(cls.tmpdir)
+
+    def request(self, method, path, body=None):
+        conn = httplib.HTTPConnection('localhost', self.server.server_port)
+        try:
+            conn.request(method, path, body)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def test_term(self):
+        status, term = self.request('GET', '/term/C0000003')
+        self.assertEqual(status, 200)
+        self.assertEqual(term['name'], 'Concept 3')
+        self.assertEqual(term['synonyms'], ['Synonym 3'])
+        self.assertEqual(term['tuis'], [TUIS[3]])
+        self.assertEqual(term['groups'], [INV_SEM_TYPES[TUIS[3]]])
+
+        status, body = self.request('GET', '/term/C0000099')
+        self.assertEqual(status, 404)
+        status, body = self.request('GET', '/nothing')
+        self.assertEqual(status, 404)
+
+    def test_batch(self):
+        status, body = self.request('POST', '/terms',
+                                    json.dumps(['C0000001', 'C0000002',
+                                                'C0000099']))
+        self.assertEqual(status, 200)
+        terms = body['terms']
+        self.assertEqual(sorted(terms), ['C0000001', 'C0000002', 'C0000099'])
+        self.assertEqual(terms['C0000002']['name'], 'Concept 2')
+        self.assertEqual(terms['C0000099'], None)
+
+        status, body = self.request('POST', '/terms',
+                                    json.dumps({'cuis': ['C0000001']}))
+        self.assertEqual(body['terms']['C0000001']['name'], 'Concept 1')
+
+        status, body = self.request('POST', '/terms', '{"cuis": 1}')
+        self.assertEqual(status, 400)
+        status, body = self.request('POST', '/terms', 'not json')
+        self.assertEqual(status, 400)
+
+    def test_concurrent(self):
+        results = []
+
+        def client(i):
+            cui = 'C%07d' % (i % 10 + 1)
+            results.append((cui, self.request('GET', '/term/' + cui)))
+
+        threads = [threading.Thread(target=client, args=(i,))
+                   for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), 20)
+        for cui, (status, term) in results:
+            self.assertEqual((status, term['cui']), (200, cui))
+
+        status, stats = self.request('GET', '/stats')
+        self.assertEqual(stats['size'], 5)
+        self.assertTrue(stats['hits'] > 0)
+
+    def test_lru(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_obo(self):
+        resolver = OBOResolver('test/test2.obo')
+        terms = resolver.resolveMany(['C0000002', 'C0000099'])
+        self.assertEqual(terms['C0000002']['synonyms'], [u'viscus'])
+        self.assertEqual(terms['C0000002']['groups'], [u'body'])
+        self.assertEqual(terms['C0000099'], None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from sqlalchemy import create_engine
+from utils.trigram import TrigramIndex, normalize, trigrams
+
+ENTRIES = [
+    (u'Alzheimer\'s disease', 'L0000001', 'C0002395'),
+    (u'Alzheimers', 'L0000002', 'C0002395'),
+    (u'Asthma', 'L0000003', 'C0004096'),
+    (u'Heart', 'L0000004', 'C0018787'),
+    (u'Heart disease', 'L0000005', 'C0018799'),
+    (u'Heart disease', 'L0000005', 'C0018799'),
+    (u'Caf\xe9 au lait spots', 'L0000006', 'C0221263'),
+]
+
+
+class TestTrigram(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.index = TrigramIndex.build(ENTRIES)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_trigrams(self):
+        self.assertEqual(normalize(u'Alzheimer\'s  Disease_'),
+                         u'alzheimer s disease')
+        self.assertEqual(len(trigrams(u'Asthma')), 6)
+        self.assertEqual(trigrams(u'aaaa'), trigrams(u'AAAA'))
+        self.assertEqual(trigrams(u'!!'), [])
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(len(self.index.lookup(u'alzeimers')), 1)
+        results = self.index.lookup(u'alzeimers', threshold=0.3)
+        self.assertEqual([r[1] for r in results],
+                         [u'Alzheimers', u'Alzheimer\'s disease'])
+        self.assertEqual(results[0][2:], (u'L0000002', u'C0002395'))
+        self.assertTrue(results[0][0] > results[1][0])
+
+        self.assertEqual(self.index.lookup(u'Asthma')[0][0], 1.0)
+        self.assertEqual(self.index.lookup(u'cafe au lait spots')[0][3],
+                         u'C0221263')
+        self.assertEqual(self.index.lookup(u'heart', limit=1),
+                         [(1.0, u'Heart', u'L0000004', u'C0018787')])
+        self.assertEqual(self.index.lookup(u'xyzzy'), [])
+        self.assertEqual(self.index.lookup(u''), [])
+
+    def test_threshold(self):
+        """Pruned lookups find what a scan of all strings finds"""
+        queries = [u'hart disease', u'alzheimer', u'asma', u'heart dis']
+        for query in queries:
+            grams = set(trigrams(query))
+            expected = []
+            for i, string in enumerate(self.index.strings):
+                other = set(trigrams(string))
+                score = 2.0 * len(grams & other) / (len(grams) + len(other))
+                if score >= 0.3:
+                    expected.append(string)
+            found = [r[1] for r in self.index.lookup(query, 0.3, 100)]
+            self.assertEqual(sorted(found), sorted(expected))
+
+    def test_save(self):
+        filename = os.path.join(self.tmpdir, 'trigrams.npz')
+        self.index.save(filename)
+        loaded = TrigramIndex.load(filename)
+        self.assertTrue(isinstance(loaded.postings, np.memmap))
+        self.assertEqual(loaded.lookup(u'alzeimers'),
+                         self.index.lookup(u'alzeimers'))
+
+    def test_db(self):
+        conn = create_engine('sqlite://').connect()
+        conn.execute('CREATE TABLE indexdata (LUI varchar(10), STR text, '
+                     'CUIS text)')
+        conn.execute("INSERT INTO indexdata VALUES ('L1', 'Asthma', "
+                     "'C0004096')")
+        index = TrigramIndex.fromDB(conn)
+        conn.close()
+        self.assertEqual(index.lookup(u'astma')[0][1:],
+                         (u'Asthma', u'L1', u'C0004096'))
+
+        index = TrigramIndex.fromOBO('test/test2.obo')
+        self.assertEqual(index.lookup(u'cardiak structur')[0][2:],
+                         (u'UMLS:C0000003', u'C0000003'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import generateOBO
+from test.umlsfixture import cui, fixtureEngine
+from utils.umls import UMLS
+from utils.umlsconcurrent import ConcurrentUMLS, gather
+
+
+class TestConcurrentUMLS(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.engine = fixtureEngine(os.path.join(cls.tmpdir, 'umls.db'), 20)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_methods(self):
+        with UMLS(self.engine) as umls, \
+                ConcurrentUMLS(self.engine, concurrency=3) as cumls:
+            cuis = [cui(i) for i in range(1, 21)]
+            self.assertEqual(gather([cumls.concept(c, suppress='N')
+                                     for c in cuis]),
+                             [umls.concept(c, suppress='N') for c in cuis])
+            self.assertEqual(gather([cumls.tuis(c) for c in cuis]),
+                             [umls.tuis(c) for c in cuis])
+            self.assertEqual(gather([cumls.relcuis(c, stype1='SCUI')
+                                     for c in cuis]),
+                             [umls.relcuis(c, stype1='SCUI') for c in cuis])
+            self.assertEqual(cumls.defn(cui(2)).get()['DEF'],
+                             u'Definition of concept 2')
+            self.assertEqual(cumls.defn(cui(3)).get(), None)
+            self.assertEqual(cumls.aui('A0000006').get()['CUI'], cui(2))
+            self.assertEqual(sorted(cumls.cuis(0, 100).get()), cuis)
+
+    def test_errors(self):
+        with ConcurrentUMLS(self.engine, concurrency=2) as cumls:
+            result = cumls.concept(cui(1), color='red')
+            self.assertRaises(AttributeError, result.get)
+            # the instance went back to the pool
+            self.assertEqual(len(cumls.concept(cui(1)).get()), 3)
+
+    def test_getTerm(self):
+        generateOBO.SABS = ['MSH', 'SNOMEDCT_US']
+        generateOBO.SUPPRESS = ['N']
+        generateOBO.LAT = ['ENG']
+        with UMLS(self.engine) as umls:
+            generateOBO.umls = umls
+            terms = []
+            for cumls in (None, ConcurrentUMLS(self.engine, concurrency=4)):
+                generateOBO.cumls = cumls
+                try:
+                    terms.append([generateOBO.processConcept(cui(i))
+                                  for i in range(1, 21)])
+                finally:
+                    if cumls is not None:
+                        cumls.close()
+                    generateOBO.cumls = None
+            generateOBO.umls = None
+
+        self.assertEqual(terms[0], terms[1])
+        term = terms[1][3]
+        self.assertEqual(term['name'], u'Concept 4')
+        self.assertEqual(term['def']['def'], u'Definition of concept 4')
+        self.assertEqual(term['is_a'], [u'UMLS:C0000003 ! Concept 3'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from utils.umlsmap import UMLSIndex, mapOBO
+
+MRCONSO = [
+    'C0000001|ENG|P|L1|PF|S1|Y|A1||||FMA|PT|62955|Anatomical entity|0|N||',
+    'C0000002|ENG|P|L2|PF|S2|Y|A2||||FMA|PT|67498|Organ|0|N||',
+    'C0000002|ENG|P|L2|PF|S3|Y|A3||||MSH|MH|D009929|Viscera|0|N||',
+    'C0000003|ENG|P|L3|PF|S4|Y|A4||||MSH|MH|D006321|Heart|0|N||',
+    'C0000033|ENG|P|L4|PF|S5|Y|A5||||MSH|MH|D006321|Hearts|0|O||',
+    'C0000003|ENG|P|L3|PF|S6|Y|A6||||NCI|PT|C12727|Heart|0|N||',
+    'C0007634|ENG|P|L5|PF|S7|Y|A7||||GO|PT|GO:0005623|cell|0|N||',
+    'C0000004|ENG|P|L6|PF|S8|Y|A8||||HPO|PT|HP:0000118|Phenotypic '
+    'abnormality|0|N||',
+]
+
+
+class TestUMLSMap(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.rrf = os.path.join(self.tmpdir, 'MRCONSO.RRF')
+        with open(self.rrf, 'w') as fb:
+            fb.write('\n'.join(MRCONSO) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookup(self):
+        index = UMLSIndex.fromRRF(self.rrf)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.lookup('FMA:62955'), ['C0000001'])
+        self.assertEqual(index.lookup('MESH:D006321'),
+                         ['C0000003', 'C0000033'])
+        self.assertEqual(index.lookup('NCIT:C12727'), ['C0000003'])
+        self.assertEqual(index.lookup('UMLS:C0000002'), ['C0000002'])
+        self.assertEqual(index.lookup('UMLS:C0000009'), [])
+        self.assertEqual(index.lookup('FMA:1'), [])
+        self.assertEqual(index.lookup('FMA'), [])
+
+        # GO and HPO codes carry their prefix in MRCONSO
+        self.assertEqual(index.lookup('GO:0005623'), ['C0007634'])
+        self.assertEqual(index.lookup('HP:0000118'), ['C0000004'])
+        self.assertEqual(index.lookup('GO:0000001'), [])
+
+    def test_prefixedCodes(self):
+        index = UMLSIndex().addRows([('C0007634', 'GO', 'GO:0005623'),
+                                     ('C0000004', 'HPO', 'HP:0000118')])
+        self.assertEqual(sorted(index.codes), ['GO:0005623', 'HP:0000118'])
+        self.assertEqual(index.lookup('GO:0005623'), ['C0007634'])
+        self.assertEqual(index.lookup('HP:0000118'), ['C0000004'])
+
+        index = UMLSIndex.fromRRF(self.rrf, sabs=['MSH'], suppress=['N'])
+        self.assertEqual(index.lookup('MSH:D006321'), ['C0000003'])
+        self.assertEqual(index.lookup('FMA:62955'), [])
+
+    def test_save(self):
+        filename = os.path.join(self.tmpdir, 'umls.idx')
+        UMLSIndex.fromRRF(self.rrf).save(filename)
+        index = UMLSIndex.load(filename)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.lookup('MSH:D006321'),
+                         ['C0000003', 'C0000033'])
+
+    def test_map(self):
+        base = os.path.join(self.tmpdir, 'test2')
+        counts = mapOBO('test/test2.obo', UMLSIndex.fromRRF(self.rrf), base)
+        self.assertEqual(counts, {'FMA': (4, 0), 'MSH': (2, 0),
+                                  'SNOMEDCT_US': (0, 1)})
+
+        with io.open(base + '_map.tsv', encoding='utf-8') as fb:
+            rows = [l.rstrip('\n').split('\t') for l in fb]
+        self.assertEqual(rows[0], ['UMLS:C0000001', 'xref', 'FMA:62955',
+                                   'C0000001'])
+        self.assertTrue(['UMLS:C0000003', 'xref', 'MSH:D006321',
+                         'C0000033'] in rows)
+        with io.open(base + '_unmapped.tsv', encoding='utf-8') as fb:
+            self.assertEqual(fb.read(), 'UMLS:C0000003\tsynonym\t'
+                             'SNOMEDCT_US:80891009\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Synthetic UMLS tables in SQLite for tests and benchmarks.
+
+Concept i has a preferred MSH atom, a SNOMEDCT_US synonym and a suppressed
+atom in MRCONSO, one semantic type, a definition if i is even, and an
+is_a relationship to concept i - 1.
+"""
+
+from sqlalchemy import create_engine
+
+from utils.semTypes import INV_SEM_TYPES
+
+TABLES = {
+    'MRCONSO': ['CUI', 'LAT', 'TS', 'LUI', 'STT', 'SUI', 'ISPREF', 'AUI',
+                'SAUI', 'SCUI', 'SDUI', 'SAB', 'TTY', 'CODE', 'STR', 'SRL',
+                'SUPPRESS', 'CVF'],
+    'MRSTY': ['CUI', 'TUI', 'STN', 'STY', 'ATUI', 'CVF'],
+    'MRDEF': ['CUI', 'AUI', 'ATUI', 'SATUI', 'SAB', 'DEF', 'SUPPRESS', 'CVF'],
+    'MRREL': ['CUI1', 'AUI1', 'STYPE1', 'REL', 'CUI2', 'AUI2', 'STYPE2',
+              'RELA', 'RUI', 'SRUI', 'SAB', 'SL', 'RG', 'DIR', 'SUPPRESS',
+              'CVF'],
+}
+
+TUIS = sorted(INV_SEM_TYPES)
+
+
+def cui(i):
+    return 'C%07d' % i
+
+
+def conceptName(i):
+    return u'Concept %d' % i
+
+
+def _rows(count):
+    conso, sty, defs, rels = [], [], [], []
+    for i in range(1, count + 1):
+        c = cui(i)
+        conso.append([c, 'ENG', 'P', 'L%07d' % i, 'PF', 'S%07d' % i, 'Y',
+                      'A%07d' % (3 * i), '', '', '', 'MSH', 'MH',
+                      'D%06d' % i, conceptName(i), '0', 'N', ''])
+        conso.append([c, 'ENG', 'S', 'L%07d' % (count + i), 'PF',
+                      'S%07d' % (count + i), 'N', 'A%07d' % (3 * i + 1), '',
+                      str(100000 + i), '', 'SNOMEDCT_US', 'PT',
+                      str(100000 + i), u'Synonym %d' % i, '9', 'N', ''])
+        conso.append([c, 'ENG', 'S', 'L%07d' % (2 * count + i), 'PF',
+                      'S%07d' % (2 * count + i), 'N', 'A%07d' % (3 * i + 2),
+                      '', '', '', 'MSH', 'ET', 'D%06d' % i,
+                      u'Obsolete %d' % i, '0', 'O', ''])
+        sty.append([c, TUIS[i % len(TUIS)], '', '', 'AT%07d' % i, ''])
+        if i % 2 == 0:
+            defs.append([c, 'A%07d' % (3 * i), 'AT%07d' % (count + i), '',
+                         'MSH', u'Definition of concept %d' % i, 'N', ''])
+        if i > 1:
+            rels.append([cui(i - 1), 'A%07d' % (3 * i - 3), 'SCUI', 'CHD', c,
+                         'A%07d' % (3 * i), 'SCUI', 'isa', 'R%07d' % i, '',
+                         'MSH', 'MSH', '', 'Y', 'N', ''])
+    return {'MRCONSO': conso, 'MRSTY': sty, 'MRDEF': defs, 'MRREL': rels}
+
+
+def createUMLS(conn, count=100, prefix=''):
+    """Create and fill the MRCONSO, MRSTY, MRDEF and MRREL tables, without
+    indexes"""
+    rows = _rows(count)
+    for table, columns in sorted(TABLES.items()):
+        name = prefix + table
+        conn.execute('CREATE TABLE %s (%s)' %
+                     (name, ', '.join('%s text' % c for c in columns)))
+        if rows[table]:
+            conn.execute('INSERT INTO %s VALUES (%s)' %
+                         (name, ', '.join('?' * len(columns))),
+                         rows[table])
+
+
+def fixtureEngine(filename, count=100, prefix=''):
+    """Engine of a SQLite file holding the fixture tables. Connections may
+    be used from other threads than the one that opened them."""
+    engine = create_engine('sqlite:///' + filename,
+                           connect_args={'check_same_thread': False})
+    conn = engine.connect()
+    try:
+        createUMLS(conn, count, prefix)
+    finally:
+        conn.close()
+    return engine
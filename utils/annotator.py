@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Dictionary based concept annotator
+
+Term names and synonyms are normalized into token sequences and stored in
+a token trie of nested dicts, a terminal node holding the concept ids of
+the names ending there under the '' key, which no token can be. Text is
+tokenized the same way and scanned left to right; at every token the trie
+is walked as far as it goes and the longest name found is taken, so the
+matches are the leftmost longest ones and never overlap.
+
+The trie is made of dicts, tuples and strings only and is saved with
+marshal. The garbage collector is paused while it is loaded, as its passes
+over the millions of new dicts otherwise take most of the load time.
+Worker processes of annotateDocs() each load the saved file once.
+
+Concept ids are the term ids of the OBO file, with the UMLS: prefix of
+generated OBO files dropped, i.e. CUIs.
+
+Typical usage:
+     annotator = Annotator.fromOBO('umls.obo', plurals=True)
+     for start, end, cuis in annotator.annotate(text):
+         print text[start:end], cuis
+
+Created on   : 2026-10-19
+"""
+
+import gc
+import marshal
+import re
+from itertools import islice
+from multiprocessing import Pool
+
+from .indexdata import keysetRows
+from .obo import OBOReader
+
+FORMAT = 1
+BATCH_SIZE = 1000
+UMLS_PREFIX = 'UMLS:'
+
+_WORD = re.compile(r'\w+', re.U)
+_TOKEN = re.compile(r'\w+|[^\w\s]', re.U)
+
+# key of the concept ids in a terminal trie node
+_IDS = u''
+
+
+def singular(token):
+    """Strip a regular English plural ending off a token"""
+    if len(token) <= 3:
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+class Annotator(object):
+    """Longest match annotator over a token trie"""
+    def __init__(self, lower=True, punctuation=False, plurals=False):
+        """
+        :lower: fold case
+        :punctuation: keep punctuation tokens; otherwise they are skipped,
+                in names and in text alike
+        :plurals: strip regular plural endings
+        """
+        self.options = {'lower': lower, 'punctuation': punctuation,
+                        'plurals': plurals}
+        self.trie = {}
+        self.tokenRe = _TOKEN if punctuation else _WORD
+        self.lower = lower
+        self.plurals = plurals
+
+    def __len__(self):
+        """Number of distinct names"""
+        count = 0
+        stack = [self.trie]
+        while stack:
+            node = stack.pop()
+            for key, value in node.iteritems():
+                if key == _IDS:
+                    count += 1
+                else:
+                    stack.append(value)
+        return count
+
+    def tokens(self, text):
+        """List the (start, end, normalized token) tuples of text. Case
+        folding keeps the length of unicode text, so offsets hold."""
+        if self.lower:
+            text = text.lower()
+        matches = self.tokenRe.finditer(text)
+        if self.plurals:
+            return [(m.start(), m.end(), singular(m.group()))
+                    for m in matches]
+        return [(m.start(), m.end(), m.group()) for m in matches]
+
+    def add(self, name, cid):
+        """Add a name of concept cid"""
+        node = self.trie
+        found = False
+        for start, end, token in self.tokens(name):
+            node = node.setdefault(token, {})
+            found = True
+        if found:
+            ids = node.get(_IDS, ())
+            if cid not in ids:
+                node[_IDS] = ids + (cid,)
+        return self
+
+    def addTerms(self, terms):
+        """Add the names and synonyms of OBOTerm objects"""
+        for term in terms:
+            cid = term.id
+            if cid.startswith(UMLS_PREFIX):
+                cid = cid[len(UMLS_PREFIX):]
+            if term.name:
+                self.add(term.name, cid)
+            for synonym in term.synonym:
+                self.add(synonym['name'], cid)
+        return self
+
+    def addRows(self, rows):
+        """Add (STR, CUIS) rows of indexdata"""
+        for string, cuis in rows:
+            for cui in cuis.split(','):
+                self.add(string, str(cui))
+        return self
+
+    def annotate(self, text):
+        """Find the leftmost longest names in text
+
+        :returns: list of (start, end, concept ids) tuples
+        """
+        tokens = self.tokens(text)
+        matches = []
+        trie = self.trie
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = trie.get(tokens[i][2])
+            best = None
+            j = i + 1
+            while node is not None:
+                if _IDS in node:
+                    best = j, node[_IDS]
+                if j == n:
+                    break
+                node = node.get(tokens[j][2])
+                j += 1
+            if best is None:
+                i += 1
+            else:
+                end, ids = best
+                matches.append((tokens[i][0], tokens[end - 1][1], ids))
+                i = end
+        return matches
+
+    def save(self, filename):
+        with open(filename, 'wb') as fb:
+            marshal.dump((FORMAT, self.options, self.trie), fb)
+
+    @classmethod
+    def load(cls, filename):
+        gc.disable()
+        try:
+            with open(filename, 'rb') as fb:
+                fmt, options, trie = marshal.load(fb)
+        finally:
+            gc.enable()
+        if fmt != FORMAT:
+            raise ValueError('Unsupported annotator format %s in %s' %
+                             (fmt, filename))
+        annotator = cls(**options)
+        annotator.trie = trie
+        return annotator
+
+    @classmethod
+    def fromOBO(cls, filename, **options):
+        """Build an annotator from the names and synonyms of an OBO file"""
+        with OBOReader(filename) as obo:
+            return cls(**options).addTerms(obo)
+
+    @classmethod
+    def fromDB(cls, conn, **options):
+        """Build an annotator from the STR and CUIS columns of indexdata"""
+        rows = keysetRows(conn, columns='LUI, STR, CUIS')
+        return cls(**options).addRows((r['STR'], r['CUIS']) for r in rows)
+
+
+_annotator = None
+
+
+def _init(filename):
+    global _annotator
+    _annotator = Annotator.load(filename)
+
+
+def _annotateBatch(docs):
+    return [_annotator.annotate(doc) for doc in docs]
+
+
+def _batches(docs, batchSize):
+    docs = iter(docs)
+    while True:
+        batch = list(islice(docs, batchSize))
+        if not batch:
+            return
+        yield batch
+
+
+def annotateDocs(filename, docs, processes=1, batchSize=BATCH_SIZE):
+    """Annotate documents with a saved annotator in a process pool
+
+    :filename: annotator saved with Annotator.save()
+    :docs: iterable of unicode documents
+    :processes: number of worker processes, 1 to annotate in process
+    :batchSize: documents sent to a worker at a time
+    :returns: a generator of annotate() results, in document order
+    """
+    if processes == 1:
+        annotator = Annotator.load(filename)
+        for doc in docs:
+            yield annotator.annotate(doc)
+        return
+
+    pool = Pool(processes, _init, (filename,))
+    try:
+        for results in pool.imap(_annotateBatch, _batches(docs, batchSize)):
+            for result in results:
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Subsets of the UMLS tables
+
+Builds the BIO_ subsets of MRCONSO, MRREL, MRSTY and MRDEF that
+generateOBO.py reads with --prefix BIO_, replacing
+scripts/preparebiodata.sql:
+
+     MRCONSO  atoms of the sources, languages and suppress flags
+     MRREL    relationships of the sources and suppress flags, but the
+              ones of a concept to itself
+     MRSTY    semantic types of the MRCONSO concepts
+     MRDEF    the shortest definition of each MRCONSO concept, of any
+              source, the first by ATUI of equally long ones
+
+The filters are IN lists of bound values, which the indexes of the UMLS
+tables serve, and the rows are inserted in CUI order (CUI2 for MRREL, the
+column of its lookups), so the rows of a concept are stored together.
+Each table is first built under a staging name with the indexes of
+indexadvisor.REQUIRED; MRCONSO and MRREL are built concurrently, then
+MRSTY and MRDEF, which read the staged MRCONSO. At the end all of them
+replace the live tables in one RENAME TABLE on MySQL, which is atomic,
+or in one transaction of renames elsewhere. Index names carry the
+staging name, so they never clash with the ones of the tables they
+replace.
+
+Typical usage:
+     prepare(engine, sabs=['MSH', 'GO'], suppress=['N'], lat=['ENG'],
+             prefix='BIO_', concurrency=2)
+
+Created on   : 2026-10-19
+"""
+
+import logging
+import time
+from multiprocessing.pool import ThreadPool
+
+from sqlalchemy import bindparam, inspect, text
+
+from .indexadvisor import createIndexes, IndexAdvice, MISSING, REQUIRED
+
+# table: (filter, order), filters bind :sabs, :suppress and :lat, and
+# name {source}, the source table, and {conso}, the staged MRCONSO
+TABLES = {
+    'MRCONSO': ('SAB IN :sabs AND SUPPRESS IN :suppress AND LAT IN :lat',
+                'CUI'),
+    'MRREL': ('SAB IN :sabs AND SUPPRESS IN :suppress AND CUI1 <> CUI2',
+              'CUI2'),
+    'MRSTY': ('CUI IN (SELECT DISTINCT CUI FROM {conso})', 'CUI'),
+    'MRDEF': ('ATUI IN (SELECT (SELECT d.ATUI FROM {source} d '
+              'WHERE d.CUI = c.CUI ORDER BY LENGTH(d.DEF), d.ATUI LIMIT 1) '
+              'FROM (SELECT DISTINCT CUI FROM {conso}) c)', 'CUI'),
+}
+
+# tables of each phase are built concurrently
+PHASES = [['MRCONSO', 'MRREL'], ['MRSTY', 'MRDEF']]
+
+CONCURRENCY = 2
+
+
+def buildTable(engine, table, source, staging, conso, params):
+    """Create staging from the rows of source and index it
+
+    :table: UMLS table name, a key of TABLES
+    :conso: name of the staged MRCONSO
+    :params: dict of the sabs, suppress and lat lists
+    :returns: number of rows
+    """
+    where, order = TABLES[table]
+    sql = text('CREATE TABLE %s AS SELECT * FROM %s WHERE %s ORDER BY %s' %
+               (staging, source, where.format(source=source, conso=conso),
+                order))
+    binds = dict((k, v) for k, v in params.iteritems()
+                 if ':%s' % k in where)
+    sql = sql.bindparams(*[bindparam(k, expanding=True) for k in binds])
+
+    start = time.time()
+    conn = engine.connect()
+    try:
+        conn.execute(sql, **binds)
+        count = conn.execute('SELECT COUNT(*) FROM %s' % staging).scalar()
+        logging.info('%s: %d rows in %.1fs', staging, count,
+                     time.time() - start)
+
+        advice = [IndexAdvice(staging, columns)
+                  for name, columns in REQUIRED if name == table]
+        for item in advice:
+            item.status = MISSING
+        createIndexes(conn, advice)
+        logging.info('%s: indexed in %.1fs', staging, time.time() - start)
+        return count
+    finally:
+        conn.close()
+
+
+def swapTables(conn, pairs):
+    """Replace tables by others
+
+    :pairs: list of (new, live) table names; live tables that exist are
+            dropped, the new ones renamed to their names
+    """
+    existing = set(t.upper() for t in inspect(conn).get_table_names())
+    renames = []
+    drops = []
+    for new, live in pairs:
+        if live.upper() in existing:
+            old = new + '_OLD'
+            renames.append((live, old))
+            drops.append(old)
+        renames.append((new, live))
+
+    if conn.dialect.name == 'mysql':
+        conn.execute('RENAME TABLE ' + ', '.join('%s TO %s' % r
+                                                 for r in renames))
+    else:
+        with conn.begin():
+            for name, to in renames:
+                conn.execute('ALTER TABLE %s RENAME TO %s' % (name, to))
+    for old in drops:
+        conn.execute('DROP TABLE %s' % old)
+
+
+def dropTables(conn, tables):
+    existing = set(t.upper() for t in inspect(conn).get_table_names())
+    for table in tables:
+        if table.upper() in existing:
+            conn.execute('DROP TABLE %s' % table)
+
+
+def stagingPrefix(conn, prefix):
+    """Tablename prefix of the staging tables, one that no table or index
+    name starts with"""
+    insp = inspect(conn)
+    names = []
+    for table in insp.get_table_names():
+        names.append(table.upper())
+        names.extend(index['name'].upper()
+                     for index in insp.get_indexes(table))
+    stamp = '%sNEW%s' % (prefix, time.strftime('%Y%m%d%H%M%S'))
+    staging = stamp + '_'
+    n = 0
+    while any(name.startswith(staging.upper()) or
+              name.startswith('X_' + staging.upper()) for name in names):
+        n += 1
+        staging = '%s%d_' % (stamp, n)
+    return staging
+
+
+def prepare(engine, sabs, suppress, lat, prefix='BIO_', source='',
+            concurrency=CONCURRENCY):
+    """Build the prefix subsets of the source UMLS tables and swap them in
+
+    :engine: sqlalchemy engine of the UMLS database
+    :sabs, suppress, lat: lists of the values to keep
+    :prefix: tablename prefix of the subsets
+    :source: umls tablename prefix of the source tables
+    :concurrency: tables built at a time, 1 on SQLite which has a single
+                  writer
+    :returns: dict of the number of rows of each table
+    """
+    if engine.dialect.name == 'sqlite':
+        concurrency = 1
+    conn = engine.connect()
+    try:
+        staging = stagingPrefix(conn, prefix)
+    finally:
+        conn.close()
+    params = {'sabs': sabs, 'suppress': suppress, 'lat': lat}
+    conso = staging + 'MRCONSO'
+
+    tables = [t for phase in PHASES for t in phase]
+    counts = {}
+    pool = ThreadPool(concurrency)
+    try:
+        for phase in PHASES:
+            results = [(table, pool.apply_async(
+                        buildTable, (engine, table, source + table,
+                                     staging + table, conso, params)))
+                       for table in phase]
+            # wait for the whole phase before raising
+            for table, result in results:
+                result.wait()
+            for table, result in results:
+                counts[table] = result.get()
+    finally:
+        pool.close()
+        pool.join()
+        conn = engine.connect()
+        try:
+            if len(counts) == len(tables):
+                swapTables(conn, [(staging + t, prefix + t) for t in tables])
+            else:
+                dropTables(conn, [staging + t for t in tables])
+        finally:
+            conn.close()
+    return counts
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Diagnostics collector
+
+Counts recurring events of a long run, e.g. missing concepts or
+unhandled relationships, by category and by a key of the category, e.g.
+(REL, RELA, SAB), instead of logging each of them. Messages are a format
+and its arguments, formatted only when logged or reported. Each category
+keeps a bounded random sample of them, and live logging is rate limited
+to one message per category and interval, which tells how many were
+left out since the previous one. summary() reports all of it at the end.
+
+Not thread safe: record from a single thread.
+
+Typical usage:
+     diagnostics = Diagnostics(sampleSize=20, logInterval=10)
+     diagnostics.record('missing concept', (sab,), 'No concept for %s', cui)
+     print diagnostics.summary()
+
+Created on   : 2026-10-19
+"""
+
+import logging
+import random
+import time
+from collections import Counter
+
+SAMPLE_SIZE = 20
+TOP_KEYS = 20
+
+
+class Diagnostics(object):
+    """Counts, samples and rate limited logging of events"""
+    def __init__(self, sampleSize=SAMPLE_SIZE, logInterval=None,
+                 logger=None):
+        """
+        :sampleSize: examples kept per category
+        :logInterval: minimum seconds between two messages of a category
+                      in the log, None to log nothing while running
+        :logger: logger of the live messages, the root logger by default
+        """
+        self.sampleSize = sampleSize
+        self.logInterval = logInterval
+        self.logger = logger or logging.getLogger()
+        self.counts = {}
+        self.totals = Counter()
+        self.samples = {}
+        self.lastLog = {}
+        self.unlogged = Counter()
+        self.random = random.Random(0)
+
+    def __len__(self):
+        return sum(self.totals.itervalues())
+
+    def record(self, category, key=(), msg=None, *args, **attr):
+        """Count an event of category
+
+        :key: tuple the events of the category are counted by
+        :msg, args: message of the event, formatted as msg % args if it
+                    is logged or sampled
+        :level: logging level of the live message, WARNING by default
+        """
+        if category not in self.counts:
+            self.counts[category] = Counter()
+            self.samples[category] = []
+        self.counts[category][key] += 1
+        self.totals[category] += 1
+        if msg is None:
+            return
+
+        # reservoir sample of the messages of the category
+        n = self.totals[category]
+        sample = self.samples[category]
+        if len(sample) < self.sampleSize:
+            sample.append((msg, args))
+        else:
+            i = self.random.randrange(n)
+            if i < self.sampleSize:
+                sample[i] = (msg, args)
+
+        if self.logInterval is not None:
+            self._log(category, attr.get('level', logging.WARNING), msg, args)
+
+    def _log(self, category, level, msg, args):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.time()
+        last = self.lastLog.get(category)
+        if last is not None and now - last < self.logInterval:
+            self.unlogged[category] += 1
+            return
+        self.lastLog[category] = now
+        skipped = self.unlogged.pop(category, 0)
+        if skipped:
+            self.logger.log(level, '%s: ' + msg + ' (%d more since)',
+                            category, *(args + (skipped,)))
+        else:
+            self.logger.log(level, '%s: ' + msg, category, *args)
+
+    def summary(self, top=TOP_KEYS):
+        """Text report of the counts of each category, by key for the top
+        keys, and of the sampled messages"""
+        lines = []
+        for category, total in self.totals.most_common():
+            lines.append('%s: %d' % (category, total))
+            counts = self.counts[category]
+            for key, count in counts.most_common(top):
+                if key:
+                    lines.append('    %8d  %s' %
+                                 (count, ' '.join(str(k) for k in key)))
+            if len(counts) > top:
+                lines.append('    %d more keys' % (len(counts) - top))
+            if self.samples[category]:
+                lines.append('  examples:')
+                for msg, args in self.samples[category]:
+                    lines.append('    ' + msg % args)
+        return '\n'.join(lines)
+
+    def write(self, filename, top=TOP_KEYS):
+        """Write summary() to filename"""
+        with open(filename, 'w') as f:
+            f.write(self.summary(top).encode('utf-8'))
+            f.write('\n')
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Elasticsearch index rebuilds behind an alias
+
+A rebuild loads a new, timestamped index while searches keep going to
+the index the alias points to. The new index is created with refreshes
+disabled and no replicas, which is much faster for a bulk load. After
+the load the settings are restored, the index is merged down to one
+segment, and the alias is moved to it in a single atomic update. The
+previous indices are kept for rollback.
+
+Typical usage:
+     def load(name):
+         return bulkIndex(es, actions(name))
+     name, old = rebuildIndex(es, 'library', load)
+
+Created on   : 2026-10-19
+"""
+
+from datetime import datetime
+
+from elasticsearch.exceptions import NotFoundError
+
+BULK_SETTINGS = {'refresh_interval': '-1', 'number_of_replicas': 0}
+REFRESH_INTERVAL = '1s'
+
+
+def timestampedName(alias, now=None):
+    """Name of a new index for alias, e.g. library_20261019120000"""
+    return '%s_%s' % (alias, (now or datetime.now()).strftime('%Y%m%d%H%M%S'))
+
+
+def aliasedIndices(es, alias):
+    """Names of the indices alias points to"""
+    try:
+        return sorted(es.indices.get_alias(name=alias))
+    except NotFoundError:
+        return []
+
+
+def createIndex(es, name, body=None):
+    """Create an index with bulk load settings
+
+    :body: index settings and mappings, the settings are merged with
+            BULK_SETTINGS
+    """
+    body = dict(body or {})
+    settings = dict(body.get('settings', {}))
+    settings.update(BULK_SETTINGS)
+    body['settings'] = settings
+    es.indices.create(index=name, body=body)
+
+
+def finishIndex(es, name, replicas=1, refresh=REFRESH_INTERVAL,
+                segments=1):
+    """Restore search settings after a bulk load and merge the segments.
+    Elasticsearch 1.x calls the force merge optimize."""
+    es.indices.put_settings(index=name, body={
+        'index': {'refresh_interval': refresh,
+                  'number_of_replicas': replicas}})
+    es.indices.refresh(index=name)
+    es.indices.optimize(index=name, max_num_segments=segments)
+
+
+def checkAlias(es, alias):
+    """Raise ValueError if alias names a concrete index
+
+    :returns: names of the indices alias points to
+    """
+    indices = aliasedIndices(es, alias)
+    if not indices and es.indices.exists(index=alias):
+        raise ValueError('%s is an index, not an alias; delete it or '
+                         'choose another alias name' % alias)
+    return indices
+
+
+def swapAlias(es, alias, name):
+    """Point alias at name only, in one atomic update
+
+    :returns: names of the indices alias pointed to before
+    """
+    old = [index for index in checkAlias(es, alias) if index != name]
+
+    actions = [{'remove': {'index': index, 'alias': alias}} for index in old]
+    actions.append({'add': {'index': name, 'alias': alias}})
+    es.indices.update_aliases(body={'actions': actions})
+    return old
+
+
+def rebuildIndex(es, alias, load, body=None, replicas=1,
+                 refresh=REFRESH_INTERVAL, maxFailed=0, now=None):
+    """Build a new index for alias and swap the alias to it
+
+    :load: function loading documents into the index named by its
+            argument, returning esbulk.BulkStats
+    :body: index settings and mappings
+    :replicas: number of replicas after the load
+    :refresh: refresh interval after the load
+    :maxFailed: maximum number of failed documents to still swap the alias
+    :returns: (new index name, previous index names); the previous names
+            are None if the alias was not swapped
+    :raises ValueError: before creating the new index, if alias is the
+            name of an index
+    """
+    checkAlias(es, alias)
+    name = timestampedName(alias, now)
+    createIndex(es, name, body)
+    try:
+        stats = load(name)
+    except:
+        # no half loaded index left behind with bulk settings
+        es.indices.delete(index=name)
+        raise
+    finishIndex(es, name, replicas, refresh)
+    if stats.failed > maxFailed:
+        return name, None
+    return name, swapAlias(es, alias, name)
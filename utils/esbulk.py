@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Elasticsearch bulk indexing
+
+Actions, in the format of elasticsearch.helpers, are serialized once into
+_bulk NDJSON lines and grouped into requests limited by both the number of
+actions and the body size. Failed items, and whole requests failing with a
+transport error, are counted and sampled into BulkStats instead of
+aborting the run. Requests and items rejected with 429 (a full bulk queue
+on the cluster) are retried with exponential backoff.
+
+ParallelBulkIndexer sends requests from a pool of threads. The calling
+thread reads the actions into batches and hands them to the workers
+through a bounded queue, so a slow cluster blocks the reader instead of
+filling the memory. The batch size adapts to the observed request
+latency.
+
+Typical usage:
+     actions = ({'_index': 'terms', '_type': 'term', '_source': doc}
+                for doc in docs)
+     stats = bulkIndex(es, actions, chunkSize=1000)
+     print stats.report()
+
+     stats = ParallelBulkIndexer(es, threads=4).index(actions)
+
+Created on   : 2026-10-19
+"""
+
+import json
+import logging
+import threading
+import time
+from itertools import islice
+from Queue import Queue
+
+from elasticsearch.exceptions import TransportError
+from elasticsearch.helpers import expand_action
+
+CHUNK_SIZE = 500
+MAX_CHUNK_BYTES = 10 * 1024 * 1024
+MAX_ERRORS = 100
+MAX_RETRIES = 5
+BACKOFF = 0.5
+TARGET_LATENCY = 2.0
+REJECTED = 429
+
+
+def actionLines(action):
+    """Serialize an action into its _bulk NDJSON lines"""
+    meta, source = expand_action(action)
+    lines = json.dumps(meta, separators=(',', ':')) + '\n'
+    if source is not None:
+        lines += json.dumps(source, separators=(',', ':')) + '\n'
+    return lines
+
+
+def chunkActions(actions, chunkSize=CHUNK_SIZE, maxBytes=MAX_CHUNK_BYTES):
+    """Group actions into lists of serialized actions with at most chunkSize
+    actions and maxBytes bytes each. An action larger than maxBytes is sent
+    on its own. Actions given as str are taken as already serialized."""
+    chunk = []
+    size = 0
+    for action in actions:
+        if isinstance(action, str):
+            lines = action
+        else:
+            lines = actionLines(action)
+        if chunk and (len(chunk) >= chunkSize or size + len(lines) > maxBytes):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(lines)
+        size += len(lines)
+
+    if chunk:
+        yield chunk
+
+
+class BulkStats(object):
+    """Counts of indexed and failed items, with the first maxErrors errors.
+    Safe to update from several threads."""
+    def __init__(self, maxErrors=MAX_ERRORS, keepIds=False):
+        """
+        :maxErrors: number of errors to keep
+        :keepIds: keep the (op type, _id) of succeeded items, see
+                popSucceeded()
+        """
+        self.success = 0
+        self.failed = 0
+        self.rejected = 0
+        self.errors = []
+        self.maxErrors = maxErrors
+        self.succeeded = [] if keepIds else None
+        self.start = time.time()
+        self.lock = threading.Lock()
+
+    def addSuccess(self, count=1):
+        with self.lock:
+            self.success += count
+
+    def popSucceeded(self):
+        """(op type, _id) of the items succeeded since the last call"""
+        with self.lock:
+            succeeded, self.succeeded = self.succeeded, []
+        return succeeded
+
+    def addRejected(self, count=1):
+        """Count items rejected with 429, whether retried or not"""
+        with self.lock:
+            self.rejected += count
+
+    def addError(self, error):
+        with self.lock:
+            self.failed += 1
+            if len(self.errors) < self.maxErrors:
+                self.errors.append(error)
+
+    def addItem(self, item):
+        """Count a _bulk response item. Deleting a missing document counts
+        as a success."""
+        opType, info = item.items()[0]
+        status = info.get('status', 500)
+        if 200 <= status < 300 or (opType == 'delete' and status == 404):
+            with self.lock:
+                self.success += 1
+                if self.succeeded is not None:
+                    self.succeeded.append((opType, info.get('_id')))
+        else:
+            self.addError({'op': opType, 'id': info.get('_id'),
+                           'status': info.get('status'),
+                           'error': info.get('error')})
+
+    def rate(self):
+        """Indexed documents per second"""
+        elapsed = time.time() - self.start
+        return self.success / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        lines = ['indexed : %d (%.1f docs/sec)' % (self.success, self.rate()),
+                 'rejected: %d' % self.rejected,
+                 'failed  : %d' % self.failed]
+        for error in self.errors:
+            lines.append('  %(op)s %(id)s [%(status)s] %(error)s' % error)
+        if self.failed > len(self.errors):
+            lines.append('  ... %d more' % (self.failed - len(self.errors)))
+        return '\n'.join(lines)
+
+
+def _actionId(lines):
+    meta = json.loads(lines[:lines.index('\n')])
+    opType, info = meta.items()[0]
+    return opType, info.get('_id')
+
+
+def _itemStatus(item):
+    return item.values()[0].get('status', 500)
+
+
+def _bulkArgs(index, doctype):
+    """Default index and type arguments of client.bulk()"""
+    kwargs = {}
+    if index is not None:
+        kwargs['index'] = index
+    if doctype is not None:
+        kwargs['doc_type'] = doctype
+    return kwargs
+
+
+def sendChunk(client, chunk, stats, maxRetries=MAX_RETRIES, backoff=BACKOFF,
+              index=None, doctype=None):
+    """Send a chunk of serialized actions, counting the results in stats.
+    Requests and items rejected with 429 are resent after backoff seconds,
+    doubling the wait each time, at most maxRetries times. index and doctype
+    are the defaults for actions without _index and _type."""
+    kwargs = _bulkArgs(index, doctype)
+    for retry in range(maxRetries + 1):
+        last = retry == maxRetries
+        try:
+            resp = client.bulk(body=''.join(chunk), **kwargs)
+        except TransportError as e:
+            if e.status_code == REJECTED:
+                stats.addRejected(len(chunk))
+                if not last:
+                    time.sleep(backoff * 2 ** retry)
+                    continue
+            for lines in chunk:
+                opType, _id = _actionId(lines)
+                stats.addError({'op': opType, 'id': _id,
+                                'status': e.status_code, 'error': str(e)})
+            return
+
+        rejected = []
+        for lines, item in zip(chunk, resp['items']):
+            if _itemStatus(item) == REJECTED:
+                stats.addRejected()
+                if not last:
+                    rejected.append(lines)
+                    continue
+            stats.addItem(item)
+
+        if not rejected:
+            return
+        chunk = rejected
+        time.sleep(backoff * 2 ** retry)
+
+
+def bulkIndex(client, actions, chunkSize=CHUNK_SIZE,
+              maxBytes=MAX_CHUNK_BYTES, stats=None, maxRetries=MAX_RETRIES,
+              backoff=BACKOFF, index=None, doctype=None):
+    """Send actions to client in _bulk requests
+
+    :client: Elasticsearch client
+    :actions: iterable of actions, see elasticsearch.helpers.streaming_bulk
+    :chunkSize: maximum number of actions per request
+    :maxBytes: maximum request body size in bytes
+    :stats: BulkStats to count the results in, a new one if None
+    :maxRetries: number of times rejected items are resent
+    :backoff: seconds to wait before the first retry
+    :index: default index of actions without _index
+    :doctype: default type of actions without _type
+    :returns: BulkStats
+    """
+    if stats is None:
+        stats = BulkStats()
+
+    for chunk in chunkActions(actions, chunkSize, maxBytes):
+        sendChunk(client, chunk, stats, maxRetries, backoff, index, doctype)
+
+    return stats
+
+
+class ChunkSizer(object):
+    """Adapts the number of actions per request to the request latency.
+    The size grows by a quarter while requests take less than half the
+    target latency, and halves when they take longer than the target."""
+    def __init__(self, size=CHUNK_SIZE, minSize=50, maxSize=10000,
+                 target=TARGET_LATENCY):
+        self.size = size
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.target = target
+        self.lock = threading.Lock()
+
+    def update(self, latency, count):
+        with self.lock:
+            if latency > self.target:
+                self.size = max(self.minSize, min(self.size, count) // 2)
+            elif latency < self.target / 2 and count >= self.size:
+                self.size = min(self.maxSize, self.size + self.size // 4 + 1)
+
+
+class ParallelBulkIndexer(object):
+    """Sends bulk requests from a pool of threads"""
+    def __init__(self, client, threads=4, queueSize=None,
+                 chunkSize=CHUNK_SIZE, maxBytes=MAX_CHUNK_BYTES,
+                 maxRetries=MAX_RETRIES, backoff=BACKOFF,
+                 sizer=None, reportEvery=60, index=None, doctype=None):
+        """
+        :client: Elasticsearch client, shared by the threads
+        :threads: number of sending threads
+        :queueSize: maximum number of batches waiting for a thread,
+                defaults to twice the number of threads
+        :chunkSize: initial number of actions per request
+        :maxBytes: maximum request body size in bytes
+        :maxRetries: number of times rejected items are resent
+        :backoff: seconds to wait before the first retry
+        :sizer: ChunkSizer, None for a fixed chunkSize
+        :reportEvery: seconds between progress log messages
+        :index: default index of actions without _index
+        :doctype: default type of actions without _type
+        """
+        self.client = client
+        self.threads = threads
+        self.queue = Queue(queueSize or 2 * threads)
+        self.chunkSize = chunkSize
+        self.maxBytes = maxBytes
+        self.maxRetries = maxRetries
+        self.backoff = backoff
+        self.sizer = sizer
+        self.reportEvery = reportEvery
+        self.defaultIndex = index
+        self.defaultType = doctype
+        self.failure = None
+
+    def _batchSize(self):
+        return self.sizer.size if self.sizer is not None else self.chunkSize
+
+    def _send(self, batch, stats):
+        for chunk in chunkActions(batch, len(batch), self.maxBytes):
+            started = time.time()
+            sendChunk(self.client, chunk, stats, self.maxRetries,
+                      self.backoff, self.defaultIndex, self.defaultType)
+            if self.sizer is not None:
+                self.sizer.update(time.time() - started, len(chunk))
+
+    def _work(self, stats):
+        while True:
+            batch = self.queue.get()
+            try:
+                if batch is None:
+                    return
+                if self.failure is None:
+                    self._send(batch, stats)
+            except Exception as e:
+                logging.exception('Bulk indexing thread failed')
+                self.failure = e
+            finally:
+                self.queue.task_done()
+
+    def index(self, actions, stats=None):
+        """Index actions, returning BulkStats. Blocks while all threads are
+        busy and the queue is full."""
+        if stats is None:
+            stats = BulkStats()
+
+        workers = [threading.Thread(target=self._work, args=(stats,))
+                   for i in range(self.threads)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        actions = iter(actions)
+        reported = time.time()
+        try:
+            while self.failure is None:
+                batch = list(islice(actions, self._batchSize()))
+                if not batch:
+                    break
+                self.queue.put(batch)
+                if time.time() - reported > self.reportEvery:
+                    reported = time.time()
+                    logging.info('%d indexed, %.1f docs/sec, %d rejected',
+                                 stats.success, stats.rate(), stats.rejected)
+        finally:
+            for worker in workers:
+                self.queue.put(None)
+            for worker in workers:
+                worker.join()
+
+        if self.failure is not None:
+            raise self.failure
+        return stats
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+_bulk NDJSON files of Elasticsearch actions
+
+BulkFileWriter writes serialized actions, ready to be sent to _bulk, into
+gzip compressed files of at most maxBytes uncompressed bytes each, never
+splitting an action. The files can be built where the data is, without a
+cluster, and later streamed to one with readBulkFiles() and the esbulk
+senders, which take the serialized actions as they are.
+
+Actions written without _index and _type get the index and type given at
+replay time, so one set of files can load any index.
+
+Typical usage:
+     with BulkFileWriter('library') as out:
+         for action in actions:
+             out.write(action)
+
+     stats = bulkIndex(es, readBulkFiles(out.files), index='library_2',
+                       doctype='term')
+
+Created on   : 2026-10-19
+"""
+
+import gzip
+import json
+
+from .esbulk import actionLines
+
+FILE_BYTES = 256 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+def _open(filename, mode):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode, COMPRESS_LEVEL)
+    return open(filename, mode)
+
+
+class BulkFileWriter(object):
+    """Writes actions to <base>-00000.ndjson.gz, <base>-00001.ndjson.gz, ..."""
+    def __init__(self, base, maxBytes=FILE_BYTES, compress=True):
+        """
+        :base: filename prefix
+        :maxBytes: maximum uncompressed size of a file; a larger action
+                gets a file of its own
+        :compress: gzip the files
+        """
+        self.base = base
+        self.maxBytes = maxBytes
+        self.suffix = '.ndjson.gz' if compress else '.ndjson'
+        self.files = []
+        self.fb = None
+        self.size = 0
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def _next(self):
+        self.close()
+        filename = '%s-%05d%s' % (self.base, len(self.files), self.suffix)
+        self.files.append(filename)
+        self.fb = _open(filename, 'wb')
+        self.size = 0
+
+    def write(self, action):
+        """Write an action, given as a dict or already serialized"""
+        lines = action if isinstance(action, str) else actionLines(action)
+        if self.fb is None or \
+           (self.size > 0 and self.size + len(lines) > self.maxBytes):
+            self._next()
+        self.fb.write(lines)
+        self.size += len(lines)
+        self.count += 1
+
+    def close(self):
+        if self.fb is not None:
+            self.fb.close()
+            self.fb = None
+
+
+def writeBulkFiles(actions, base, maxBytes=FILE_BYTES, compress=True):
+    """Write actions to bulk files
+
+    :returns: (list of filenames, number of actions)
+    """
+    with BulkFileWriter(base, maxBytes, compress) as out:
+        for action in actions:
+            out.write(action)
+    return out.files, out.count
+
+
+def _opType(meta):
+    if meta.startswith('{"'):
+        return meta[2:meta.index('"', 2)]
+    return json.loads(meta).keys()[0]
+
+
+def readBulkFiles(filenames):
+    """Generate the serialized actions of bulk files, in order"""
+    for filename in filenames:
+        with _open(filename, 'rb') as fb:
+            for meta in fb:
+                if _opType(meta) == 'delete':
+                    yield meta
+                else:
+                    yield meta + next(fb)
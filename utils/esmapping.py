@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Elasticsearch (1.x) mapping of the UMLS term index
+
+The code fields (lui, cui, sab, tui, sset) are not analyzed, so filters
+are exact term lookups. Only sab, tui and sset, which are aggregated on,
+keep doc values. term is analyzed for full text search and has two
+subfields: term.exact, the whole term lowercased and folded to ASCII,
+and term.autocomplete, edge n-grams of each word, so the term picker can
+run a plain match query instead of wildcards:
+
+     {'query': {'match': {'term.autocomplete': 'cardiac stru'}}}
+
+Documents use the LUI as their _id.
+
+Created on   : 2026-10-19
+"""
+
+MIN_GRAM = 2
+MAX_GRAM = 20
+
+ANALYSIS = {
+    'filter': {
+        'autocomplete_filter': {
+            'type': 'edge_ngram',
+            'min_gram': MIN_GRAM,
+            'max_gram': MAX_GRAM,
+        },
+    },
+    'analyzer': {
+        'normalized': {
+            'type': 'custom',
+            'tokenizer': 'keyword',
+            'filter': ['lowercase', 'asciifolding'],
+        },
+        'autocomplete': {
+            'type': 'custom',
+            'tokenizer': 'standard',
+            'filter': ['lowercase', 'asciifolding', 'autocomplete_filter'],
+        },
+        'autocomplete_search': {
+            'type': 'custom',
+            'tokenizer': 'standard',
+            'filter': ['lowercase', 'asciifolding'],
+        },
+    },
+}
+
+
+def _code(docValues=False):
+    field = {'type': 'string', 'index': 'not_analyzed'}
+    if docValues:
+        field['doc_values'] = True
+    return field
+
+
+def termMapping():
+    """Mapping of a term document type"""
+    return {
+        'properties': {
+            'lui': _code(),
+            'cui': _code(),
+            'sab': _code(docValues=True),
+            'tui': _code(docValues=True),
+            'sset': _code(docValues=True),
+            'term': {
+                'type': 'string',
+                'analyzer': 'standard',
+                'fields': {
+                    'exact': {
+                        'type': 'string',
+                        'analyzer': 'normalized',
+                    },
+                    'autocomplete': {
+                        'type': 'string',
+                        'index_analyzer': 'autocomplete',
+                        'search_analyzer': 'autocomplete_search',
+                    },
+                },
+            },
+        },
+    }
+
+
+def indexBody(doctype, shards=None):
+    """Index settings and mappings for create()"""
+    settings = {'analysis': ANALYSIS}
+    if shards is not None:
+        settings['number_of_shards'] = shards
+    return {'settings': settings, 'mappings': {doctype: termMapping()}}
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+External sort of OBO terms and of rows in bounded memory
+
+Terms are collected into runs of at most runSize terms. Each run is sorted
+and spilled to a temporary file in the obocache block format, and the runs
+are merged back with a heap. Terms with equal keys keep their input order.
+sortRows() does the same for tuples of plain values, e.g. the rows of a
+RRF file, spilled as marshal blocks.
+
+Typical usage:
+     with OBOReader('filename.obo') as obo:
+         for term in sortTerms(obo):
+             print term.id
+
+Created on   : 2026-10-19
+"""
+
+import heapq
+import marshal
+import os
+import tempfile
+
+from .obocache import TermBlockWriter, readBlocks
+
+RUN_SIZE = 100000
+ROW_BLOCK_SIZE = 10000
+
+
+def termId(term):
+    return term.id
+
+
+def _writeRun(terms, tmpdir):
+    fd, filename = tempfile.mkstemp(suffix='.run', dir=tmpdir)
+    with os.fdopen(fd, 'wb') as fb:
+        writer = TermBlockWriter(fb)
+        for term in terms:
+            writer.write(term)
+        writer.flush()
+    return filename
+
+
+def _readRun(filename):
+    with open(filename, 'rb') as fb:
+        for term in readBlocks(fb):
+            yield term
+
+
+def _writeRowRun(rows, tmpdir):
+    fd, filename = tempfile.mkstemp(suffix='.run', dir=tmpdir)
+    with os.fdopen(fd, 'wb') as fb:
+        for i in xrange(0, len(rows), ROW_BLOCK_SIZE):
+            marshal.dump(rows[i:i + ROW_BLOCK_SIZE], fb)
+    return filename
+
+
+def _readRowRun(filename):
+    with open(filename, 'rb') as fb:
+        while True:
+            try:
+                rows = marshal.load(fb)
+            except EOFError:
+                break
+            for row in rows:
+                yield row
+
+
+def _keyed(items, runNo, key):
+    for i, item in enumerate(items):
+        yield key(item), runNo, i, item
+
+
+def _sort(items, key, runSize, tmpdir, writeRun, readRun):
+    """Sort items by key, spilling sorted runs with writeRun(items, tmpdir)
+    and merging them back with readRun(filename)"""
+    runs = []
+    buf = []
+    try:
+        for item in items:
+            buf.append(item)
+            if len(buf) >= runSize:
+                buf.sort(key=key)
+                runs.append(writeRun(buf, tmpdir))
+                buf = []
+
+        buf.sort(key=key)
+        if not runs:
+            for item in buf:
+                yield item
+            return
+
+        runs.append(writeRun(buf, tmpdir))
+        buf = None
+        merged = heapq.merge(*[_keyed(readRun(f), i, key)
+                               for i, f in enumerate(runs)])
+        for item in merged:
+            yield item[-1]
+    finally:
+        for filename in runs:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+
+def sortTerms(terms, key=termId, runSize=RUN_SIZE, tmpdir=None):
+    """Sort terms by key in bounded memory
+
+    :terms: iterable of OBOTerm objects
+    :key: sort key function, term id by default
+    :runSize: maximum number of terms kept in memory
+    :tmpdir: directory for the temporary run files
+    :returns: a generator of sorted OBOTerm objects
+    """
+    return _sort(terms, key, runSize, tmpdir, _writeRun, _readRun)
+
+
+def sortRows(rows, key, runSize=RUN_SIZE, tmpdir=None):
+    """Sort rows by key in bounded memory
+
+    :rows: iterable of tuples of values marshal can store
+    :key: sort key function
+    :runSize: maximum number of rows kept in memory
+    :tmpdir: directory for the temporary run files
+    :returns: a generator of sorted rows
+    """
+    return _sort(rows, key, runSize, tmpdir, _writeRowRun, _readRowRun)
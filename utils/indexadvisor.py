@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Index advisor for the UMLS tables
+
+Every lookup of the UMLS class is an equality or IN match on a few
+columns of one table. REQUIRED lists the composite index each of those
+query shapes needs. checkIndexes() finds the indexes of the tables,
+primary keys included, and EXPLAINs the query shape of each one, so a
+missing index shows up with the full table scan it causes. An index
+serves a shape if its leading columns are the shape's columns, in any
+order; an index on the first column only is reported as partial.
+
+Tables created with CREATE TABLE ... AS SELECT, like the BIO_ subsets of
+scripts/preparebiodata.sql, have no indexes at all; checking them with
+prefix='BIO_' and createIndexes() fixes that.
+
+Typical usage:
+     advice = checkIndexes(conn, prefix='BIO_')
+     print report(advice)
+     createIndexes(conn, advice)
+
+Created on   : 2026-10-19
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+
+OK = 'ok'
+PARTIAL = 'partial'
+MISSING = 'missing'
+NO_TABLE = 'no table'
+
+# (table, columns) of the UMLS lookups: concept, aui, relcuis, defn and
+# tuis/semTypes
+REQUIRED = [
+    ('MRCONSO', ['CUI', 'SAB', 'LAT', 'SUPPRESS']),
+    ('MRCONSO', ['AUI']),
+    ('MRREL', ['CUI2', 'STYPE1', 'SAB', 'SUPPRESS']),
+    ('MRDEF', ['CUI']),
+    ('MRSTY', ['CUI']),
+]
+
+
+class IndexAdvice(object):
+    """Index state of one query shape"""
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self.status = None
+        self.index = None
+        self.plan = []
+        self.fullScan = None
+
+    @property
+    def name(self):
+        """Name of the index to create"""
+        return 'X_%s_%s' % (self.table, '_'.join(self.columns))
+
+    def query(self):
+        return 'SELECT * FROM %s WHERE %s' % \
+            (self.table, ' AND '.join('%s = :%s' % (c, c)
+                                      for c in self.columns))
+
+
+def tableIndexes(insp, table):
+    """(name, column list) of the indexes of a table, primary key first"""
+    indexes = []
+    pk = insp.get_pk_constraint(table)
+    if pk and pk.get('constrained_columns'):
+        indexes.append(('PRIMARY', pk['constrained_columns']))
+    for index in insp.get_indexes(table):
+        indexes.append((index['name'], index['column_names']))
+    return indexes
+
+
+def matchIndex(indexes, columns):
+    """Status and name of the best index of indexes for columns"""
+    wanted = set(c.upper() for c in columns)
+    partial = None
+    for name, indexColumns in indexes:
+        leading = [c.upper() for c in indexColumns[:len(columns)]]
+        if set(leading) == wanted:
+            return OK, name
+        if partial is None and indexColumns and \
+                indexColumns[0].upper() == columns[0].upper():
+            partial = name
+    if partial is not None:
+        return PARTIAL, partial
+    return MISSING, None
+
+
+def explain(conn, sql, params):
+    """Query plan of sql as a list of lines, and whether it scans the whole
+    table; None if the dialect is not known"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        rows = conn.execute(text('EXPLAIN QUERY PLAN ' + sql),
+                            **params).fetchall()
+        plan = [row[-1] for row in rows]
+        return plan, any(line.startswith('SCAN') for line in plan)
+    if dialect == 'mysql':
+        rows = conn.execute(text('EXPLAIN ' + sql), **params).fetchall()
+        plan = ['type=%s key=%s rows=%s' % (r['type'], r['key'], r['rows'])
+                for r in rows]
+        return plan, any(r['type'] == 'ALL' for r in rows)
+    rows = conn.execute(text('EXPLAIN ' + sql), **params).fetchall()
+    return [' '.join(str(v) for v in row) for row in rows], None
+
+
+def checkIndexes(conn, prefix='', required=REQUIRED):
+    """Check the indexes of the query shapes in required
+
+    :conn: sqlalchemy connection of the UMLS database
+    :prefix: umls tablename prefix, e.g. BIO_
+    :returns: list of IndexAdvice
+    """
+    insp = inspect(conn)
+    tables = dict((t.upper(), t) for t in insp.get_table_names())
+    advice = []
+    for table, columns in required:
+        item = IndexAdvice(tables.get((prefix + table).upper(),
+                                      prefix + table), columns)
+        advice.append(item)
+        if (prefix + table).upper() not in tables:
+            item.status = NO_TABLE
+            continue
+        item.status, item.index = matchIndex(tableIndexes(insp, item.table),
+                                             columns)
+        item.plan, item.fullScan = explain(conn, item.query(),
+                                           dict((c, 'X') for c in columns))
+    return advice
+
+
+def createIndexes(conn, advice, partial=True):
+    """Create the missing indexes of advice, and the partial ones too if
+    partial, then explain their query shapes again
+
+    :returns: names of the created indexes
+    """
+    created = []
+    for item in advice:
+        if item.status == MISSING or (partial and item.status == PARTIAL):
+            logging.info('creating index %s on %s', item.name, item.table)
+            conn.execute('CREATE INDEX %s ON %s (%s)' %
+                         (item.name, item.table, ', '.join(item.columns)))
+            created.append(item.name)
+            item.status, item.index = OK, item.name
+            item.plan, item.fullScan = explain(
+                conn, item.query(), dict((c, 'X') for c in item.columns))
+    return created
+
+
+def report(advice):
+    """Text report of advice, one block per query shape"""
+    lines = []
+    for item in advice:
+        lines.append('%-8s %s(%s)%s' %
+                     (item.status, item.table, ', '.join(item.columns),
+                      ' by %s' % item.index if item.index else ''))
+        if item.fullScan:
+            lines.append('         full table scan:')
+        for line in item.plan:
+            lines.append('           %s' % line)
+    return '\n'.join(lines)
+
+
+def missing(advice, partial=True):
+    """Query shapes of advice without an index"""
+    return [item for item in advice if item.status == MISSING or
+            (partial and item.status == PARTIAL)]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+One pass builder of the indexdata table
+
+Builds the rows of scripts/preparedata.sql without its per tag DELETE and
+UPDATE statements. MRSTY is read once into a CUI to TUIs hash, then
+MRCONSO is streamed once in LUI order and grouped into one row per LUI.
+The table is read ordered by LUI; MRCONSO.RRF is not, so its rows are put
+in LUI order with the external sort of extsort, in bounded memory, unless
+the file is sorted beforehand, e.g. with sort -t'|' -k4,4.
+
+SNOMED CT strings carry a semantic tag, e.g. 'Asthma (disorder)'. The tag
+of a string is looked up with a single hash lookup in the set of known
+tags, semTypes.SEM_TYPE_NAMEs, instead of one LIKE scan per tag. Untagged
+strings are yielded as they come and their lower cased text is kept in a
+hash set; tagged rows are held back until the end of the stream, then
+dropped if their base string is already a term, or yielded with the tag
+stripped and MODIFIED set otherwise. Matching is case insensitive, as it
+is with the default MySQL collation.
+
+Typical usage:
+     builder = IndexdataBuilder(loadTuis(readStyDB(conn)))
+     count = insertRows(conn, builder.build(readConsoDB(conn)))
+
+Created on   : 2026-10-19
+"""
+
+from itertools import groupby
+from operator import itemgetter
+
+from sqlalchemy import MetaData, Table, select, and_, text
+
+from .extsort import sortRows, RUN_SIZE
+from .rrf import cuiNumber, RRF_CUI, RRF_LAT, RRF_LUI, RRF_SAB, RRF_CODE, \
+    RRF_STR, RRF_SUPPRESS, STY_CUI, STY_TUI
+from .semTypes import SEM_TYPE_NAMEs
+
+SABS = ['MSH', 'SNOMEDCT_US', 'NCBI', 'GO', 'HGNC', 'FMA']
+LAT = 'ENG'
+SUPPRESS = ['N']
+BATCH_SIZE = 5000
+
+SEM_TAGS = frozenset(name.lower() for name in SEM_TYPE_NAMEs)
+
+COLUMNS = ['LUI', 'STR', 'CUIS', 'CODES', 'TUIS', 'MODIFIED']
+DDL = """(LUI varchar(10) NOT NULL, STR text, CUIS text, CODES text,
+          TUIS varchar(250) NOT NULL, MODIFIED tinyint NOT NULL DEFAULT 0,
+          PRIMARY KEY (LUI))"""
+
+
+def splitTag(string):
+    """Split a SNOMED CT semantic tag off a string
+
+    :returns: (base string, tag), or (string, None) if string has no
+            known tag
+    """
+    if not string.endswith(')'):
+        return string, None
+    i = string.rfind('(')
+    if i < 0 or string[i:].lower() not in SEM_TAGS:
+        return string, None
+    return string[:i].strip(' '), string[i:]
+
+
+def readConsoRRF(filename, sabs=SABS, lat=LAT, suppress=SUPPRESS):
+    """Generate (LUI, STR, CUI, SAB, CODE) rows of MRCONSO.RRF, in file
+    order"""
+    sabs = set(sabs) if sabs is not None else None
+    suppress = set(suppress) if suppress is not None else None
+    with open(filename, 'rb') as fb:
+        for line in fb:
+            row = line.split('|')
+            if lat is not None and row[RRF_LAT] != lat:
+                continue
+            if sabs is not None and row[RRF_SAB] not in sabs:
+                continue
+            if suppress is not None and row[RRF_SUPPRESS] not in suppress:
+                continue
+            yield (row[RRF_LUI], row[RRF_STR].decode('utf-8'), row[RRF_CUI],
+                   row[RRF_SAB], row[RRF_CODE])
+
+
+def readConsoDB(conn, prefix='', sabs=SABS, lat=LAT, suppress=SUPPRESS):
+    """Generate (LUI, STR, CUI, SAB, CODE) rows of MRCONSO in LUI order,
+    streaming the result"""
+    table = Table(prefix + 'MRCONSO', MetaData(), autoload=True,
+                  autoload_with=conn)
+    c = table.c
+    where = []
+    if lat is not None:
+        where.append(c.LAT == lat)
+    if sabs is not None:
+        where.append(c.SAB.in_(sabs))
+    if suppress is not None:
+        where.append(c.SUPPRESS.in_(suppress))
+
+    s = select([c.LUI, c.STR, c.CUI, c.SAB, c.CODE]).order_by(c.LUI)
+    if where:
+        s = s.where(and_(*where))
+
+    result = conn.execution_options(stream_results=True).execute(s)
+    try:
+        for lui, string, cui, sab, code in result:
+            yield str(lui), string, str(cui), str(sab), code.encode('utf-8')
+    finally:
+        result.close()
+
+
+def readStyRRF(filename):
+    """Generate (CUI, TUI) rows of MRSTY.RRF"""
+    with open(filename, 'rb') as fb:
+        for line in fb:
+            row = line.split('|')
+            yield row[STY_CUI], row[STY_TUI]
+
+
+def readStyDB(conn, prefix=''):
+    """Generate (CUI, TUI) rows of MRSTY, streaming the result"""
+    table = Table(prefix + 'MRSTY', MetaData(), autoload=True,
+                  autoload_with=conn)
+    s = select([table.c.CUI, table.c.TUI])
+    result = conn.execution_options(stream_results=True).execute(s)
+    try:
+        for cui, tui in result:
+            yield str(cui), str(tui)
+    finally:
+        result.close()
+
+
+def loadTuis(rows):
+    """Build a CUI number to sorted TUI tuple hash from (CUI, TUI) rows.
+    Equal tuples are shared, most CUIs have one of a few hundred."""
+    tuis = {}
+    for cui, tui in rows:
+        key = cuiNumber(cui)
+        tuis[key] = tuis.get(key, ()) + (tui,)
+
+    shared = {}
+    for key, value in tuis.iteritems():
+        value = tuple(sorted(set(value)))
+        tuis[key] = shared.setdefault(value, value)
+    return tuis
+
+
+def groupLUIs(rows, ordered=True, runSize=RUN_SIZE, tmpdir=None):
+    """Group (LUI, STR, CUI, SAB, CODE) rows by LUI
+
+    :ordered: rows come in LUI order and are grouped as they stream;
+            otherwise they are sorted externally first
+    :runSize, tmpdir: run size and directory of the external sort
+    :returns: a generator of (LUI, STR, set of CUIs, set of SAB:CODEs),
+            STR being the first string of the LUI
+    """
+    if not ordered:
+        rows = sortRows(rows, itemgetter(0), runSize, tmpdir)
+    for lui, group in groupby(rows, itemgetter(0)):
+        string = None
+        cuis = set()
+        codes = set()
+        for _, s, cui, sab, code in group:
+            if string is None:
+                string = s
+            cuis.add(cui)
+            codes.add('%s:%s' % (sab, code))
+        yield lui, string, cuis, codes
+
+
+class IndexdataBuilder(object):
+    """Builds indexdata rows, see the module documentation"""
+    def __init__(self, tuis):
+        """
+        :tuis: CUI number to TUI tuple hash, see loadTuis()
+        """
+        self.tuis = tuis
+        self.count = 0
+        self.stripped = 0
+        self.dropped = 0
+
+    def _tuis(self, cuis):
+        tuis = set()
+        for cui in cuis:
+            tuis.update(self.tuis.get(cuiNumber(cui), ()))
+        return ','.join(sorted(tuis))
+
+    def build(self, rows, ordered=True, runSize=RUN_SIZE, tmpdir=None):
+        """Generate (LUI, STR, CUIS, CODES, TUIS, MODIFIED) rows
+
+        :rows: (LUI, STR, CUI, SAB, CODE) rows of MRCONSO
+        :ordered, runSize, tmpdir: see groupLUIs()
+        """
+        bases = set()
+        tagged = []
+        for lui, string, cuis, codes in groupLUIs(rows, ordered, runSize,
+                                                      tmpdir):
+            row = (lui, string, ','.join(sorted(cuis)),
+                   ','.join(sorted(codes)), self._tuis(cuis), 0)
+            base, tag = splitTag(string)
+            if tag is not None:
+                tagged.append((base, row))
+                continue
+            if not string.endswith(')'):
+                bases.add(string.lower())
+            self.count += 1
+            yield row
+
+        for base, row in tagged:
+            if base.lower() in bases:
+                self.dropped += 1
+                continue
+            self.stripped += 1
+            self.count += 1
+            yield (row[0], base) + row[2:5] + (1,)
+
+    def report(self):
+        return ('rows    : %d\nstripped: %d\ndropped : %d' %
+                (self.count, self.stripped, self.dropped))
+
+
+def createTable(conn, table='indexdata', replace=False):
+    """Create the indexdata table, dropping an existing one if replace"""
+    if replace:
+        conn.execute('DROP TABLE IF EXISTS %s' % table)
+    conn.execute('CREATE TABLE %s %s' % (table, DDL))
+
+
+def insertRows(conn, rows, table='indexdata', batchSize=BATCH_SIZE):
+    """Insert rows into table, one executemany() per batchSize rows
+
+    :returns: number of rows inserted
+    """
+    sql = text('INSERT INTO %s (%s) VALUES (%s)' %
+               (table, ', '.join(COLUMNS),
+                ', '.join(':' + c for c in COLUMNS)))
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(dict(zip(COLUMNS, row)))
+        if len(batch) >= batchSize:
+            conn.execute(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(sql, batch)
+        count += len(batch)
+    return count
+
+
+def buildRows(conn, prefix='', sabs=SABS, lat=LAT, suppress=SUPPRESS):
+    """Builder and row generator over the MRCONSO and MRSTY tables of conn
+
+    :returns: (IndexdataBuilder, generator of indexdata rows)
+    """
+    builder = IndexdataBuilder(loadTuis(readStyDB(conn, prefix)))
+    return builder, builder.build(readConsoDB(conn, prefix, sabs, lat,
+                                              suppress))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Sequential reads of the indexdata table
+
+indexdata has LUI as its primary key, so it is walked in LUI order with
+keyset pagination: every page starts after the last LUI of the previous
+one, and each query is an index range scan no matter how far into the
+table it is. Alternatively the whole table is read with a single
+server-side streaming cursor. Both run in constant memory.
+
+Curation marks changed rows with the MODIFIED column: UPSERT for rows to
+(re)index and DELETE for rows to remove from the index. Once the index
+is updated, clearModified() resets the flag of upserted rows and drops
+the deleted ones from the table.
+
+Typical usage:
+     for row in keysetRows(conn, pageSize=10000):
+         print row['LUI']
+
+Created on   : 2026-10-19
+"""
+
+from sqlalchemy import bindparam, text
+
+COLUMNS = 'LUI, STR, CUIS, CODES, TUIS'
+PAGE_SIZE = 10000
+FETCH_SIZE = 1000
+
+# MODIFIED flag values
+UPSERT = 1
+DELETE = 2
+
+KEYSET_SQL = ("SELECT %s FROM indexdata WHERE LUI > :last%s "
+              "ORDER BY LUI LIMIT :count")
+STREAM_SQL = "SELECT %s FROM indexdata%s ORDER BY LUI"
+
+
+def _where(where, prefix):
+    return ' %s %s' % (prefix, where) if where else ''
+
+
+def keysetRows(conn, pageSize=PAGE_SIZE, where=None, start='',
+               columns=COLUMNS):
+    """Generate indexdata rows in LUI order, one query per page
+
+    :conn: sqlalchemy connection
+    :pageSize: number of rows per query
+    :where: extra SQL condition for the rows
+    :start: LUI to start after
+    :columns: columns to select, LUI included
+    """
+    sql = text(KEYSET_SQL % (columns, _where(where, 'AND')))
+    last = start
+    while True:
+        rows = conn.execute(sql, last=last, count=pageSize).fetchall()
+        for row in rows:
+            yield row
+        if len(rows) < pageSize:
+            return
+        last = rows[-1]['LUI']
+
+
+def streamRows(conn, fetchSize=FETCH_SIZE, where=None):
+    """Generate indexdata rows in LUI order from a single server-side
+    cursor, fetching fetchSize rows at a time"""
+    sql = text(STREAM_SQL % (COLUMNS, _where(where, 'WHERE')))
+    result = conn.execution_options(stream_results=True).execute(sql)
+    try:
+        while True:
+            rows = result.fetchmany(fetchSize)
+            if not rows:
+                return
+            for row in rows:
+                yield row
+    finally:
+        result.close()
+
+
+def modifiedRows(conn, pageSize=PAGE_SIZE):
+    """Generate the rows flagged as modified, with MODIFIED as the last
+    column"""
+    return keysetRows(conn, pageSize, 'MODIFIED <> 0',
+                      columns=COLUMNS + ', MODIFIED')
+
+
+def clearModified(conn, luis, flag=UPSERT, batchSize=1000):
+    """Clear the UPSERT flag of luis, or delete the rows of luis flagged
+    DELETE, in batches of batchSize LUIs. Rows flagged otherwise are left
+    alone."""
+    if flag == DELETE:
+        sql = 'DELETE FROM indexdata'
+    else:
+        sql = 'UPDATE indexdata SET MODIFIED = 0'
+    sql = text(sql + ' WHERE MODIFIED = :flag AND LUI IN :luis')
+    sql = sql.bindparams(bindparam('luis', expanding=True))
+
+    count = 0
+    for i in range(0, len(luis), batchSize):
+        result = conn.execute(sql, flag=flag, luis=luis[i:i + batchSize])
+        count += result.rowcount
+    return count
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+NumPy storage helpers: contiguous string tables and memory mapped .npz
+
+Typical usage:
+     names = StringTable.fromList([u'Heart', u'Lung'])
+     saveNpz('store.npz', names.arrays('name'))
+     arrays = loadNpz('store.npz')
+     print StringTable.fromArrays(arrays, 'name')[1]
+
+Created on   : 2026-10-19
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+from numpy.lib import format as npformat
+
+# zip local file header, see APPNOTE.TXT 4.3.7
+ZIP_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+
+class StringTable(object):
+    """Immutable table of strings stored in one utf-8 byte blob with an
+    offset array, instead of one Python object per string."""
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._index = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]] \
+            .tostring().decode('utf-8')
+
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self[i]
+
+    @classmethod
+    def fromList(cls, strings):
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in encoded], out=offsets[1:])
+        blob = np.frombuffer(''.join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    @classmethod
+    def fromArrays(cls, arrays, name):
+        return cls(arrays[name + '_blob'], arrays[name + '_offsets'])
+
+    def arrays(self, name):
+        """Arrays to save the table under the given name"""
+        return {
+            name + '_blob': self.blob,
+            name + '_offsets': self.offsets,
+        }
+
+    def index(self, s, default=-1):
+        """Position of a string in the table. The reverse lookup dict is
+        built on first use."""
+        if self._index is None:
+            self._index = dict((v, i) for i, v in enumerate(self))
+        return self._index.get(s, default)
+
+
+def saveNpz(filename, arrays):
+    """Save arrays uncompressed, so that loadNpz can memory map them"""
+    np.savez(filename, **arrays)
+
+
+def _mmapMember(fb, filename, info):
+    fb.seek(info.header_offset)
+    header = ZIP_HEADER.unpack(fb.read(ZIP_HEADER.size))
+    fb.seek(info.header_offset + ZIP_HEADER.size + header[-2] + header[-1])
+
+    version = npformat.read_magic(fb)
+    if version == (1, 0):
+        shape, fortran, dtype = npformat.read_array_header_1_0(fb)
+    else:
+        shape, fortran, dtype = npformat.read_array_header_2_0(fb)
+
+    if dtype.hasobject:
+        raise ValueError('Cannot memory map object arrays')
+    if np.prod(shape) == 0:
+        return np.zeros(shape, dtype=dtype)
+
+    return np.memmap(filename, dtype=dtype, mode='r', offset=fb.tell(),
+                     shape=shape, order='F' if fortran else 'C')
+
+
+def loadNpz(filename, mmap=True):
+    """Load arrays saved with saveNpz.
+
+    :filename: .npz file to load
+    :mmap: memory map the arrays instead of reading them. Compressed
+            members are always read.
+    :returns: a dict of name -> array
+    """
+    arrays = {}
+    if not mmap:
+        with np.load(filename) as npz:
+            for name in npz.files:
+                arrays[name] = npz[name]
+        return arrays
+
+    with zipfile.ZipFile(filename) as zf:
+        infos = zf.infolist()
+
+    with open(filename, 'rb') as fb:
+        for info in infos:
+            name = info.filename[:-4]
+            if info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = _mmapMember(fb, filename, info)
+            else:
+                with np.load(filename) as npz:
+                    arrays[name] = npz[name]
+
+    return arrays
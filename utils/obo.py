@@ -16,28 +16,127 @@ Last modified: Aug 07, 2015, Fri 20:38:23 -0500
 import codecs
 import re
 
+from .oboscan import scanDef, scanSyn, scanIsA, scanRel
+
+
+# Shared value of the list fields of a term with no entries
+EMPTY = ()
+
+# Version of the values EntryParser returns; bump it when parsing changes,
+# so that parsed term caches (see obocache) written before are rebuilt
+PARSER_VERSION = 2
+
+
+class Record(object):
+    """Base class of the small slotted records a term is made of. Fields are
+    accessible both as attributes and by key, e.g. syn.name or syn['name']
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and \
+            self.__getstate__() == other.__getstate__()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.__getstate__())
+
+    def __repr__(self):
+        return '%s%r' % (type(self).__name__, self.__getstate__())
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __setstate__(self, state):
+        Record.__init__(self, *state)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return list(self.__slots__)
+
+
+class Definition(Record):
+    __slots__ = ('name', 'code')
+
+
+class Synonym(Record):
+    __slots__ = ('name', 'type', 'code')
+
+
+class Xref(Record):
+    __slots__ = ('code', 'src')
+
+
+class Relationship(Record):
+    __slots__ = ('type', 'code', 'name')
+
+
+class IsA(Record):
+    __slots__ = ('code', 'name')
+
 
 class OBOTerm(object):
-    """Simple class to model a concept from an OBO file"""
+    """Simple class to model a concept from an OBO file.
+
+    List fields share the EMPTY tuple until the first entry is added with
+    add(), so a term only pays for the fields it actually has.
+    """
+    LISTS = ('is_a', 'alt_id', 'synonym', 'xref', 'relationship',
+             'intersection_of', 'union_of', 'subset', 'property_value')
+    __slots__ = ('id', 'name', 'defn') + LISTS
+
     def __init__(self, termId='', name=''):
         self.id = termId
         self.name = name
         self.defn = None
-        self.is_a = []
-        self.alt_id = []
-        self.synonym = []
-        self.xref = []
-        self.relationship = []
-        self.intersection_of = []
-        self.union_of = []
-        self.subset = []
-        self.property_value = []
+        for field in OBOTerm.LISTS:
+            setattr(self, field, EMPTY)
 
     def __str__(self):
         return '%s [%s]' % (self.name, self.id)
 
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in OBOTerm.__slots__)
+
+    def __setstate__(self, state):
+        for field, value in zip(OBOTerm.__slots__, state):
+            setattr(self, field, value)
+
+    def add(self, field, value):
+        """Append a value to one of the list fields"""
+        values = getattr(self, field)
+        if values is EMPTY:
+            setattr(self, field, [value])
+        else:
+            values.append(value)
+
 
 class EntryParser(object):
+    """Parses the values of OBO entries. xref, is_a and relationship values
+    are matched with the regexes below, which cannot backtrack. def and
+    synonym values, where SYN and DEF backtrack on long quote heavy lines,
+    and is_a and relationship values with {...} qualifiers go through the
+    single pass scanners of oboscan, which implement the same grammar.
+    """
     XREF = re.compile(ur'(\S+)(?:\s+(.*))?')
     SYN = re.compile(ur'"((?:\"|[^""])+)"(?:\s([^\s\[]+(?:\s[^\s\[]+)*))?'
                      ur'(?:\s\[([^\])]*)\])?')
@@ -45,71 +144,107 @@ class EntryParser(object):
     REL = re.compile(ur'(\S+)\s+(\S+)(?:\s+!\s*(.*))?')
     DEF = re.compile(ur'"((?:\"|[^""])+)"\s*(?:\[([^\])]*)\])?')
 
+    def __init__(self, shareCodes=False):
+        """
+        :shareCodes: also share ids, codes and referenced names between
+                terms. Saves memory when a whole ontology is held in memory,
+                but the string table grows with the file when streaming.
+        """
+        self.strings = {}
+        self.shareCodes = shareCodes
+
+    def intern(self, s):
+        """Returns a shared instance of a token repeating across terms, like
+        synonym and relationship types or subsets. Built-in intern() does
+        not take unicode.
+        """
+        if s is None:
+            return None
+        return self.strings.setdefault(s, s)
+
+    def code(self, s):
+        """Returns a shared instance of an id or code if shareCodes is set"""
+        if self.shareCodes:
+            return self.intern(s)
+        return s
+
+    @staticmethod
+    def _match(regex, entry, line):
+        m = regex.match(line)
+        if m is None:
+            raise ValueError('Malformed %s: %s' % (entry, line))
+        return m.groups()
+
+    @staticmethod
+    def _scan(scanner, entry, line):
+        groups = scanner(line)
+        if groups is None:
+            raise ValueError('Malformed %s: %s' % (entry, line))
+        return groups
+
     def xref(self, line):
         """Process xref line
 
         :line: line to process
-        :returns: an array containing xref string, and any source
+        :returns: an Xref containing xref string, and any source
         """
-        m = EntryParser.XREF.match(line)
-        # if m is None: print line; exit()
-        return {
-            'code': m.group(1),
-            'src': m.group(2),
-        }
+        code, src = self._match(self.XREF, 'xref', line)
+        return Xref(self.code(code), src)
 
     def defn(self, line):
         """Process definition line
 
         :line: line to process
-        :returns: an array containing definition string, and any code
+        :returns: a Definition containing definition string, and any code
         """
-        m = EntryParser.DEF.match(line)
-        # if m is None: print line; exit()
-        return {
-            'name': m.group(1),
-            'code': m.group(2),
-        }
+        name, code = self._scan(scanDef, 'def', line)
+        return Definition(name, self.code(code))
 
     def syn(self, line):
         """Process synonym line
 
         :line: line to process
-        :returns: an array containing synonym string, synonym type (if any),
+        :returns: a Synonym containing synonym string, synonym type (if any),
                 and any code
         """
-        m = EntryParser.SYN.match(line)
-        # if m is None: print line; exit()
-        return {
-            'name': m.group(1),
-            'type': m.group(2),
-            'code': m.group(3),
-        }
+        name, synType, code = self._scan(scanSyn, 'synonym', line)
+        return Synonym(name, self.intern(synType), self.code(code))
 
     def rel(self, line):
-        m = EntryParser.REL.match(line)
-        return {
-            'type': m.group(1),
-            'code': m.group(2),
-            'name': m.group(3),
-        }
+        if u'{' in line:
+            relType, code, name = self._scan(scanRel, 'relationship', line)
+        else:
+            relType, code, name = self._match(self.REL, 'relationship', line)
+        return Relationship(self.intern(relType), self.code(code),
+                            self.code(name))
 
     def is_a(self, line):
-        m = EntryParser.IS_A.match(line)
-        return {
-            'code': m.group(1),
-            'name': m.group(2),
-        }
+        if u'{' in line:
+            code, name = self._scan(scanIsA, 'is_a', line)
+        else:
+            code, name = self._match(self.IS_A, 'is_a', line)
+        return IsA(self.code(code), self.code(name))
 
 
 class OBOReader(object):
     """OBO file reader."""
-    def __init__(self, filename):
+    def __init__(self, filename, shareCodes=False, cache=False):
+        """
+        :filename: OBO file to read
+        :shareCodes: share id and code strings between terms, see
+                EntryParser. Use when keeping all terms in memory.
+        :cache: read terms from the parsed term cache next to the file
+                (see obocache) when it is up to date, otherwise write it
+                while reading the file to the end
+        """
         self.fb = None
         self.eof = True
         self.curTerm = None
         self.isTerm = False
-        self.fmt = EntryParser()
+        self.fmt = EntryParser(shareCodes)
+        self.cache = cache
+        self.cached = None
+        self.cacheWriter = None
         self.open(filename)
 
     def __enter__(self):
@@ -117,16 +252,28 @@ class OBOReader(object):
 
     def __exit__(self, e_type, e_value, traceback):
         self.close()
-        if e_type is not None:
-            print e_type, e_value, traceback
-            # return False
-
-        return self
+        return False
 
     def __iter__(self):
         return self
 
     def next(self):
+        if self.cached is not None:
+            return self.cached.next()
+
+        try:
+            term = self._next()
+        except StopIteration:
+            if self.cacheWriter is not None:
+                self.cacheWriter.commit()
+                self.cacheWriter = None
+            raise
+
+        if self.cacheWriter is not None:
+            self.cacheWriter.write(term)
+        return term
+
+    def _next(self):
         if self.eof:
             raise StopIteration
 
@@ -148,7 +295,7 @@ class OBOReader(object):
                 self.isTerm = False
             elif self.isTerm:
                 if row[0] == 'id':
-                    self.curTerm.id = row[1]
+                    self.curTerm.id = self.fmt.code(row[1])
                 elif row[0] == 'name':
                     self.curTerm.name = row[1]
                 elif row[0] == 'def':
@@ -156,26 +303,26 @@ class OBOReader(object):
                     self.curTerm.defn = fmt
                 elif row[0] == 'synonym':
                     fmt = self.fmt.syn(row[1])
-                    self.curTerm.synonym.append(fmt)
+                    self.curTerm.add('synonym', fmt)
                 elif row[0] == 'relationship':
                     fmt = self.fmt.rel(row[1])
-                    self.curTerm.relationship.append(fmt)
+                    self.curTerm.add('relationship', fmt)
                 elif row[0] == 'xref':
                     fmt = self.fmt.xref(row[1])
-                    self.curTerm.xref.append(fmt)
+                    self.curTerm.add('xref', fmt)
                 elif row[0] == 'is_a':
                     fmt = self.fmt.is_a(row[1])
-                    self.curTerm.is_a.append(fmt)
+                    self.curTerm.add('is_a', fmt)
                 elif row[0] == 'intersection_of':
-                    self.curTerm.intersection_of.append(row[1])
+                    self.curTerm.add('intersection_of', row[1])
                 elif row[0] == 'alt_id':
-                    self.curTerm.alt_id.append(row[1])
+                    self.curTerm.add('alt_id', self.fmt.code(row[1]))
                 elif row[0] == 'subset':
-                    self.curTerm.subset.append(row[1])
+                    self.curTerm.add('subset', self.fmt.intern(row[1]))
                 elif row[0] == 'property_value':
-                    self.curTerm.property_value.append(row[1])
+                    self.curTerm.add('property_value', row[1])
                 elif row[0] == 'union_of':
-                    self.curTerm.union_of.append(row[1])
+                    self.curTerm.add('union_of', row[1])
 
         self.eof = True
         if self.isTerm:
@@ -185,9 +332,151 @@ class OBOReader(object):
 
     def open(self, filename):
         self.filename = filename
+        self.eof = False
+        if self.cache:
+            from . import obocache
+            options = obocache.cacheOptions(self.fmt.shareCodes)
+            if obocache.isCacheValid(filename, options=options):
+                self.cached = obocache.readCache(filename)
+                return
+            try:
+                self.cacheWriter = obocache.OBOCacheWriter(filename,
+                                                           options=options)
+            except (IOError, OSError):
+                # e.g. a read only mirror, parse without a cache
+                self.cacheWriter = None
+
         self.fb = codecs.open(filename, 'r', 'utf-8')
+
+    def close(self):
+        if self.fb is not None:
+            self.fb.close()
+            self.fb = None
+
+        if self.cached is not None:
+            self.cached.close()
+            self.cached = None
+
+        if self.cacheWriter is not None:
+            # not read to the end, the cache would be incomplete
+            self.cacheWriter.abort()
+            self.cacheWriter = None
+
+
+class OBOLineReader(OBOReader):
+    """OBO reader over already decoded lines, e.g. a single stanza or a
+    chunk of a larger file.
+
+    Typical usage:
+         for term in OBOLineReader(text.splitlines(True)):
+             print term.name
+    """
+    def open(self, lines):
+        self.filename = None
+        self.fb = iter(lines)
         self.eof = False
 
+    def close(self):
+        self.fb = None
+
+
+class OBOWriter(object):
+    """OBO file writer. Entries are written the way OBOReader reads them,
+    so values are not escaped again.
+
+    Typical usage:
+         with OBOWriter('filename.obo') as out:
+             out.writeHeader([('format-version', '1.2')])
+             out.writeTerm(term)
+    """
+    def __init__(self, filename):
+        self.fb = None
+        self.open(filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def _write(self, key, value):
+        self.fb.write(u'%s: %s\n' % (key, value))
+
+    def writeHeader(self, header):
+        """Write header tags
+
+        :header: list of (tag, value) pairs
+        """
+        for key, value in header:
+            self._write(key, value)
+        self.fb.write('\n')
+
+    def writeTerm(self, term):
+        self.fb.write('[Term]\n')
+        self._write('id', term.id)
+        self._write('name', term.name)
+
+        for alt_id in term.alt_id:
+            self._write('alt_id', alt_id)
+
+        if term.defn is not None:
+            defn = u'"%s"' % term.defn['name']
+            if term.defn['code'] is not None:
+                defn += u' [%s]' % term.defn['code']
+            self._write('def', defn)
+
+        for subset in term.subset:
+            self._write('subset', subset)
+
+        for is_a in term.is_a:
+            if is_a['name'] is None:
+                self._write('is_a', is_a['code'])
+            else:
+                self._write('is_a', u'%s ! %s' % (is_a['code'], is_a['name']))
+
+        for syn in term.synonym:
+            value = u'"%s"' % syn['name']
+            if syn['type'] is not None:
+                value += u' ' + syn['type']
+            if syn['code'] is not None:
+                value += u' [%s]' % syn['code']
+            self._write('synonym', value)
+
+        for xref in term.xref:
+            if xref['src'] is None:
+                self._write('xref', xref['code'])
+            else:
+                self._write('xref', u'%s %s' % (xref['code'], xref['src']))
+
+        for field in ['intersection_of', 'union_of']:
+            for value in getattr(term, field):
+                self._write(field, value)
+
+        for rel in term.relationship:
+            value = u'%s %s' % (rel['type'], rel['code'])
+            if rel['name'] is not None:
+                value += u' ! ' + rel['name']
+            self._write('relationship', value)
+
+        for value in term.property_value:
+            self._write('property_value', value)
+
+        self.fb.write('\n')
+
+    def writeTypedef(self, tags):
+        """Write a [Typedef] stanza
+
+        :tags: list of (tag, value) pairs, starting with the id
+        """
+        self.fb.write('[Typedef]\n')
+        for key, value in tags:
+            self._write(key, value)
+        self.fb.write('\n')
+
+    def open(self, filename):
+        self.filename = filename
+        self.fb = codecs.open(filename, 'w', 'utf-8')
+
     def close(self):
         if self.fb is not None:
             self.fb.close()
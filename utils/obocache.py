@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Persistent binary cache of parsed OBO terms
+
+The cache is stored next to the OBO file (filename.obo.cache). It starts
+with a fixed width text header holding the EntryParser version and the
+parse options the terms were read with, and the size, mtime and SHA-1
+hash of the OBO file, followed by marshal blocks of terms. A cache written
+by another parser version or with other options is rebuilt. Each block carries its
+own string table storing every distinct string once, and terms refer to
+strings by their position in it, so memory stays bounded by the block size
+on both ends. Reading the cache needs no regex parsing at all.
+
+The cache is used through OBOReader:
+     with OBOReader('filename.obo', cache=True) as obo:
+         for term in obo:
+             print term.name
+
+Created on   : 2026-10-19
+"""
+
+import hashlib
+import marshal
+import os
+import tempfile
+
+from .obo import OBOTerm, Definition, Synonym, Xref, Relationship, IsA, \
+    PARSER_VERSION
+from .oboindex import fileStamp
+
+CACHE_MAGIC = 'OBOCache 2'
+# magic, parser version, options, size, mtime, hash
+HEADER = '%-10s %4d %-16s %20d %20d %40s\n'
+HEADER_SIZE = len(HEADER % (CACHE_MAGIC, 0, '', 0, 0, ''))
+BLOCK_SIZE = 1000
+
+# Record class of each list field, None for plain strings
+FIELDS = [
+    ('alt_id', None),
+    ('is_a', IsA),
+    ('synonym', Synonym),
+    ('xref', Xref),
+    ('relationship', Relationship),
+    ('intersection_of', None),
+    ('union_of', None),
+    ('subset', None),
+    ('property_value', None),
+]
+
+
+def cacheName(filename):
+    """Default cache filename for an OBO file"""
+    return filename + '.cache'
+
+
+def cacheOptions(shareCodes=False):
+    """Header token of the OBOReader options the cached terms depend on"""
+    return 'shareCodes=%d' % bool(shareCodes)
+
+
+def fileHash(filename, blockSize=1024 * 1024):
+    """SHA-1 hex digest of a file's content"""
+    sha = hashlib.sha1()
+    with open(filename, 'rb') as fb:
+        for block in iter(lambda: fb.read(blockSize), ''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def readHeader(cachename):
+    """Returns (parser version, options, size, mtime, hash) stored in the
+    cache, or None"""
+    if not os.path.exists(cachename):
+        return None
+
+    with open(cachename, 'rb') as fb:
+        header = fb.read(HEADER_SIZE).split()
+
+    if len(header) != 7 or ' '.join(header[:2]) != CACHE_MAGIC:
+        return None
+    return (int(header[2]), header[3], int(header[4]), int(header[5]),
+            header[6])
+
+
+def isCacheValid(filename, cachename=None, options=cacheOptions()):
+    """Check whether the cache matches the OBO file, the parser version and
+    the options. The size must match. When only the mtime differs, the
+    content hash decides, and the mtime in the header is refreshed for a
+    matching hash."""
+    if cachename is None:
+        cachename = cacheName(filename)
+
+    header = readHeader(cachename)
+    if header is None:
+        return False
+
+    version, cachedOptions, cachedSize, cachedMtime, sha = header
+    if version != PARSER_VERSION or cachedOptions != options:
+        return False
+    size, mtime = fileStamp(filename)
+    if cachedSize != size:
+        return False
+    if cachedMtime == mtime:
+        return True
+    if sha != fileHash(filename):
+        return False
+
+    try:
+        with open(cachename, 'r+b') as fb:
+            fb.write(HEADER % (CACHE_MAGIC, version, options, size, mtime,
+                               sha))
+    except IOError:
+        # read only cache, the hash is checked again next time
+        pass
+    return True
+
+
+class TermBlockWriter(object):
+    """Writes terms as marshal blocks with per block string tables"""
+    def __init__(self, fb, blockSize=BLOCK_SIZE):
+        self.fb = fb
+        self.blockSize = blockSize
+        self.strings = {}
+        self.table = []
+        self.terms = []
+
+    def _str(self, s):
+        if s is None:
+            return None
+        i = self.strings.get(s)
+        if i is None:
+            i = self.strings[s] = len(self.table)
+            self.table.append(s)
+        return i
+
+    def _record(self, record):
+        return tuple(self._str(v) for v in record.__getstate__())
+
+    def write(self, term):
+        s = self._str
+        row = [s(term.id), s(term.name),
+               None if term.defn is None else self._record(term.defn)]
+        for field, cls in FIELDS:
+            values = getattr(term, field)
+            if cls is None:
+                row.append(tuple(s(v) for v in values))
+            else:
+                row.append(tuple(self._record(v) for v in values))
+        self.terms.append(tuple(row))
+
+        if len(self.terms) >= self.blockSize:
+            self.flush()
+
+    def flush(self):
+        if self.terms:
+            marshal.dump((self.table, self.terms), self.fb)
+            self.strings = {}
+            self.table = []
+            self.terms = []
+
+
+def readBlocks(fb):
+    """Generate the OBOTerm objects of the marshal blocks in a file, read
+    from the current position to the end"""
+    def record(table, cls, values):
+        return cls(*[None if i is None else table[i] for i in values])
+
+    while True:
+        try:
+            table, terms = marshal.load(fb)
+        except EOFError:
+            break
+
+        for row in terms:
+            term = OBOTerm(table[row[0]], table[row[1]])
+            if row[2] is not None:
+                term.defn = record(table, Definition, row[2])
+            for (field, cls), values in zip(FIELDS, row[3:]):
+                if not values:
+                    continue
+                if cls is None:
+                    setattr(term, field, [table[i] for i in values])
+                else:
+                    setattr(term, field,
+                            [record(table, cls, v) for v in values])
+            yield term
+
+
+class OBOCacheWriter(object):
+    """Writes terms to a temporary cache file, which replaces the cache on
+    commit(). The temporary file has a unique name, so concurrent writers
+    do not mix their terms; the last commit wins. Raises IOError or
+    OSError if the directory is not writable."""
+    def __init__(self, filename, cachename=None, options=cacheOptions()):
+        self.filename = filename
+        self.cachename = cachename or cacheName(filename)
+        self.options = options
+        self.stamp = fileStamp(filename)
+        fd, self.tmpname = tempfile.mkstemp(
+            prefix=os.path.basename(self.cachename) + '.',
+            suffix='.tmp', dir=os.path.dirname(self.cachename) or '.')
+        self.fb = os.fdopen(fd, 'wb')
+        self.fb.write(HEADER % (CACHE_MAGIC, 0, '', 0, 0, ''))
+        self.blocks = TermBlockWriter(self.fb)
+
+    def write(self, term):
+        self.blocks.write(term)
+
+    def commit(self):
+        """Finish the cache, unless the OBO file changed while reading"""
+        self.blocks.flush()
+        if fileStamp(self.filename) != self.stamp:
+            self.abort()
+            return
+
+        self.fb.seek(0)
+        self.fb.write(HEADER % ((CACHE_MAGIC, PARSER_VERSION, self.options) +
+                                self.stamp + (fileHash(self.filename),)))
+        self.fb.close()
+        self.fb = None
+        # mkstemp creates the file readable by its owner only
+        os.chmod(self.tmpname, 0o644)
+        os.rename(self.tmpname, self.cachename)
+
+    def abort(self):
+        if self.fb is not None:
+            self.fb.close()
+            self.fb = None
+            os.remove(self.tmpname)
+
+
+def readCache(filename, cachename=None):
+    """Generate the OBOTerm objects stored in a cache"""
+    if cachename is None:
+        cachename = cacheName(filename)
+
+    with open(cachename, 'rb') as fb:
+        fb.seek(HEADER_SIZE)
+        for term in readBlocks(fb):
+            yield term
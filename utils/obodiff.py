@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Streaming diff of two OBO releases
+
+Both files are read as id-sorted term streams and merged like sorted lists,
+so only the two current terms are held in memory. Files in id order, as
+generateOBO writes them, are streamed directly; others go through an
+external sort first.
+
+Typical usage:
+     for delta in diffOBO('umls_old.obo', 'umls.obo'):
+         print delta
+
+Created on   : 2026-10-19
+"""
+
+from .obo import OBOReader
+from .oboindex import scanStanzas
+from .extsort import sortTerms, RUN_SIZE
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+
+def isSorted(filename):
+    """Check whether the terms of an OBO file are in id order. Only the id
+    lines are looked at, so this runs at sequential read speed."""
+    last = None
+    with open(filename, 'rb') as fb:
+        for offset, length, ids in scanStanzas(fb):
+            if not ids:
+                continue
+            if last is not None and ids[0] < last:
+                return False
+            last = ids[0]
+    return True
+
+
+def checkedOrder(terms, filename):
+    """Pass terms through, raising ValueError if they are not id sorted"""
+    last = None
+    for term in terms:
+        if last is not None and term.id < last:
+            raise ValueError('%s is not sorted by id: %s after %s' %
+                             (filename, term.id, last))
+        last = term.id
+        yield term
+
+
+def sortedTerms(filename, sort=None, runSize=RUN_SIZE, tmpdir=None):
+    """Generate the terms of an OBO file in id order
+
+    :filename: OBO file to read
+    :sort: True to always sort, False to never sort, None to sort only
+            when the file is not in id order
+    """
+    if sort is None:
+        sort = not isSorted(filename)
+
+    with OBOReader(filename) as obo:
+        if sort:
+            terms = sortTerms(obo, runSize=runSize, tmpdir=tmpdir)
+        else:
+            terms = checkedOrder(obo, filename)
+        for term in terms:
+            yield term
+
+
+def _syn(syn):
+    return (syn['name'], syn['type'], syn['code'])
+
+
+def _listDelta(old, new):
+    oldSet = set(old)
+    newSet = set(new)
+    delta = {}
+    added = [v for v in new if v not in oldSet]
+    removed = [v for v in old if v not in newSet]
+    if added:
+        delta['added'] = added
+    if removed:
+        delta['removed'] = removed
+    return delta
+
+
+def _synDict(syn):
+    return {'name': syn[0], 'type': syn[1], 'code': syn[2]}
+
+
+def termDelta(old, new):
+    """Differences between two versions of a term
+
+    :returns: a dict with the changed fields, empty if the terms match
+    """
+    delta = {}
+    if old.name != new.name:
+        delta['name'] = {'old': old.name, 'new': new.name}
+
+    oldDef = old.defn['name'] if old.defn is not None else None
+    newDef = new.defn['name'] if new.defn is not None else None
+    if oldDef != newDef:
+        delta['def'] = {'old': oldDef, 'new': newDef}
+
+    syns = _listDelta([_syn(s) for s in old.synonym],
+                      [_syn(s) for s in new.synonym])
+    if syns:
+        delta['synonym'] = dict((k, [_synDict(s) for s in v])
+                                for k, v in syns.iteritems())
+
+    for field, values in [
+            ('is_a', lambda t: [i['code'] for i in t.is_a]),
+            ('relationship', lambda t: ['%s %s' % (r['type'], r['code'])
+                                        for r in t.relationship]),
+            ('xref', lambda t: [x['code'] for x in t.xref]),
+            ('subset', lambda t: list(t.subset))]:
+        changes = _listDelta(values(old), values(new))
+        if changes:
+            delta[field] = changes
+
+    return delta
+
+
+def diffTerms(oldTerms, newTerms):
+    """Merge two id-sorted term streams into per-term deltas
+
+    :returns: a generator of dicts with 'id' and 'status' keys, plus 'name'
+            for added and removed terms and the termDelta() fields for
+            changed terms
+    """
+    oldTerms = iter(oldTerms)
+    newTerms = iter(newTerms)
+    old = next(oldTerms, None)
+    new = next(newTerms, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old.id < new.id):
+            yield {'id': old.id, 'status': REMOVED, 'name': old.name}
+            old = next(oldTerms, None)
+        elif old is None or new.id < old.id:
+            yield {'id': new.id, 'status': ADDED, 'name': new.name}
+            new = next(newTerms, None)
+        else:
+            delta = termDelta(old, new)
+            if delta:
+                delta['id'] = new.id
+                delta['status'] = CHANGED
+                yield delta
+            old = next(oldTerms, None)
+            new = next(newTerms, None)
+
+
+def diffOBO(oldFile, newFile, sort=None, runSize=RUN_SIZE, tmpdir=None):
+    """Diff two OBO files, see diffTerms() and sortedTerms()"""
+    return diffTerms(sortedTerms(oldFile, sort, runSize, tmpdir),
+                     sortedTerms(newFile, sort, runSize, tmpdir))
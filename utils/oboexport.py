@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Exports OBO terms to tab separated files for MySQL LOAD DATA INFILE
+
+Three files are written per OBO file: concepts, synonyms (including xrefs)
+and relationships (including is_a). Fields are escaped the way LOAD DATA
+reads them with its default FIELDS/LINES options, so tabs, newlines and
+backslashes in values survive, and missing values are written as \\N
+(NULL). Rows are formatted in batches and written with one call per batch.
+
+With processes > 1, [Term] aligned chunks of the OBO file are parsed and
+exported by a process pool into part files, which are then concatenated
+in file order, so the output does not depend on the number of processes.
+
+Typical usage:
+     counts = exportOBO('uberon.obo')
+     with engine.connect() as conn:
+         loadTables(conn, 'uberon.obo', prefix='UBERON_')
+
+Created on   : 2026-10-19
+"""
+
+import io
+import os
+import re
+import shutil
+from multiprocessing import Pool
+
+from sqlalchemy import text
+
+from .obo import OBOReader
+from .oboparallel import CHUNK_SIZE, chunkRanges, parseChunk
+
+NULL = u'\\N'
+BATCH_SIZE = 10000
+
+_SPECIAL = re.compile(u'[\\\\\t\n\r\x00]')
+_ESCAPES = {u'\\': u'\\\\', u'\t': u'\\t', u'\n': u'\\n', u'\r': u'\\r',
+            u'\x00': u'\\0'}
+
+
+def escapeField(value):
+    """Escape a value for LOAD DATA INFILE, None becomes \\N"""
+    if value is None:
+        return NULL
+    if _SPECIAL.search(value) is None:
+        return value
+    return _SPECIAL.sub(lambda m: _ESCAPES[m.group()], value)
+
+
+def formatRow(row):
+    return u'\t'.join([escapeField(v) for v in row]) + u'\n'
+
+
+def conceptRows(term):
+    if term.defn is not None:
+        yield term.id, term.name, term.defn['name'], term.defn['code']
+    else:
+        yield term.id, term.name, None, None
+
+
+def synonymRows(term):
+    """Synonyms, one row per code of a comma separated code list, then
+    xrefs as EXACT synonyms"""
+    for synonym in term.synonym:
+        if synonym['code'] is not None:
+            codes = [c.strip() for c in synonym['code'].split(',')]
+        else:
+            codes = [None]
+        for code in codes:
+            yield term.id, synonym['name'], synonym['type'], code
+
+    for xref in term.xref:
+        yield term.id, xref['src'], u'EXACT', xref['code']
+
+
+def relationshipRows(term):
+    for is_a in term.is_a:
+        yield term.id, u'is_a', is_a['code'], is_a['name']
+    for rel in term.relationship:
+        yield term.id, rel['type'], rel['code'], rel['name']
+
+
+# (table, file suffix, row generator, columns)
+TABLES = [
+    ('concept', '_con.tsv', conceptRows, ['ID', 'NAME', 'DEF', 'DEF_CODE']),
+    ('synonym', '_syn.tsv', synonymRows, ['ID', 'NAME', 'TYPE', 'CODE']),
+    ('relationship', '_rel.tsv', relationshipRows,
+     ['ID', 'REL', 'CODE', 'NAME']),
+]
+
+DDL = {
+    'concept': """(ID varchar(64) NOT NULL, NAME text, DEF text,
+                  DEF_CODE text, KEY X_ID (ID))""",
+    'synonym': """(ID varchar(64) NOT NULL, NAME text, TYPE varchar(32),
+                  CODE varchar(255), KEY X_ID (ID))""",
+    'relationship': """(ID varchar(64) NOT NULL, REL varchar(64) NOT NULL,
+                       CODE varchar(64) NOT NULL, NAME text,
+                       KEY X_ID (ID), KEY X_CODE (CODE))""",
+}
+
+
+def exportNames(base):
+    """Output filenames of each table for an output base name"""
+    return dict((table, base + suffix) for table, suffix, r, c in TABLES)
+
+
+class TSVWriter(object):
+    """Writes escaped rows in batches of batchSize rows"""
+    def __init__(self, filename, batchSize=BATCH_SIZE):
+        self.fb = io.open(filename, 'w', encoding='utf-8')
+        self.batchSize = batchSize
+        self.batch = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def writeRows(self, rows):
+        for row in rows:
+            self.batch.append(formatRow(row))
+        if len(self.batch) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.fb.write(u''.join(self.batch))
+            self.count += len(self.batch)
+            self.batch = []
+
+    def close(self):
+        if self.fb is not None:
+            self.flush()
+            self.fb.close()
+            self.fb = None
+
+
+def exportTerms(terms, base, batchSize=BATCH_SIZE):
+    """Export terms to the files named by exportNames(base)
+
+    :returns: dict of the number of rows written per table
+    """
+    names = exportNames(base)
+    writers = []
+    try:
+        for table, suffix, rows, columns in TABLES:
+            writers.append((table, rows, TSVWriter(names[table], batchSize)))
+        for term in terms:
+            for table, rows, writer in writers:
+                writer.writeRows(rows(term))
+    finally:
+        for table, rows, writer in writers:
+            writer.close()
+
+    return dict((table, writer.count) for table, rows, writer in writers)
+
+
+def _exportChunk(args):
+    """Pool worker exporting a byte range to part files"""
+    filename, start, end, base = args
+    return exportTerms(parseChunk(filename, start, end), base)
+
+
+def _concat(parts, filename):
+    with open(filename, 'wb') as out:
+        for part in parts:
+            with open(part, 'rb') as fb:
+                shutil.copyfileobj(fb, out, 1024 * 1024)
+            os.remove(part)
+
+
+def exportOBO(filename, base=None, processes=1, chunkSize=CHUNK_SIZE):
+    """Export an OBO file to LOAD DATA INFILE ready files
+
+    :filename: OBO file to export
+    :base: output base name, defaults to the OBO filename
+    :processes: number of worker processes for a chunked export
+    :chunkSize: approximate chunk size in bytes for a chunked export
+    :returns: dict of the number of rows written per table
+    """
+    if base is None:
+        base = filename
+
+    ranges = chunkRanges(filename, chunkSize) if processes > 1 else []
+    if len(ranges) < 2:
+        with OBOReader(filename) as obo:
+            return exportTerms(obo, base)
+
+    partBases = ['%s.part%05d' % (base, i) for i in range(len(ranges))]
+    pool = Pool(processes)
+    try:
+        results = pool.map(_exportChunk,
+                           [(filename, start, end, partBase) for
+                            (start, end), partBase in zip(ranges, partBases)])
+    finally:
+        pool.terminate()
+        pool.join()
+
+    names = exportNames(base)
+    for table in names:
+        _concat([exportNames(p)[table] for p in partBases], names[table])
+
+    return dict((table, sum(r[table] for r in results)) for table in names)
+
+
+def loadTables(conn, base, prefix='', replace=False):
+    """Bulk load the exported files into <prefix>concept, <prefix>synonym
+    and <prefix>relationship, creating the tables if needed. LOAD DATA
+    LOCAL INFILE has to be allowed by the server (local_infile=1) and by
+    the driver: mysql-connector-python 2.0 allows it by default, MySQLdb
+    needs connect_args={'local_infile': 1}.
+
+    :conn: sqlalchemy connection to a MySQL database
+    :base: output base name the files were exported with
+    :prefix: table name prefix
+    :replace: empty the tables before loading
+    """
+    names = exportNames(base)
+    for table, suffix, rows, columns in TABLES:
+        name = prefix + table
+        conn.execute('CREATE TABLE IF NOT EXISTS %s %s '
+                     'DEFAULT CHARSET=utf8' % (name, DDL[table]))
+        if replace:
+            conn.execute('TRUNCATE TABLE %s' % name)
+        conn.execute(text("LOAD DATA LOCAL INFILE :filename INTO TABLE %s "
+                          "CHARACTER SET utf8 "
+                          "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                          "LINES TERMINATED BY '\\n' (%s)" %
+                          (name, ', '.join(columns))),
+                     filename=os.path.abspath(names[table]))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Byte offset index for random access into OBO files
+
+The index is a sidecar file (filename.obo.idx) holding the byte offset and
+length of every [Term] stanza, keyed by id and alt_id. It is built with a
+single streaming pass and rebuilt automatically whenever the size or the
+modification time of the OBO file changes.
+
+Typical usage:
+     with OBOIndexReader('filename.obo') as obo:
+         print obo.get('UMLS:C0000005').name
+         for term in obo.terms(['UMLS:C0000039', 'UMLS:C0000052']):
+             print term.name
+
+Created on   : 2026-10-19
+"""
+
+import mmap
+import os
+
+from .obo import OBOLineReader
+
+INDEX_MAGIC = '# OBOIndex 1'
+
+
+def indexName(filename):
+    """Default sidecar index filename for an OBO file"""
+    return filename + '.idx'
+
+
+def fileStamp(filename):
+    """Returns the (size, mtime) pair identifying the state of a file.
+    mtime is in milliseconds."""
+    st = os.stat(filename)
+    return st.st_size, int(st.st_mtime * 1000)
+
+
+def scanStanzas(fb):
+    """Scan an OBO file opened in binary mode stanza by stanza.
+
+    :fb: file object opened in binary mode
+    :returns: a generator of (offset, length, ids) tuples for each [Term]
+            stanza, where ids is the list of id and alt_id values
+    """
+    offset = 0
+    start = None
+    ids = []
+    for line in fb:
+        if line.startswith('['):
+            if start is not None:
+                yield start, offset - start, ids
+            if line.strip() == '[Term]':
+                start = offset
+                ids = []
+            else:
+                start = None
+        elif start is not None:
+            row = line.split(':', 1)
+            key = row[0].strip()
+            if len(row) > 1 and key in ('id', 'alt_id'):
+                ids.append(row[1].strip())
+        offset += len(line)
+
+    if start is not None:
+        yield start, offset - start, ids
+
+
+def buildIndex(filename, idxname=None):
+    """Build the sidecar index for the given OBO file
+
+    :filename: OBO file to index
+    :idxname: index filename, defaults to filename.idx
+    :returns: number of indexed stanzas
+    """
+    if idxname is None:
+        idxname = indexName(filename)
+
+    size, mtime = fileStamp(filename)
+    tmpname = idxname + '.tmp'
+    count = 0
+    with open(filename, 'rb') as fb:
+        with open(tmpname, 'wb') as out:
+            out.write('%s %d %d\n' % (INDEX_MAGIC, size, mtime))
+            for offset, length, ids in scanStanzas(fb):
+                for termId in ids:
+                    out.write('%s\t%d\t%d\n' % (termId, offset, length))
+                count += 1
+
+    os.rename(tmpname, idxname)
+    return count
+
+
+def isIndexValid(filename, idxname=None):
+    """Check whether the index exists and matches the current OBO file"""
+    if idxname is None:
+        idxname = indexName(filename)
+
+    if not os.path.exists(idxname):
+        return False
+
+    with open(idxname, 'rb') as fb:
+        header = fb.readline().split()
+
+    if ' '.join(header[:3]) != INDEX_MAGIC or len(header) != 5:
+        return False
+
+    size, mtime = fileStamp(filename)
+    return int(header[3]) == size and int(header[4]) == mtime
+
+
+def loadIndex(idxname):
+    """Load a sidecar index into a dict of id -> (offset, length)"""
+    index = {}
+    with open(idxname, 'rb') as fb:
+        fb.readline()
+        for line in fb:
+            termId, offset, length = line.rstrip('\n').split('\t')
+            index[termId.decode('utf-8')] = (int(offset), int(length))
+
+    return index
+
+
+class OBOIndexReader(object):
+    """Random access OBO reader backed by a byte offset index and mmap.
+
+    Iterating the reader yields every term in file order, just like
+    OBOReader does.
+    """
+    def __init__(self, filename, idxname=None, rebuild=True):
+        self.fb = None
+        self.mm = None
+        self.index = {}
+        self.filename = filename
+        self.idxname = idxname or indexName(filename)
+        self.open(filename, rebuild)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def __contains__(self, termId):
+        return termId in self.index
+
+    def __len__(self):
+        return len(self.offsets())
+
+    def __iter__(self):
+        for offset, length in self.offsets():
+            yield self._parse(offset, length)
+
+    def offsets(self):
+        """Sorted list of distinct (offset, length) pairs of all terms"""
+        return sorted(set(self.index.itervalues()))
+
+    def _parse(self, offset, length):
+        text = self.mm[offset:offset + length].decode('utf-8')
+        for term in OBOLineReader(text.splitlines(True)):
+            return term
+
+    def get(self, termId, default=None):
+        """Returns the OBOTerm for an id or alt_id
+
+        :termId: id or alt_id of the term
+        :default: value to return for unknown ids
+        """
+        pos = self.index.get(termId)
+        if pos is None:
+            return default
+        return self._parse(*pos)
+
+    def terms(self, termIds):
+        """Batch lookup of many ids. Stanzas are read in offset order, so
+        the file is accessed sequentially. Unknown ids are skipped, and
+        a term is returned once even if requested through several ids.
+
+        :termIds: iterable of ids or alt_ids
+        :returns: a generator of OBOTerm objects in file order
+        """
+        positions = set()
+        for termId in termIds:
+            pos = self.index.get(termId)
+            if pos is not None:
+                positions.add(pos)
+
+        for offset, length in sorted(positions):
+            yield self._parse(offset, length)
+
+    def open(self, filename, rebuild=True):
+        if not isIndexValid(filename, self.idxname):
+            if not rebuild:
+                raise IOError('Index %s is missing or outdated' %
+                              self.idxname)
+            buildIndex(filename, self.idxname)
+
+        self.index = loadIndex(self.idxname)
+        self.fb = open(filename, 'rb')
+        if os.fstat(self.fb.fileno()).st_size > 0:
+            self.mm = mmap.mmap(self.fb.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.mm = ''
+
+    def close(self):
+        if self.mm is not None:
+            if not isinstance(self.mm, str):
+                self.mm.close()
+            self.mm = None
+
+        if self.fb is not None:
+            self.fb.close()
+            self.fb = None
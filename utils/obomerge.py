@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Merges several OBO files into one ontology
+
+Terms of all inputs are streamed in id order, through an external sort
+unless every input is already sorted, so terms with the same id arrive
+together and are merged in bounded memory. Synonyms are deduplicated with
+the rules generateOBO.addSynIfNotExists uses. [Typedef] stanzas are read
+in a separate pass over the inputs and reconciled by id.
+
+Typical usage:
+     mergeOBO(['umls.obo', 'uberon.obo'], 'merged.obo')
+
+Created on   : 2026-10-19
+"""
+
+import codecs
+import heapq
+import logging
+from datetime import datetime
+from itertools import chain, groupby
+
+from .obo import OBOReader, OBOWriter, Synonym
+from .obodiff import isSorted
+from .extsort import sortTerms, RUN_SIZE
+
+# Typedef tags that can occur more than once
+MULTI_TAGS = ['xref', 'is_a', 'synonym', 'subset', 'alt_id',
+              'property_value', 'holds_over_chain', 'disjoint_from']
+
+
+def readStanzas(filename):
+    """Read the header and the [Typedef] stanzas of an OBO file, skipping
+    the terms
+
+    :returns: (header, typedefs); both are lists of (tag, value) pairs, one
+            list per typedef
+    """
+    header = []
+    typedefs = []
+    current = header
+    with codecs.open(filename, 'r', 'utf-8') as fb:
+        for line in fb:
+            line = line.strip()
+            if line.startswith('['):
+                if line == '[Typedef]':
+                    current = []
+                    typedefs.append(current)
+                else:
+                    current = None
+            elif current is not None and line and not line.startswith('!'):
+                row = [l.strip() for l in line.split(':', 1)]
+                if len(row) == 2:
+                    current.append((row[0], row[1]))
+    return header, typedefs
+
+
+def mergeHeaders(headers):
+    """Header tags of the first file, plus the subsetdefs of all files"""
+    header = [(k, v) for k, v in headers[0] if k not in ['date', 'subsetdef']]
+    header.append(('date', datetime.now().strftime('%d:%m:%Y %H:%M')))
+    seen = set()
+    for h in headers:
+        for key, value in h:
+            if key == 'subsetdef':
+                name = value.split(' ', 1)[0]
+                if name not in seen:
+                    seen.add(name)
+                    header.append((key, value))
+    return header
+
+
+def mergeTypedefs(typedefs, relTypes=()):
+    """Reconcile typedefs by id. Single valued tags keep the first value,
+    multi valued tags are united. Relationship types without a typedef
+    get a minimal one, as generateOBO does.
+
+    :typedefs: lists of (tag, value) pairs
+    :relTypes: relationship types used by the merged terms
+    :returns: list of typedefs, each a list of (tag, value) pairs
+    """
+    merged = {}
+    order = []
+    for tags in typedefs:
+        tags = list(tags)
+        ids = [v for k, v in tags if k == 'id']
+        if not ids:
+            continue
+        tid = ids[0]
+        if tid not in merged:
+            merged[tid] = [('id', tid)]
+            order.append(tid)
+
+        current = merged[tid]
+        for key, value in tags:
+            if key == 'id' or (key, value) in current:
+                continue
+            values = [v for k, v in current if k == key]
+            if values and key not in MULTI_TAGS:
+                logging.warning('Conflicting %s for typedef %s: %s, kept %s'
+                                % (key, tid, value, values[0]))
+                continue
+            current.append((key, value))
+
+    for relType in relTypes:
+        if relType not in merged:
+            merged[relType] = [('id', relType), ('name', relType)]
+            order.append(relType)
+
+    return [merged[tid] for tid in order]
+
+
+def _addUnique(term, field, value, key=lambda v: v):
+    k = key(value)
+    for v in getattr(term, field):
+        if key(v) == k:
+            return
+    term.add(field, value)
+
+
+def addSynIfNotExists(term, syn):
+    """Add a synonym unless the term has one with the same type and code,
+    and a case insensitively equal name. A synonym repeating the term name
+    with the term id as its code is skipped, too."""
+    lname = syn['name'].lower()
+    for s in term.synonym:
+        if s['type'] == syn['type'] and \
+           s['code'] == syn['code'] and \
+           s['name'].lower() == lname:
+            return
+
+    if term.name.lower() == lname and term.id == syn['code']:
+        return
+
+    term.add('synonym', syn)
+
+
+def mergeTerm(term, other):
+    """Merge the entries of another term with the same id into term"""
+    if other.name and other.name != term.name:
+        if not term.name:
+            term.name = other.name
+        else:
+            addSynIfNotExists(term, Synonym(other.name, 'EXACT', None))
+
+    if term.defn is None:
+        term.defn = other.defn
+
+    for syn in other.synonym:
+        addSynIfNotExists(term, syn)
+
+    for xref in other.xref:
+        _addUnique(term, 'xref', xref, lambda x: x['code'])
+    for is_a in other.is_a:
+        _addUnique(term, 'is_a', is_a, lambda i: i['code'])
+    for rel in other.relationship:
+        _addUnique(term, 'relationship', rel,
+                   lambda r: (r['type'], r['code']))
+    for field in ['alt_id', 'subset', 'intersection_of', 'union_of',
+                  'property_value']:
+        for value in getattr(other, field):
+            _addUnique(term, field, value)
+
+
+def _keyed(obo, i):
+    for j, term in enumerate(obo):
+        yield term.id, i, j, term
+
+
+def mergedTerms(filenames, runSize=RUN_SIZE, tmpdir=None):
+    """Generate one merged term per id, in id order"""
+    readers = [OBOReader(f) for f in filenames]
+    try:
+        if all(isSorted(f) for f in filenames):
+            terms = (t[-1] for t in heapq.merge(
+                *[_keyed(obo, i) for i, obo in enumerate(readers)]))
+        else:
+            terms = sortTerms(chain(*readers), runSize=runSize,
+                              tmpdir=tmpdir)
+
+        for tid, group in groupby(terms, lambda t: t.id):
+            term = next(group)
+            for other in group:
+                mergeTerm(term, other)
+            yield term
+    finally:
+        for obo in readers:
+            obo.close()
+
+
+def mergeOBO(filenames, output, runSize=RUN_SIZE, tmpdir=None):
+    """Merge OBO files into output
+
+    :returns: number of terms written
+    """
+    stanzas = [readStanzas(f) for f in filenames]
+    count = 0
+    relTypes = set()
+    with OBOWriter(output) as out:
+        out.writeHeader(mergeHeaders([h for h, t in stanzas]))
+        for term in mergedTerms(filenames, runSize, tmpdir):
+            relTypes.update(r['type'] for r in term.relationship)
+            out.writeTerm(term)
+            count += 1
+
+        typedefs = chain(*[t for h, t in stanzas])
+        for tags in mergeTypedefs(typedefs, sorted(relTypes)):
+            out.writeTypedef(tags)
+
+    return count
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Parallel OBO file reader
+
+The file is split into byte ranges aligned on [Term] boundaries and the
+ranges are parsed in a process pool with the same semantics as OBOReader.
+At most `window` chunks are in flight at any time, so memory use is bounded
+regardless of the file size.
+
+Typical usage:
+     with ParallelOBOReader('filename.obo', processes=4) as obo:
+         for term in obo:
+             print term.name
+
+Created on   : 2026-10-19
+"""
+
+import os
+import traceback
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from Queue import Queue
+
+from .obo import OBOLineReader
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def nextTermOffset(fb, pos):
+    """Returns the offset of the first [Term] line starting at or after pos,
+    or None if there is none.
+
+    :fb: file object opened in binary mode
+    :pos: byte position to start looking from
+    """
+    if pos > 0:
+        # step back one byte so a line starting exactly at pos is kept
+        fb.seek(pos - 1)
+        offset = pos - 1 + len(fb.readline())
+    else:
+        fb.seek(0)
+        offset = 0
+
+    for line in iter(fb.readline, ''):
+        if line.startswith('[Term]'):
+            return offset
+        offset += len(line)
+
+    return None
+
+
+def chunkRanges(filename, chunkSize=CHUNK_SIZE):
+    """Split an OBO file into (start, end) byte ranges. Every range but the
+    first one starts with a [Term] line.
+
+    :filename: OBO file to split
+    :chunkSize: approximate size of each range in bytes
+    :returns: list of (start, end) tuples covering the whole file
+    """
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as fb:
+        pos = chunkSize
+        while pos < size:
+            offset = nextTermOffset(fb, pos)
+            if offset is None:
+                break
+            if offset > bounds[-1]:
+                bounds.append(offset)
+            pos = max(offset + 1, pos + chunkSize)
+
+    bounds.append(size)
+    return zip(bounds[:-1], bounds[1:])
+
+
+def parseChunk(filename, start, end):
+    """Parse a byte range of an OBO file into a list of OBOTerm objects"""
+    with open(filename, 'rb') as fb:
+        fb.seek(start)
+        text = fb.read(end - start).decode('utf-8')
+
+    return list(OBOLineReader(text.splitlines(True)))
+
+
+def _parseChunk(filename, start, end):
+    """Pool worker. Exceptions are returned rather than raised, since
+    apply_async has no error callback to wake up the reader with."""
+    try:
+        return None, parseChunk(filename, start, end)
+    except Exception:
+        return traceback.format_exc(), None
+
+
+class ParallelOBOReader(object):
+    """OBO file reader parsing chunks of the file in a process pool."""
+    def __init__(self, filename, processes=None, chunkSize=CHUNK_SIZE,
+                 ordered=True, window=None):
+        """
+        :filename: OBO file to read
+        :processes: number of worker processes, defaults to the CPU count
+        :chunkSize: approximate chunk size in bytes
+        :ordered: yield terms in file order. If False, the terms of each
+                chunk are yielded as soon as the chunk is parsed.
+        :window: maximum number of chunks in flight, defaults to twice the
+                number of processes
+        """
+        self.filename = filename
+        self.processes = processes or cpu_count()
+        self.chunkSize = chunkSize
+        self.ordered = ordered
+        self.window = window or 2 * self.processes
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        ranges = chunkRanges(self.filename, self.chunkSize)
+        if self.processes == 1 or len(ranges) == 1:
+            chunks = (parseChunk(self.filename, *r) for r in ranges)
+        elif self.ordered:
+            chunks = self._ordered(iter(ranges))
+        else:
+            chunks = self._unordered(iter(ranges))
+
+        for terms in chunks:
+            for term in terms:
+                yield term
+
+    def _submit(self, chunk, callback=None):
+        return self.pool.apply_async(_parseChunk,
+                                     (self.filename,) + chunk,
+                                     callback=callback)
+
+    def _result(self, chunk, res):
+        err, terms = res
+        if err is not None:
+            raise RuntimeError('Unable to parse %s [%d:%d]\n%s' %
+                               ((self.filename,) + chunk + (err,)))
+        return terms
+
+    def _ordered(self, ranges):
+        self.open()
+        pending = deque()
+        for chunk in ranges:
+            pending.append((chunk, self._submit(chunk)))
+            if len(pending) >= self.window:
+                break
+
+        while pending:
+            chunk, res = pending.popleft()
+            terms = self._result(chunk, res.get())
+            nextChunk = next(ranges, None)
+            if nextChunk is not None:
+                pending.append((nextChunk, self._submit(nextChunk)))
+            yield terms
+
+    def _unordered(self, ranges):
+        self.open()
+        done = Queue()
+        pending = 0
+
+        def submit(chunk):
+            self._submit(chunk, lambda res: done.put((chunk, res)))
+
+        for chunk in ranges:
+            submit(chunk)
+            pending += 1
+            if pending >= self.window:
+                break
+
+        while pending > 0:
+            chunk, res = done.get()
+            pending -= 1
+            terms = self._result(chunk, res)
+            nextChunk = next(ranges, None)
+            if nextChunk is not None:
+                submit(nextChunk)
+                pending += 1
+            yield terms
+
+    def open(self):
+        if self.pool is None:
+            self.pool = Pool(self.processes)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Single pass scanners for OBO entry values
+
+Each scanner returns the same groups as the matching EntryParser regex
+(XREF, DEF, SYN, IS_A, REL), or None where the regex would not match, but
+never looks at a character more than a constant number of times. Like the
+regexes, a quoted string ends at the last quote of the value, so escaped
+quotes in it need no special care.
+
+A trailing {...} qualifier is cut off the def and synonym values before
+scanning, so quotes inside it do not end the quoted string. is_a and
+relationship values may have a qualifier between the code and the
+'! name' comment. xref values keep their qualifier in the source group.
+
+Created on   : 2026-10-19
+"""
+
+import re
+
+# \s of a regex compiled without re.UNICODE
+WS = u' \t\n\r\f\v'
+
+# Runs of a single character class, and a sequence of them where every
+# step is decided by one character; none of these can backtrack
+_SPACES = re.compile(ur'\s*')
+_TOKEN = re.compile(ur'\S*')
+_TYPES = re.compile(ur'[^\s\[]+(?:\s[^\s\[]+)*')
+_BRACKET = re.compile(ur'[^\])]*')
+
+
+def _line(s, i):
+    """Rest of the string up to a newline, like (.*)"""
+    j = s.find(u'\n', i)
+    return s[i:] if j < 0 else s[i:j]
+
+
+def _qualifier(s, i, n):
+    """End of a {...} qualifier starting at i, or -1 if it is not closed.
+    Braces inside quoted values are ignored."""
+    quoted = False
+    while i < n:
+        c = s[i]
+        if c == u'\\':
+            i += 1
+        elif c == u'"':
+            quoted = not quoted
+        elif c == u'}' and not quoted:
+            return i + 1
+        i += 1
+    return -1
+
+
+def _stripQualifier(s):
+    """Cut a trailing ' {...}' qualifier off a value. The qualifier is the
+    first unquoted {...} after a space that runs to the end of the value,
+    so braces in quoted qualifier values do not start one."""
+    t = s.rstrip(WS)
+    n = len(t)
+    if not t.endswith(u'}'):
+        return s
+    quoted = False
+    i = 0
+    while i < n:
+        c = t[i]
+        if c == u'\\':
+            i += 1
+        elif c == u'"':
+            quoted = not quoted
+        elif c == u'{' and not quoted and i > 0 and t[i - 1] in WS:
+            end = _qualifier(t, i, n)
+            if end == n:
+                return t[:i]
+            if end < 0:
+                # nor would any later one, the quotes are the same
+                return s
+            i = end
+            continue
+        i += 1
+    return s
+
+
+def _quoted(s):
+    """Quoted string at the start of s, ending at the last quote
+
+    :returns: (string, index after the closing quote) or None
+    """
+    if not s.startswith(u'"'):
+        return None
+    q = s.rfind(u'"')
+    if q < 2:
+        return None
+    return s[1:q], q + 1
+
+
+def _bracket(s, i, n):
+    """Content of [...] at i, which may not contain ] or )"""
+    if i >= n or s[i] != u'[':
+        return None
+    j = _BRACKET.match(s, i + 1).end()
+    if j < n and s[j] == u']':
+        return s[i + 1:j]
+    return None
+
+
+def _comment(s, i, n):
+    """Optional '\\s+!\\s*(.*)' tail of is_a and relationship values"""
+    j = _SPACES.match(s, i).end()
+    if j == i:
+        return None
+    while j < n and s[j] == u'{':
+        end = _qualifier(s, j, n)
+        if end < 0:
+            return None
+        j = _SPACES.match(s, end).end()
+        if j == end:
+            return None
+    if j < n and s[j] == u'!':
+        return _line(s, _SPACES.match(s, j + 1).end())
+    return None
+
+
+def scanXref(s):
+    """(\\S+)(?:\\s+(.*))?"""
+    n = len(s)
+    j = _TOKEN.match(s).end()
+    if j == 0:
+        return None
+    if j == n:
+        return s, None
+    return s[:j], _line(s, _SPACES.match(s, j).end())
+
+
+def scanDef(s):
+    """"((?:\\"|[^""])+)"\\s*(?:\\[([^\\])]*)\\])?"""
+    s = _stripQualifier(s)
+    quoted = _quoted(s)
+    if quoted is None:
+        return None
+    name, i = quoted
+    n = len(s)
+    return name, _bracket(s, _SPACES.match(s, i).end(), n)
+
+
+def scanSyn(s):
+    """"((?:\\"|[^""])+)"(?:\\s([^\\s\\[]+(?:\\s[^\\s\\[]+)*))?
+    (?:\\s\\[([^\\])]*)\\])?"""
+    s = _stripQualifier(s)
+    quoted = _quoted(s)
+    if quoted is None:
+        return None
+    name, i = quoted
+    n = len(s)
+
+    synType = None
+    if i + 1 < n and s[i] in WS:
+        m = _TYPES.match(s, i + 1)
+        if m is not None:
+            synType = m.group()
+            i = m.end()
+
+    code = None
+    if i + 1 < n and s[i] in WS:
+        code = _bracket(s, i + 1, n)
+    return name, synType, code
+
+
+def scanIsA(s):
+    """(\\S+)(?:\\s+!\\s*(.*))?"""
+    n = len(s)
+    j = _TOKEN.match(s).end()
+    if j == 0:
+        return None
+    return s[:j], _comment(s, j, n)
+
+
+def scanRel(s):
+    """(\\S+)\\s+(\\S+)(?:\\s+!\\s*(.*))?"""
+    n = len(s)
+    j = _TOKEN.match(s).end()
+    if j == 0:
+        return None
+    k = _SPACES.match(s, j).end()
+    if k == j or k == n:
+        return None
+    m = _TOKEN.match(s, k).end()
+    return s[:j], s[k:m], _comment(s, m, n)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Columnar, array backed ontology store
+
+Terms are numbered in file order. Ids and names are kept in string tables,
+and is_a/relationship edges as int32 arrays in CSR form: the parents of
+node i are parents[ptr[i]:ptr[i + 1]], with their relationship type codes
+in types. Code 0 is always is_a.
+
+Typical usage:
+     onto = Ontology.fromOBO('umls.obo')
+     onto.save('umls.npz')
+     onto = Ontology.load('umls.npz')
+     nodes = onto.nodes(['UMLS:C0018787'])
+     print [onto.ids[p] for p in onto.parents(nodes)[1]]
+
+Created on   : 2026-10-19
+"""
+
+import logging
+from array import array
+
+import numpy as np
+
+from .obo import OBOReader
+from .npstore import StringTable, saveNpz, loadNpz
+
+IS_A = 'is_a'
+
+
+def gatherRows(ptr, values, nodes):
+    """Gather the CSR rows of many nodes at once
+
+    :ptr: CSR row pointer array
+    :values: CSR value array
+    :nodes: array of row numbers
+    :returns: (owner, positions) arrays; owner[k] is the position in nodes
+            of the row values[positions[k]] belongs to
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts = ptr[nodes]
+    lens = ptr[nodes + 1] - starts
+    total = lens.sum()
+    owner = np.repeat(np.arange(len(nodes)), lens)
+    # position of each gathered entry within its row
+    local = np.arange(total) - np.repeat(np.cumsum(lens) - lens, lens)
+    return owner, starts[owner] + local
+
+
+class Ontology(object):
+    """Ontology with contiguous string tables and CSR edge arrays"""
+    def __init__(self, arrays):
+        self.ids = StringTable.fromArrays(arrays, 'ids')
+        self.names = StringTable.fromArrays(arrays, 'names')
+        self.relTypes = list(StringTable.fromArrays(arrays, 'rel_types'))
+        self.subsets = list(StringTable.fromArrays(arrays, 'subset_names'))
+        self.ptr = arrays['ptr']
+        self.parentIdx = arrays['parents']
+        self.types = arrays['types']
+        self.subsetNodes = arrays['subset_nodes']
+        self.subsetCodes = arrays['subset_codes']
+        self._children = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def fromOBO(cls, filename):
+        """Build the store with a single pass of OBOReader. Edges to ids
+        that are not defined in the file are dropped."""
+        ids = []
+        names = []
+        index = {}
+        relTypes = {IS_A: 0}
+        subsets = {}
+        src = array('i')
+        codes = []
+        types = array('h')
+        subsetNodes = array('i')
+        subsetCodes = array('h')
+
+        with OBOReader(filename) as obo:
+            for term in obo:
+                node = len(ids)
+                ids.append(term.id)
+                names.append(term.name)
+                index[term.id] = node
+                for alt_id in term.alt_id:
+                    index.setdefault(alt_id, node)
+
+                for is_a in term.is_a:
+                    src.append(node)
+                    codes.append(is_a['code'])
+                    types.append(0)
+
+                for rel in term.relationship:
+                    src.append(node)
+                    codes.append(rel['code'])
+                    types.append(relTypes.setdefault(rel['type'],
+                                                     len(relTypes)))
+
+                for subset in term.subset:
+                    subsetNodes.append(node)
+                    subsetCodes.append(subsets.setdefault(subset,
+                                                          len(subsets)))
+
+        dst = np.fromiter((index.get(c, -1) for c in codes), dtype=np.int32,
+                          count=len(codes))
+        src = np.frombuffer(src, dtype=np.int32) if src else \
+            np.zeros(0, dtype=np.int32)
+        types = np.frombuffer(types, dtype=np.int16) if types else \
+            np.zeros(0, dtype=np.int16)
+
+        known = dst >= 0
+        if not known.all():
+            logging.warning('%d edges to undefined ids dropped in %s' %
+                            ((~known).sum(), filename))
+        src, dst, types = src[known], dst[known], types[known]
+
+        ptr = np.zeros(len(ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=len(ids)), out=ptr[1:])
+
+        arrays = {
+            'ptr': ptr,
+            'parents': dst,
+            'types': types,
+            'subset_nodes': np.array(subsetNodes, dtype=np.int32),
+            'subset_codes': np.array(subsetCodes, dtype=np.int16),
+        }
+        arrays.update(StringTable.fromList(ids).arrays('ids'))
+        arrays.update(StringTable.fromList(names).arrays('names'))
+        arrays.update(StringTable.fromList(
+            sorted(relTypes, key=relTypes.get)).arrays('rel_types'))
+        arrays.update(StringTable.fromList(
+            sorted(subsets, key=subsets.get)).arrays('subset_names'))
+
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """Load a store saved with save(), memory mapped by default"""
+        return cls(loadNpz(filename, mmap))
+
+    def save(self, filename):
+        """Save the store to an uncompressed .npz file"""
+        arrays = {
+            'ptr': self.ptr,
+            'parents': self.parentIdx,
+            'types': self.types,
+            'subset_nodes': self.subsetNodes,
+            'subset_codes': self.subsetCodes,
+        }
+        arrays.update(self.ids.arrays('ids'))
+        arrays.update(self.names.arrays('names'))
+        arrays.update(StringTable.fromList(self.relTypes).arrays('rel_types'))
+        arrays.update(StringTable.fromList(self.subsets)
+                      .arrays('subset_names'))
+        saveNpz(filename, arrays)
+
+    def nodes(self, termIds):
+        """Node numbers of the given ids, -1 for unknown ids"""
+        return np.array([self.ids.index(i) for i in termIds], dtype=np.int32)
+
+    def _typeMask(self, types, rel):
+        if rel is None:
+            return np.ones(len(types), dtype=bool)
+        if isinstance(rel, basestring):
+            rel = [rel]
+        codes = [self.relTypes.index(r) for r in rel if r in self.relTypes]
+        return np.in1d(types, codes)
+
+    def edges(self):
+        """(child, parent, type) arrays of all edges"""
+        src = np.repeat(np.arange(len(self), dtype=np.int32),
+                        np.diff(self.ptr))
+        return src, self.parentIdx, self.types
+
+    def parents(self, nodes, rel=IS_A):
+        """Parents of many nodes at once
+
+        :nodes: array of node numbers
+        :rel: relationship type or list of types to follow, None for all
+        :returns: (owner, parents) arrays; owner[k] is the position in nodes
+                of the node parents[k] belongs to
+        """
+        owner, pos = gatherRows(self.ptr, self.parentIdx, nodes)
+        mask = self._typeMask(self.types[pos], rel)
+        return owner[mask], self.parentIdx[pos[mask]]
+
+    def _reverse(self):
+        if self._children is None:
+            src, dst, types = self.edges()
+            order = np.argsort(dst, kind='mergesort')
+            ptr = np.zeros(len(self) + 1, dtype=np.int32)
+            np.cumsum(np.bincount(dst, minlength=len(self)), out=ptr[1:])
+            self._children = (ptr, src[order], types[order])
+        return self._children
+
+    def children(self, nodes, rel=IS_A):
+        """Children of many nodes at once, see parents()"""
+        ptr, childIdx, types = self._reverse()
+        owner, pos = gatherRows(ptr, childIdx, nodes)
+        mask = self._typeMask(types[pos], rel)
+        return owner[mask], childIdx[pos[mask]]
+
+    def roots(self):
+        """Nodes without an is_a parent"""
+        src, dst, types = self.edges()
+        isa = types == 0
+        return np.flatnonzero(
+            np.bincount(src[isa], minlength=len(self)) == 0)
+
+    def leaves(self):
+        """Nodes without an is_a child"""
+        src, dst, types = self.edges()
+        isa = types == 0
+        return np.flatnonzero(
+            np.bincount(dst[isa], minlength=len(self)) == 0)
+
+    def depth(self):
+        """Shortest is_a distance of each node from a root. Nodes that can
+        not be reached from any root (is_a cycles) get -1."""
+        depth = np.full(len(self), -1, dtype=np.int32)
+        frontier = self.roots()
+        level = 0
+        while len(frontier) > 0:
+            depth[frontier] = level
+            children = self.children(frontier)[1]
+            frontier = np.unique(children[depth[children] < 0])
+            level += 1
+        return depth
+
+    def subsetMask(self, subset):
+        """Boolean mask of the nodes that are members of a subset"""
+        mask = np.zeros(len(self), dtype=bool)
+        if subset in self.subsets:
+            code = self.subsets.index(subset)
+            mask[self.subsetNodes[self.subsetCodes == code]] = True
+        return mask
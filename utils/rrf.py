@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+UMLS RRF file layout
+
+Column positions of the MRCONSO.RRF and MRSTY.RRF files of a UMLS
+release, and the integer form CUIs are kept in by the in-memory indexes.
+
+Created on   : 2026-10-19
+"""
+
+# MRCONSO.RRF column positions
+RRF_CUI = 0
+RRF_LAT = 1
+RRF_LUI = 3
+RRF_SAB = 11
+RRF_CODE = 13
+RRF_STR = 14
+RRF_SUPPRESS = 16
+
+# MRSTY.RRF column positions
+STY_CUI = 0
+STY_TUI = 1
+
+
+def cuiNumber(cui):
+    """Integer of a CUI, e.g. 1 for C0000001"""
+    return int(cui[1:])
+
+
+def cuiString(number):
+    """CUI of an integer, inverse of cuiNumber()"""
+    return 'C%07d' % number
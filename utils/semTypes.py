@@ -179,6 +179,81 @@ SEM_TYPES = {
     ],
 }
 
+# SNOMED CT semantic tags, e.g. 'Asthma (disorder)', longest first
+SEM_TYPE_NAMEs = [
+    '(foundation metadata concept)',
+    '(context-dependent category)',
+    '(morphologic abnormality)',
+    '(administrative concept)',
+    '(navigational concept)',
+    '(contextual qualifier)',
+    '(geographic location)',
+    '(religion/philosophy)',
+    '(biological function)',
+    '(separate procedure)',
+    '(namespace concept)',
+    '(observable entity)',
+    '(assessment scale)',
+    '(record artifact)',
+    '(allelic variant)',
+    '(qualifier value)',
+    '(living organism)',
+    '(physical object)',
+    '(cell structure)',
+    '(surface region)',
+    '(physical force)',
+    '(regime/therapy)',
+    '(body structure)',
+    '(tumor staging)',
+    '(clinical exam)',
+    '(staging scale)',
+    '(combined site)',
+    '(manifestation)',
+    '(invertebrate)',
+    '(ethnic group)',
+    '(environment)',
+    '(Drosophila)',    #
+    '(medication)',
+    '(occupation)',
+    '(attribute)',
+    '(procedure)',
+    '(substance)',
+    '(diagnosis)',
+    '(treatment)',
+    '(situation)',
+    '(eukaryote)',
+    '(diagnosis)',
+    '(superior)',
+    '(inferior)',
+    '(obsolete)',
+    '(bacteria)',
+    '(lab test)',
+    '(disorder)',
+    '(specimen)',
+    '(organism)',
+    '(Medicine)',
+    '(etiology)',
+    '(function)',
+    '(property)',
+    '(disease)',
+    '(finding)',
+    '(product)',
+    '(symptom)',
+    '(degrees)',
+    '(history)',
+    '(lateral)',
+    '(person)',
+    '(fungus)',
+    '(medial)',
+    '(device)',
+    '(action)',
+    '(event)',
+    '(yeast)',    #
+    '(human)',
+    '(PLANT)',    #
+    '(cell)',
+]
+
 INV_SEM_TYPES = {}
 
 
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Term resolution HTTP service
+
+Resolves CUIs to their preferred name, synonyms, semantic types and
+semantic groups (semTypes.SEM_TYPES) over HTTP:
+
+     GET  /term/C0018787          one term, 404 if unknown
+     POST /terms ["C0018787",...] {"terms": {cui: term or null}}
+     GET  /stats                  cache counters
+
+Terms come from the UMLS tables through a pool of UMLS instances, each
+with its own connection and table metadata, or from an OBO file loaded
+in memory. Resolved terms, unknown CUIs included, are kept in an LRU
+cache in front of either source. Requests are served by a thread each,
+so slow lookups do not hold up the others.
+
+Typical usage:
+     resolver = CachedResolver(UMLSResolver(engine, size=8), 100000)
+     server = TermServer(('localhost', 8080), resolver)
+     server.serve_forever()
+
+Created on   : 2026-10-19
+"""
+
+import json
+import logging
+import re
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from collections import OrderedDict
+from SocketServer import ThreadingMixIn
+
+from .obo import OBOReader
+from .semTypes import INV_SEM_TYPES
+from .umls import UMLSPool, POOL_SIZE
+
+CACHE_SIZE = 100000
+MAX_BATCH = 1000
+UMLS_PREFIX = 'UMLS:'
+
+_TERM_PATH = re.compile(r'^/term/([^/?]+)$')
+
+
+def preferred(rows):
+    """Preferred atom of MRCONSO rows: the first P/PF/Y one, else the
+    first row"""
+    for row in rows:
+        if row['TS'] == 'P' and row['STT'] == 'PF' and row['ISPREF'] == 'Y':
+            return row
+    return rows[0]
+
+
+def makeTerm(cui, name, strings, tuis):
+    """Term dict of a CUI; strings equal to the name or to an earlier
+    string, ignoring case, are not synonyms"""
+    seen = set([name.lower()])
+    synonyms = []
+    for s in strings:
+        if s.lower() not in seen:
+            seen.add(s.lower())
+            synonyms.append(s)
+    tuis = sorted(set(tuis))
+    return {
+        'cui': cui,
+        'name': name,
+        'synonyms': synonyms,
+        'tuis': tuis,
+        'groups': sorted(set(INV_SEM_TYPES[t] for t in tuis
+                             if t in INV_SEM_TYPES)),
+    }
+
+
+class UMLSResolver(object):
+    """Resolves CUIs from the UMLS tables"""
+    def __init__(self, engine, prefix='', size=POOL_SIZE, sabs=None,
+                 lat=None, suppress=None):
+        """
+        :engine: sqlalchemy engine of the UMLS database
+        :prefix: umls tablename prefix
+        :size: number of pooled connections
+        :sabs, lat, suppress: lists restricting the atoms of a term
+        """
+        self.pool = UMLSPool(engine, prefix, size)
+        self.attrs = {}
+        for key, value in (('sab', sabs), ('lat', lat),
+                           ('suppress', suppress)):
+            if value:
+                self.attrs[key] = value
+
+    def _resolve(self, umls, cui):
+        rows = umls.concept(cui, **self.attrs)
+        if not rows:
+            return None
+        name = preferred(rows)['STR']
+        return makeTerm(cui, name, [r['STR'] for r in rows], umls.tuis(cui))
+
+    def resolveMany(self, cuis):
+        """dict of the terms of cuis, None for unknown CUIs"""
+        with self.pool.umls() as umls:
+            return dict((cui, self._resolve(umls, cui)) for cui in cuis)
+
+    def close(self):
+        self.pool.close()
+
+
+class OBOResolver(object):
+    """Resolves CUIs from the UMLS:C... terms of an OBO file held in
+    memory"""
+    def __init__(self, filename):
+        self.terms = {}
+        with OBOReader(filename) as obo:
+            for term in obo:
+                cui = term.id
+                if cui.startswith(UMLS_PREFIX):
+                    cui = cui[len(UMLS_PREFIX):]
+                resolved = makeTerm(cui, term.name,
+                                    [s['name'] for s in term.synonym], [])
+                resolved['groups'] = list(term.subset)
+                self.terms[cui] = resolved
+
+    def resolveMany(self, cuis):
+        return dict((cui, self.terms.get(cui)) for cui in cuis)
+
+    def close(self):
+        pass
+
+
+class LRUCache(object):
+    """Thread safe least recently used cache"""
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.items[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+
+_MISSING = object()
+
+
+class CachedResolver(object):
+    """LRU cache in front of a resolver"""
+    def __init__(self, resolver, size=CACHE_SIZE):
+        self.resolver = resolver
+        self.cache = LRUCache(size)
+
+    def resolveMany(self, cuis):
+        terms = {}
+        misses = []
+        for cui in cuis:
+            term = self.cache.get(cui, _MISSING)
+            if term is _MISSING:
+                misses.append(cui)
+            else:
+                terms[cui] = term
+        if misses:
+            resolved = self.resolver.resolveMany(misses)
+            for cui, term in resolved.iteritems():
+                self.cache.put(cui, term)
+            terms.update(resolved)
+        return terms
+
+    def stats(self):
+        return {'size': len(self.cache), 'hits': self.cache.hits,
+                'misses': self.cache.misses}
+
+    def close(self):
+        self.resolver.close()
+
+
+class TermHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # buffer the response, flushed once per request, and send it without
+    # waiting for the ACK of the previous one on kept alive connections
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body):
+        data = json.dumps(body, separators=(',', ':'))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        m = _TERM_PATH.match(self.path)
+        if m is not None:
+            cui = m.group(1)
+            term = self.server.resolver.resolveMany([cui])[cui]
+            if term is None:
+                self._send(404, {'error': 'Unknown CUI %s' % cui})
+            else:
+                self._send(200, term)
+        elif self.path == '/stats' and \
+                hasattr(self.server.resolver, 'stats'):
+            self._send(200, self.server.resolver.stats())
+        else:
+            self._send(404, {'error': 'Unknown path %s' % self.path})
+
+    def do_POST(self):
+        if self.path != '/terms':
+            self._send(404, {'error': 'Unknown path %s' % self.path})
+            return
+        length = int(self.headers.getheader('Content-Length') or 0)
+        try:
+            cuis = json.loads(self.rfile.read(length))
+            if isinstance(cuis, dict):
+                cuis = cuis['cuis']
+            if not isinstance(cuis, list):
+                raise ValueError('a list of CUIs is expected')
+            cuis = [str(cui) for cui in cuis]
+        except (ValueError, KeyError, UnicodeError), e:
+            self._send(400, {'error': 'Bad request: %s' % e})
+            return
+        if len(cuis) > MAX_BATCH:
+            self._send(400, {'error': 'More than %d CUIs' % MAX_BATCH})
+            return
+        self._send(200, {'terms': self.server.resolver.resolveMany(cuis)})
+
+    def log_message(self, format, *args):
+        logging.debug('%s %s', self.address_string(), format % args)
+
+
+class TermServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling each connection in a thread of its own"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, resolver):
+        HTTPServer.__init__(self, address, TermHandler)
+        self.resolver = resolver
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Approximate term lookup with a trigram index
+
+Strings are lower cased, runs of punctuation and spaces become a single
+space, and the result is padded with a space on each side before it is
+cut into trigrams. Every trigram is packed into a 63 bit integer, 21 bits
+per character, and the index is an inverted file in compressed sparse row
+form: a sorted array of the trigram keys, their offsets into one posting
+array, and the posting array of string numbers, ascending per trigram.
+
+A query is scored against the strings it shares trigrams with by the
+Dice coefficient 2c / (q + n) of c common trigrams out of q and n. A
+string has to share c >= t q / (2 - t) trigrams to reach the threshold
+t, so only the postings of the q - c + 1 rarest trigrams of the query
+generate candidates; the other trigrams are checked by binary search in
+their postings for the candidates alone, and a candidate is dropped as
+soon as the trigrams left cannot bring it to the threshold any more.
+
+All arrays, strings included as npstore.StringTable, are saved to an
+uncompressed .npz and memory mapped on load, so worker processes share
+one copy through the page cache.
+
+Typical usage:
+     index = TrigramIndex.fromOBO('umls.obo')
+     index.save('umls_trigrams.npz')
+
+     index = TrigramIndex.load('umls_trigrams.npz')
+     for score, string, key, cuis in index.lookup(u'alzeimers'):
+         print score, string, cuis
+
+Created on   : 2026-10-19
+"""
+
+import re
+from array import array
+
+import numpy as np
+
+from .indexdata import keysetRows
+from .npstore import StringTable, saveNpz, loadNpz
+from .obo import OBOReader
+
+THRESHOLD = 0.5
+LIMIT = 10
+UMLS_PREFIX = 'UMLS:'
+
+_SEPARATORS = re.compile(r'[\W_]+', re.U)
+
+
+def normalize(string):
+    return _SEPARATORS.sub(u' ', string.lower()).strip()
+
+
+def trigrams(string):
+    """Sorted unique packed trigram keys of a string"""
+    padded = u' %s ' % normalize(string)
+    codes = [ord(c) for c in padded]
+    return sorted(set((a << 42) | (b << 21) | c for a, b, c in
+                      zip(codes, codes[1:], codes[2:])))
+
+
+class TrigramIndex(object):
+    """Trigram inverted index over (string, key, cuis) entries"""
+    def __init__(self, arrays):
+        self.keys = arrays['gram_keys']
+        self.offsets = arrays['gram_offsets']
+        self.postings = arrays['postings']
+        self.counts = arrays['gram_counts']
+        self.strings = StringTable.fromArrays(arrays, 'str')
+        self.entryKeys = StringTable.fromArrays(arrays, 'key')
+        self.cuis = StringTable.fromArrays(arrays, 'cuis')
+        self.arrays = arrays
+
+    def __len__(self):
+        return len(self.counts)
+
+    @classmethod
+    def build(cls, entries):
+        """Build an index from (string, key, cuis) entries, cuis being a
+        comma separated string"""
+        strings = []
+        keys = []
+        cuis = []
+        counts = array('i')
+        grams = array('l')
+        owners = array('i')
+        seen = set()
+        for string, key, ids in entries:
+            if (string, key) in seen:
+                continue
+            seen.add((string, key))
+            number = len(strings)
+            strGrams = trigrams(string)
+            strings.append(string)
+            keys.append(key)
+            cuis.append(ids)
+            counts.append(len(strGrams))
+            grams.extend(strGrams)
+            owners.extend([number] * len(strGrams))
+
+        grams = np.frombuffer(grams, dtype=np.int64) if grams else \
+            np.zeros(0, dtype=np.int64)
+        owners = np.frombuffer(owners, dtype=np.int32) if owners else \
+            np.zeros(0, dtype=np.int32)
+        # stable, so the postings of a trigram stay in string order
+        order = np.argsort(grams, kind='mergesort')
+        grams = grams[order]
+        gramKeys, starts = np.unique(grams, return_index=True)
+        offsets = np.empty(len(gramKeys) + 1, dtype=np.int64)
+        offsets[:-1] = starts
+        offsets[-1] = len(grams)
+
+        arrays = {
+            'gram_keys': gramKeys.astype(np.int64),
+            'gram_offsets': offsets,
+            'postings': owners[order],
+            'gram_counts': np.array(counts, dtype=np.int32),
+        }
+        arrays.update(StringTable.fromList(strings).arrays('str'))
+        arrays.update(StringTable.fromList(keys).arrays('key'))
+        arrays.update(StringTable.fromList(cuis).arrays('cuis'))
+        return cls(arrays)
+
+    @classmethod
+    def fromOBO(cls, filename):
+        """Build an index of the names and synonyms of an OBO file, keyed
+        by term id"""
+        def entries():
+            with OBOReader(filename) as obo:
+                for term in obo:
+                    cui = term.id
+                    if cui.startswith(UMLS_PREFIX):
+                        cui = cui[len(UMLS_PREFIX):]
+                    if term.name:
+                        yield term.name, term.id, cui
+                    for synonym in term.synonym:
+                        yield synonym['name'], term.id, cui
+        return cls.build(entries())
+
+    @classmethod
+    def fromDB(cls, conn):
+        """Build an index of the indexdata strings, keyed by LUI"""
+        rows = keysetRows(conn, columns='LUI, STR, CUIS')
+        return cls.build((r['STR'], r['LUI'], r['CUIS']) for r in rows)
+
+    def save(self, filename):
+        saveNpz(filename, self.arrays)
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        return cls(loadNpz(filename, mmap))
+
+    def _posting(self, row):
+        return self.postings[self.offsets[row]:self.offsets[row + 1]]
+
+    def lookup(self, query, threshold=THRESHOLD, limit=LIMIT):
+        """Strings similar to query
+
+        :threshold: minimum Dice coefficient of the trigram sets
+        :limit: maximum number of results
+        :returns: list of (score, string, key, cuis) tuples, best first
+        """
+        grams = np.array(trigrams(query), dtype=np.int64)
+        q = len(grams)
+        if q == 0 or len(self.keys) == 0:
+            return []
+
+        rows = np.searchsorted(self.keys, grams)
+        rows[rows == len(self.keys)] = 0
+        rows = rows[self.keys[rows] == grams]
+        minCommon = max(1, int(np.ceil(threshold * q / (2.0 - threshold)
+                                       - 1e-9)))
+        if len(rows) < minCommon:
+            return []
+
+        # rarest trigrams first
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        rows = rows[np.argsort(lengths, kind='mergesort')]
+        probe = len(rows) - minCommon + 1
+        found = np.concatenate([self._posting(r) for r in rows[:probe]])
+        candidates, common = np.unique(found, return_counts=True)
+        # trigrams a candidate needs in common to reach the threshold
+        need = threshold * (q + self.counts[candidates]) / 2.0 - 1e-9
+        remaining = len(rows) - probe
+        for row in rows[probe:]:
+            keep = common + remaining >= need
+            candidates = candidates[keep]
+            common = common[keep]
+            need = need[keep]
+            if len(candidates) == 0:
+                return []
+            posting = self._posting(row)
+            at = np.searchsorted(posting, candidates)
+            at[at == len(posting)] = 0
+            common += posting[at] == candidates
+            remaining -= 1
+
+        scores = 2.0 * common / (q + self.counts[candidates])
+        keep = scores >= threshold
+        candidates = candidates[keep]
+        scores = scores[keep]
+        best = np.argsort(-scores, kind='mergesort')[:limit]
+
+        return [(float(scores[i]), self.strings[candidates[i]],
+                 self.entryKeys[candidates[i]], self.cuis[candidates[i]])
+                for i in best]
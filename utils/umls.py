@@ -9,11 +9,16 @@
     Last modified: Aug 14, 2015, Fri 12:04:14 -0500
 """
 
+from contextlib import contextmanager
+from Queue import Queue
+
 from sqlalchemy import select, and_
 from sqlalchemy import distinct
 from sqlalchemy.sql.expression import alias
 from .term import TermTable
 
+POOL_SIZE = 4
+
 
 class UMLS(TermTable):
     def _attrs(self, attr, c):
@@ -230,3 +235,31 @@ class UMLS(TermTable):
             return None
         else:
             return res[0]
+
+
+class UMLSPool(object):
+    """Fixed size pool of UMLS instances. An instance keeps its table
+    metadata, but checks a connection out of the engine pool only while
+    it is borrowed, so pool_pre_ping and pool_recycle of the engine
+    replace the connections the server closed in the meantime."""
+    def __init__(self, engine, prefix='', size=POOL_SIZE):
+        self.instances = Queue()
+        for i in range(size):
+            umls = UMLS(engine, prefix)
+            umls._close()
+            self.instances.put(umls)
+
+    @contextmanager
+    def umls(self):
+        """Borrow an instance, waiting for a free one"""
+        umls = self.instances.get()
+        try:
+            umls._open()
+            yield umls
+        finally:
+            umls._close()
+            self.instances.put(umls)
+
+    def close(self):
+        while not self.instances.empty():
+            self.instances.get()._close()
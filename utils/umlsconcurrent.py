@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Concurrent UMLS lookups
+
+A UMLS instance runs one query at a time on its single connection.
+ConcurrentUMLS exposes the same lookup methods, but each call is queued
+on a thread pool and returns at once with an AsyncResult; the call runs
+on a UMLS instance borrowed from a UMLSPool, so up to concurrency queries
+are in flight, each on a connection of its own. Database drivers release
+the GIL while they wait for the server, so the waits overlap.
+
+Typical usage:
+     with ConcurrentUMLS(engine, concurrency=8) as cumls:
+         pending = [cumls.concept(cui, sab='MSH') for cui in cuis]
+         concepts = gather(pending)
+
+Created on   : 2026-10-19
+"""
+
+from multiprocessing.pool import ThreadPool
+
+from .umls import UMLSPool, POOL_SIZE
+
+
+def gather(results):
+    """Wait for AsyncResults and return their values in order"""
+    return [result.get() for result in results]
+
+
+class ConcurrentUMLS(object):
+    """UMLS lookups returning AsyncResults, see the module documentation"""
+    def __init__(self, engine, prefix='', concurrency=POOL_SIZE):
+        """
+        :engine: sqlalchemy engine of the UMLS database
+        :prefix: umls tablename prefix
+        :concurrency: maximum number of queries in flight
+        """
+        self.pool = UMLSPool(engine, prefix, concurrency)
+        self.threads = ThreadPool(concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
+
+    def _call(self, method, args, attr):
+        with self.pool.umls() as umls:
+            return getattr(umls, method)(*args, **attr)
+
+    def submit(self, method, *args, **attr):
+        """Queue a call of a UMLS method"""
+        return self.threads.apply_async(self._call, (method, args, attr))
+
+    def concept(self, cui, **attr):
+        return self.submit('concept', cui, **attr)
+
+    def relcuis(self, cui, **attr):
+        return self.submit('relcuis', cui, **attr)
+
+    def defn(self, cui, **attr):
+        return self.submit('defn', cui, **attr)
+
+    def aui(self, aui, **attr):
+        return self.submit('aui', aui, **attr)
+
+    def tuis(self, cui):
+        return self.submit('tuis', cui)
+
+    def cuis(self, offset=0, limit=100, **attr):
+        return self.submit('cuis', offset, limit, **attr)
+
+    def close(self):
+        self.threads.close()
+        self.threads.join()
+        self.pool.close()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BioCADDIE Terminology Utilities
+Maps OBO xref and synonym codes to UMLS CUIs
+
+The SAB:CODE keys of MRCONSO are loaded once into an in-memory hash index,
+either from a UMLS database or straight from MRCONSO.RRF, and can be saved
+with marshal to skip the load next time. CUIs are stored as integers, and
+codes with a single CUI, nearly all of them, as a bare integer instead of
+a tuple.
+
+An OBO file is then streamed through OBOReader and every xref and synonym
+code is resolved in one pass. Prefixes are mapped to SABs with SAB_ALIASES
+(MESH:D000835 is looked up as MSH:D000835), and UMLS:C... codes map to
+themselves if the CUI is known. Codes that MRCONSO already stores with
+their prefix, like GO:0005623 or HP:0000118, are keyed as they are, as
+generateOBO.makeCode writes them.
+
+Typical usage:
+     index = UMLSIndex.fromRRF('MRCONSO.RRF', sabs=['FMA', 'MSH'])
+     counts = mapOBO('uberon.obo', index, 'uberon')
+
+Created on   : 2026-10-19
+"""
+
+import codecs
+import marshal
+
+from sqlalchemy import MetaData, Table, select, and_
+
+from .obo import OBOReader
+from .oboexport import TSVWriter
+from .rrf import cuiNumber, cuiString, RRF_CUI, RRF_SAB, RRF_CODE, \
+    RRF_SUPPRESS
+
+# OBO xref prefixes and the UMLS SABs they stand for
+SAB_ALIASES = {
+    'MESH': 'MSH',
+    'MSH': 'MSH',
+    'FMA': 'FMA',
+    'NCIT': 'NCI',
+    'NCI': 'NCI',
+    'SCTID': 'SNOMEDCT_US',
+    'SNOMEDCT': 'SNOMEDCT_US',
+    'SNOMEDCT_US': 'SNOMEDCT_US',
+    'HP': 'HPO',
+    'GO': 'GO',
+    'OMIM': 'OMIM',
+    'MEDDRA': 'MDR',
+    'ICD9': 'ICD9CM',
+    'ICD9CM': 'ICD9CM',
+    'ICD10': 'ICD10',
+    'ICD10CM': 'ICD10CM',
+    'NDFRT': 'NDFRT',
+}
+
+MAPPED_SUFFIX = '_map.tsv'
+UNMAPPED_SUFFIX = '_unmapped.tsv'
+
+
+def codeKey(sab, code):
+    """Index key of a MRCONSO code: SAB:CODE, or the code itself if it
+    already has a prefix"""
+    if ':' in code:
+        return code
+    return '%s:%s' % (sab, code)
+
+
+class UMLSIndex(object):
+    """SAB:CODE to CUI hash index"""
+    def __init__(self, aliases=SAB_ALIASES):
+        self.codes = {}
+        self.cuis = set()
+        self.aliases = dict(aliases)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def add(self, cui, sab, code):
+        """Add a CUI for the code of a source"""
+        cui = cuiNumber(cui)
+        self.cuis.add(cui)
+        key = intern(codeKey(sab, code))
+        current = self.codes.get(key)
+        if current is None:
+            self.codes[key] = cui
+        elif isinstance(current, tuple):
+            if cui not in current:
+                self.codes[key] = current + (cui,)
+        elif current != cui:
+            self.codes[key] = (current, cui)
+
+    def addRows(self, rows):
+        """Add (CUI, SAB, CODE) rows"""
+        for cui, sab, code in rows:
+            self.add(cui, sab, code)
+        return self
+
+    def lookup(self, code):
+        """CUIs of an OBO code like FMA:62955 or UMLS:C0000001
+
+        :returns: list of CUI strings, empty if the code is unknown
+        """
+        prefix, sep, value = code.partition(':')
+        if not sep or not value:
+            return []
+        prefix = prefix.upper()
+        if prefix == 'UMLS':
+            if value[:1] == 'C' and value[1:].isdigit() and \
+               int(value[1:]) in self.cuis:
+                return [value]
+            return []
+
+        cuis = self.codes.get(codeKey(self.aliases.get(prefix, prefix),
+                                      value))
+        if cuis is None:
+            # prefixed codes, e.g. GO:0005623, are stored as they are
+            cuis = self.codes.get(code)
+        if cuis is None:
+            return []
+        if isinstance(cuis, tuple):
+            return [cuiString(c) for c in cuis]
+        return [cuiString(cuis)]
+
+    def save(self, filename):
+        with open(filename, 'wb') as fb:
+            marshal.dump((self.codes, list(self.cuis)), fb)
+
+    @classmethod
+    def load(cls, filename, aliases=SAB_ALIASES):
+        index = cls(aliases)
+        with open(filename, 'rb') as fb:
+            codes, cuis = marshal.load(fb)
+        index.codes = dict((intern(k), v) for k, v in codes.iteritems())
+        index.cuis = set(cuis)
+        return index
+
+    @classmethod
+    def fromRRF(cls, filename, sabs=None, suppress=None, aliases=SAB_ALIASES):
+        """Load the index from MRCONSO.RRF
+
+        :sabs: sources to load, all sources if None
+        :suppress: SUPPRESS flags to load, all rows if None
+        """
+        return cls(aliases).addRows(readRRF(filename, sabs, suppress))
+
+    @classmethod
+    def fromDB(cls, conn, prefix='', sabs=None, suppress=None,
+               aliases=SAB_ALIASES):
+        """Load the index from the MRCONSO table of a UMLS database"""
+        return cls(aliases).addRows(readDB(conn, prefix, sabs, suppress))
+
+
+def readRRF(filename, sabs=None, suppress=None):
+    """Generate (CUI, SAB, CODE) rows of MRCONSO.RRF"""
+    sabs = set(sabs) if sabs is not None else None
+    suppress = set(suppress) if suppress is not None else None
+    with open(filename, 'rb') as fb:
+        for line in fb:
+            row = line.split('|')
+            if sabs is not None and row[RRF_SAB] not in sabs:
+                continue
+            if suppress is not None and row[RRF_SUPPRESS] not in suppress:
+                continue
+            yield row[RRF_CUI], row[RRF_SAB], row[RRF_CODE]
+
+
+def readDB(conn, prefix='', sabs=None, suppress=None):
+    """Generate (CUI, SAB, CODE) rows of MRCONSO, streaming the result"""
+    table = Table(prefix + 'MRCONSO', MetaData(), autoload=True,
+                  autoload_with=conn)
+    where = []
+    if sabs is not None:
+        where.append(table.c.SAB.in_(sabs))
+    if suppress is not None:
+        where.append(table.c.SUPPRESS.in_(suppress))
+
+    s = select([table.c.CUI, table.c.SAB, table.c.CODE]).distinct()
+    if where:
+        s = s.where(and_(*where))
+
+    result = conn.execution_options(stream_results=True).execute(s)
+    try:
+        for cui, sab, code in result:
+            yield str(cui), str(sab), code.encode('utf-8')
+    finally:
+        result.close()
+
+
+def termCodes(term):
+    """Generate (field, code) pairs of the xref and synonym codes of a term"""
+    for xref in term.xref:
+        if xref['code'] is not None:
+            yield 'xref', xref['code']
+    for synonym in term.synonym:
+        if synonym['code'] is not None:
+            for code in synonym['code'].split(','):
+                code = code.strip()
+                if code:
+                    yield 'synonym', code
+
+
+def mapTerms(terms, index):
+    """Resolve term codes to CUIs
+
+    :returns: a generator of (term id, field, code, CUIs) tuples, where
+            CUIs is an empty list for unmapped codes
+    """
+    for term in terms:
+        for field, code in termCodes(term):
+            yield term.id, field, code, index.lookup(code.encode('utf-8'))
+
+
+def mapOBO(filename, index, base=None):
+    """Map the codes of an OBO file, writing <base>_map.tsv with a row per
+    code and CUI, and <base>_unmapped.tsv with a row per unmapped code.
+
+    :returns: dict of (mapped, unmapped) counts per code prefix
+    """
+    if base is None:
+        base = filename
+
+    counts = {}
+    with TSVWriter(base + MAPPED_SUFFIX) as mapped, \
+            TSVWriter(base + UNMAPPED_SUFFIX) as unmapped:
+        with OBOReader(filename) as obo:
+            for tid, field, code, cuis in mapTerms(obo, index):
+                prefix = code.partition(':')[0]
+                count = counts.setdefault(prefix, [0, 0])
+                if cuis:
+                    count[0] += 1
+                    mapped.writeRows((tid, field, code, cui) for cui in cuis)
+                else:
+                    count[1] += 1
+                    unmapped.writeRows([(tid, field, code)])
+
+    return dict((k, tuple(v)) for k, v in counts.iteritems())
+
+
+def writeReport(counts, filename):
+    """Write the mapped/unmapped counts per prefix, most unmapped first"""
+    with codecs.open(filename, 'w', 'utf-8') as fb:
+        fb.write('prefix\tmapped\tunmapped\n')
+        for prefix, (m, u) in sorted(counts.iteritems(),
+                                     key=lambda i: (-i[1][1], i[0])):
+            fb.write('%s\t%d\t%d\n' % (prefix, m, u))